@@ -0,0 +1,326 @@
+"""Benchmarks de las rutas calientes: persistencia, directorio, tendencias, cartera, búsqueda, balance, PDF y Excel.
+
+Genera datos sintéticos reproducibles (semilla fija) a varios tamaños y mide, para cada
+ruta, el tiempo de pared (mínimo y mediana de varias repeticiones) y el pico de memoria
+(tracemalloc, en una corrida aparte para no inflar los tiempos).
+
+    python -m benchmarks.bench                          # 1k, 10k y 100k
+    python -m benchmarks.bench --sizes 1000 --repeat 5 --out base.json
+    python -m benchmarks.bench --compare base.json --out nuevo.json
+
+Con `--compare` se imprime la razón nuevo/anterior de cada medición.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from consultoria.formatting import MESES  # noqa: E402
+from consultoria.history import SharedHistory  # noqa: E402
+from consultoria.ledger import Ledger  # noqa: E402
+from consultoria.portfolio import Portfolio  # noqa: E402
+from consultoria.search import ClientSearch  # noqa: E402
+from consultoria.storage import RecordStore  # noqa: E402
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000)
+SEED = 1234
+REGISTROS_POR_CLIENTE = 10
+CONCEPTOS = ["Nómina", "Renta", "Supermercado", "Luz", "Internet", "Honorarios", "Gasolina", "Colegiatura"]
+
+
+# --- Datos sintéticos ---
+
+def make_records(n, rng):
+    """Cortes de historial: `REGISTROS_POR_CLIENTE` por cliente, como los guarda la app."""
+    records = []
+    for i in range(n):
+        cliente = i // REGISTROS_POR_CLIENTE
+        mes = MESES[i % 12]
+        ingresos = round(rng.uniform(5_000, 80_000), 2)
+        egresos = round(rng.uniform(1_000, 60_000), 2)
+        records.append({
+            "id": 1_700_000_000_000 + i,
+            "Cliente": f"Cliente {cliente:06d}",
+            "Ocupacion": rng.choice(["Arquitecto", "Médico", "Docente", "Abogada"]),
+            "Telefono": f"55{rng.randrange(10**8):08d}",
+            "Email": f"cliente{cliente}@ejemplo.com",
+            "Edad": rng.randrange(18, 80),
+            "Sexo": rng.choice(["Masculino", "Femenino", "No especificar"]),
+            "Fecha": "2024-01-31",
+            "Periodo": f"{mes} {2020 + i // 12 % 10}",
+            "Mes": mes,
+            "Año": 2020 + i // 12 % 10,
+            "Ingresos": ingresos,
+            "Egresos": egresos,
+            "Balance": ingresos - egresos,
+            "Ahorro_Proyectado": round(rng.uniform(0, 5_000), 2),
+        })
+    return records
+
+
+def make_transactions(n, rng):
+    return [
+        {"id": i + 1, "fecha": "2024-01-15", "concepto": rng.choice(CONCEPTOS),
+         "monto": round(rng.uniform(10, 20_000), 2), "tipo": rng.choice(("Ingreso", "Gasto"))}
+        for i in range(n)
+    ]
+
+
+# --- Benchmarks ---
+# Cada uno recibe (tamaño, directorio temporal, rng) y devuelve la función a medir;
+# la preparación queda fuera de la medición.
+
+def bench_load_data(n, tmp, rng):
+    path = os.path.join(tmp, "load.sqlite3")
+    store = RecordStore(path)
+    store.append_many(make_records(n, rng))
+    store.close()
+
+    def run():
+        s = RecordStore(path)
+        s.load()
+        s.close()
+    return run
+
+
+def bench_history_directory(n, tmp, rng):
+    """Arranque del directorio: primera sincronización y la primera página de clientes."""
+    path = os.path.join(tmp, "directory.sqlite3")
+    store = RecordStore(path)
+    store.append_many(make_records(n, rng))
+    store.close()
+
+    def run():
+        s = RecordStore(path)
+        historial = SharedHistory(s)
+        historial.sync()
+        for cliente in historial.clientes()[:20]:
+            historial.periodos(cliente)
+        s.close()
+    return run
+
+
+def bench_client_trend(n, tmp, rng):
+    """Tendencia mensual y resumen por año de 20 clientes, leídos del resumen mensual."""
+    path = os.path.join(tmp, "trend.sqlite3")
+    store = RecordStore(path)
+    store.append_many(make_records(n, rng))
+    clientes = [cliente for cliente, _ in store.clients()[0][:20]]
+
+    def run():
+        for cliente in clientes:
+            store.client_trend(cliente)
+            store.client_years(cliente)
+    return run
+
+
+def bench_portfolio(n, tmp, rng):
+    """Resumen de cartera tras un alta: copia columnar incremental y groupby completos."""
+    path = os.path.join(tmp, "portfolio.sqlite3")
+    store = RecordStore(path)
+    store.append_many(make_records(n, rng))
+    cartera = Portfolio(store)
+    cartera.summary()
+    nuevo = make_records(1, rng)[0]
+    ids = iter(range(10**15, 10**16))
+
+    def run():
+        store.append(dict(nuevo, id=next(ids)))
+        cartera.summary()
+    return run
+
+
+def bench_search(n, tmp, rng):
+    """Búsquedas de clientes (exacta, prefijo, con acentos y con error) con el índice ya armado."""
+    path = os.path.join(tmp, "search.sqlite3")
+    store = RecordStore(path)
+    store.append_many(make_records(n, rng))
+    buscador = ClientSearch(store)
+    buscador.refresh()
+
+    def run():
+        for consulta in ("Cliente 000042", "arqui", "médico", "abogda"):
+            buscador.search(consulta)
+    return run
+
+
+def bench_save_data(n, tmp, rng):
+    """Alta de un corte en un historial que ya tiene `n` registros."""
+    path = os.path.join(tmp, "save.sqlite3")
+    store = RecordStore(path)
+    store.append_many(make_records(n, rng))
+    nuevo = make_records(1, rng)[0]
+    ids = iter(range(10**15, 10**16))
+
+    def run():
+        store.append(dict(nuevo, id=next(ids)))
+    return run
+
+
+def bench_save_bulk(n, tmp, rng):
+    """Alta en lote de `n` registros (migración o importación)."""
+    records = make_records(n, rng)
+    contador = iter(range(10**6))
+
+    def run():
+        store = RecordStore(os.path.join(tmp, f"bulk{next(contador)}.sqlite3"))
+        store.append_many(records)
+        store.close()
+    return run
+
+
+def bench_get_balance(n, tmp, rng):
+    """Balance tras una edición y una baja sobre un libro de `n` movimientos."""
+    ledger = Ledger(make_transactions(n, rng))
+    ids = iter(range(1, n + 1))
+
+    def run():
+        tx_id = next(ids, 1)
+        ledger.update(tx_id, monto=123.0)
+        ledger.remove(tx_id)
+        ledger.balance()
+    return run
+
+
+def bench_ledger_build(n, tmp, rng):
+    transacciones = make_transactions(n, rng)
+
+    def run():
+        Ledger(transacciones).balance()
+    return run
+
+
+def bench_create_pro_pdf(n, tmp, rng):
+    from consultoria.reports import create_pro_pdf
+
+    ledger = Ledger(make_transactions(n, rng))
+    ingresos, gastos, balance = ledger.balance()
+    snap = {"cliente_snap": "Cliente Benchmark", "ocupacion_snap": "Analista", "fecha_snap": "31/01/2024",
+            "ingresos_snap": ingresos, "gastos_snap": gastos, "balance_snap": balance,
+            "transacciones_snap": ledger.columnas()}
+
+    def run():
+        create_pro_pdf("analisis", snap)
+    return run
+
+
+def bench_generate_complex_excel(n, tmp, rng):
+    from consultoria.excel_export import generate_complex_excel
+
+    records = make_records(n, rng)
+
+    def run():
+        generate_complex_excel(records)
+    return run
+
+
+BENCHMARKS = {
+    "load_data": bench_load_data,
+    "history_directory": bench_history_directory,
+    "client_trend": bench_client_trend,
+    "portfolio": bench_portfolio,
+    "search": bench_search,
+    "save_data": bench_save_data,
+    "save_bulk": bench_save_bulk,
+    "get_balance": bench_get_balance,
+    "ledger_build": bench_ledger_build,
+    "create_pro_pdf": bench_create_pro_pdf,
+    "generate_complex_excel": bench_generate_complex_excel,
+}
+
+
+# --- Medición ---
+
+def measure(factory, n, repeat):
+    tmp = tempfile.mkdtemp(prefix="bench_")
+    try:
+        run = factory(n, tmp, random.Random(SEED))
+        tiempos = []
+        for _ in range(repeat):
+            gc.collect()
+            inicio = time.perf_counter()
+            run()
+            tiempos.append(time.perf_counter() - inicio)
+        gc.collect()
+        tracemalloc.start()
+        run()
+        pico = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    return {
+        "wall_min_s": min(tiempos),
+        "wall_median_s": statistics.median(tiempos),
+        "peak_kb": round(pico / 1024, 1),
+        "repeat": repeat,
+    }
+
+
+def environment():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout.strip()
+    except OSError:
+        commit = ""
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "cpu_count": os.cpu_count(),
+    }
+
+
+def compare(resultados, anterior):
+    previos = {(r["bench"], r["size"]): r for r in anterior["results"]}
+    print(f"\n{'benchmark':<24}{'tamaño':>9}{'tiempo':>10}{'memoria':>10}")
+    for r in resultados:
+        p = previos.get((r["bench"], r["size"]))
+        if not p:
+            continue
+        t = r["wall_min_s"] / p["wall_min_s"] if p["wall_min_s"] else float("nan")
+        m = r["peak_kb"] / p["peak_kb"] if p["peak_kb"] else float("nan")
+        print(f"{r['bench']:<24}{r['size']:>9}{t:>9.2f}x{m:>9.2f}x")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=lambda s: [int(x) for x in s.split(",")], default=list(DEFAULT_SIZES))
+    parser.add_argument("--only", type=lambda s: s.split(","), default=list(BENCHMARKS),
+                        help=f"subconjunto separado por comas de: {', '.join(BENCHMARKS)}")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--out", help="archivo JSON de resultados")
+    parser.add_argument("--compare", help="JSON de una corrida anterior para comparar")
+    args = parser.parse_args(argv)
+
+    resultados = []
+    for nombre in args.only:
+        for n in args.sizes:
+            medicion = measure(BENCHMARKS[nombre], n, args.repeat)
+            print(f"{nombre:<24}{n:>9}{medicion['wall_min_s']:>12.6f}s{medicion['peak_kb']:>12.0f} KB", flush=True)
+            resultados.append(dict(medicion, bench=nombre, size=n))
+
+    salida = {"environment": environment(), "results": resultados}
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f:
+            json.dump(salida, f, indent=2)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            compare(resultados, json.load(f))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
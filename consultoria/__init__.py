@@ -0,0 +1,45 @@
+"""Núcleo de Consultoría: finanzas, persistencia y reportes, sin depender de Streamlit.
+
+Los nombres públicos se resuelven al primer uso, así que `import consultoria` no carga
+pandas, matplotlib, fpdf ni openpyxl; cada submódulo pesado se importa cuando se necesita.
+"""
+import importlib
+
+_EXPORTS = {
+    'BlobStore': 'blobs',
+    'ClientSearch': 'search',
+    'ExcelCache': 'report_cache',
+    'Historial': 'history',
+    'JobRunner': 'jobs',
+    'Ledger': 'ledger',
+    'Portfolio': 'portfolio',
+    'RecordStore': 'storage',
+    'ReportCache': 'report_cache',
+    'SearchIndex': 'search',
+    'SharedHistory': 'history',
+    'Transaccion': 'ledger',
+    'create_pro_pdf': 'reports',
+    'format_money': 'formatting',
+    'format_years': 'formatting',
+    'generate_complex_excel': 'excel_export',
+    'import_statement': 'importer',
+    'load_records': 'storage',
+    'record_snapshots': 'reports',
+    'render_all': 'batch_reports',
+    'report_key': 'report_cache',
+}
+
+__all__ = sorted(_EXPORTS)
+
+
+def __getattr__(name):
+    modulo = _EXPORTS.get(name)
+    if modulo is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    valor = getattr(importlib.import_module(f'.{modulo}', __name__), name)
+    globals()[name] = valor
+    return valor
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
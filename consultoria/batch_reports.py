@@ -0,0 +1,91 @@
+"""Generación por lotes de los PDF de análisis y proyección de todo el historial.
+
+Cada corte (cliente + periodo) se renderiza en un proceso del pool; el proceso
+principal solo escribe los archivos, en un directorio o en un zip.
+"""
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+
+from .reports import PROYECCION_MESES, create_pro_pdf, record_snapshots
+
+INVALID_PATH_CHARS = str.maketrans('', '', '<>:"/\\|?*')
+
+
+def safe_name(value, default):
+    return str(value or '').translate(INVALID_PATH_CHARS).strip(' .') or default
+
+
+def render_record(record, meses=PROYECCION_MESES):
+    """Worker: los dos PDF de un corte como [(ruta relativa, bytes)]."""
+    analisis, proyeccion = record_snapshots(record, meses)
+    carpeta = safe_name(record.get('Cliente'), 'Sin nombre')
+    periodo = safe_name(record.get('Periodo'), str(record.get('id', '')))
+    return [
+        (f"{carpeta}/{periodo}_analisis.pdf", create_pro_pdf("analisis", analisis)),
+        (f"{carpeta}/{periodo}_proyeccion.pdf", create_pro_pdf("proyeccion", proyeccion)),
+    ]
+
+
+class _Writer:
+    """Destino de los PDF: un zip si la ruta termina en .zip (o es un buffer), si no un directorio."""
+
+    def __init__(self, out):
+        self.usados = set()
+        self.zip = None
+        self.dir = None
+        if not isinstance(out, (str, os.PathLike)) or str(out).endswith('.zip'):
+            self.zip = zipfile.ZipFile(out, 'w', zipfile.ZIP_DEFLATED)
+        else:
+            self.dir = out
+            os.makedirs(out, exist_ok=True)
+
+    def write(self, nombre, data, record_id):
+        if nombre in self.usados:
+            # Dos cortes del mismo cliente con el mismo periodo: se distinguen por id.
+            base, ext = os.path.splitext(nombre)
+            nombre = f"{base}_{record_id}{ext}"
+        self.usados.add(nombre)
+        if self.zip is not None:
+            self.zip.writestr(nombre, data)
+            return
+        path = os.path.join(self.dir, nombre)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, 'wb') as f:
+            f.write(data)
+
+    def close(self):
+        if self.zip is not None:
+            self.zip.close()
+
+
+def render_all(records, out, workers=None, progress=None):
+    """Renderiza los PDF de todos los registros en un pool de procesos.
+
+    `out` es un directorio, una ruta .zip o un buffer binario (zip). `progress`, si se
+    da, recibe (hechos, total) después de cada corte. Devuelve el número de archivos.
+    """
+    records = list(records)
+    total = len(records)
+    workers = workers or os.cpu_count() or 1
+    writer = _Writer(out)
+    archivos = 0
+    try:
+        if total:
+            # Bloques de varios cortes por tarea para no pagar un viaje IPC por PDF.
+            chunksize = max(1, total // (workers * 4))
+            # 'spawn' evita heredar por fork los hilos del servidor que nos invoca.
+            ctx = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+                resultados = pool.map(render_record, records, chunksize=chunksize)
+                for hechos, (record, pdfs) in enumerate(zip(records, resultados), 1):
+                    for nombre, data in pdfs:
+                        writer.write(nombre, data, record.get('id'))
+                        archivos += 1
+                    if progress:
+                        progress(hechos, total)
+    finally:
+        writer.close()
+    return archivos
+
@@ -0,0 +1,71 @@
+"""Almacén de archivos direccionado por contenido (SHA-256) para los PDF del historial."""
+import hashlib
+import os
+import tempfile
+import time
+
+# Antigüedad mínima (segundos) de un blob huérfano antes de poder borrarlo; evita
+# purgar un PDF recién escrito cuyo registro todavía no se ha confirmado.
+PRUNE_GRACE = 600
+
+
+class BlobStore:
+    """Guarda cada contenido una sola vez en `root/<2 hex>/<sha256>`."""
+
+    def __init__(self, root):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, ref):
+        return os.path.join(self.root, ref[:2], ref)
+
+    def put(self, data):
+        """Guarda `data` si no existe todavía y devuelve su referencia (hash)."""
+        ref = hashlib.sha256(data).hexdigest()
+        path = self._path(ref)
+        try:
+            # Un blob reutilizado vuelve a contar como recién escrito: `prune()` no lo borra
+            # antes de que se confirme el registro que ahora lo referencia.
+            os.utime(path)
+            return ref
+        except FileNotFoundError:
+            pass
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+        return ref
+
+    def get(self, ref):
+        """Lee el contenido de una referencia; None si no existe."""
+        if not isinstance(ref, str) or not ref:
+            return None
+        try:
+            with open(self._path(ref), 'rb') as f:
+                return f.read()
+        except FileNotFoundError:
+            return None
+
+    def refs(self):
+        for shard in os.listdir(self.root):
+            shard_path = os.path.join(self.root, shard)
+            if os.path.isdir(shard_path):
+                for name in os.listdir(shard_path):
+                    if not name.endswith(".tmp"):
+                        yield name
+
+    def prune(self, keep):
+        """Borra los blobs que no están en `keep` (y que superan el periodo de gracia)."""
+        limite = time.time() - PRUNE_GRACE
+        borrados = 0
+        for ref in list(self.refs()):
+            path = self._path(ref)
+            if ref not in keep and os.path.getmtime(path) < limite:
+                os.remove(path)
+                borrados += 1
+        return borrados
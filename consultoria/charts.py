@@ -0,0 +1,104 @@
+"""Gráficas de los reportes PDF rasterizadas en memoria.
+
+La dona de Ingresos/Egresos se dibuja sobre una única figura de matplotlib que se
+reutiliza entre reportes, y el resultado se guarda ya comprimido en el formato que
+espera FPDF (filas con predictor PNG + Flate), por lo que no se toca el disco.
+"""
+import threading
+import zlib
+from functools import lru_cache
+
+import numpy as np
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Circle
+
+from .formatting import format_money
+
+DONUT_SIZE = (7, 4)
+DONUT_DPI = 150
+# Margen alrededor del dibujo, igual que savefig(bbox_inches='tight').
+TIGHT_PAD_INCHES = 0.1
+DONUT_CACHE_SIZE = 256
+
+
+class Raster:
+    """Imagen RGBA lista para FPDF: canales de color y alfa comprimidos por separado."""
+
+    __slots__ = ('w', 'h', 'rgb', 'alpha')
+
+    def __init__(self, pixels):
+        self.h, self.w = pixels.shape[:2]
+        self.rgb = _flate_rows(pixels[:, :, :3])
+        self.alpha = _flate_rows(pixels[:, :, 3:])
+
+    def fpdf_info(self):
+        """Diccionario de imagen en el formato interno de FPDF (una copia por documento)."""
+        return {
+            'w': self.w, 'h': self.h, 'cs': 'DeviceRGB', 'bpc': 8, 'f': 'FlateDecode',
+            'dp': f'/Predictor 15 /Colors 3 /BitsPerComponent 8 /Columns {self.w}',
+            'pal': '', 'trns': '', 'data': self.rgb, 'smask': self.alpha,
+        }
+
+
+def _flate_rows(channels):
+    """Antepone a cada fila el byte de filtro PNG 'None' y comprime con zlib."""
+    h, w, n = channels.shape
+    rows = np.zeros((h, w * n + 1), dtype=np.uint8)
+    rows[:, 1:] = channels.reshape(h, w * n)
+    return zlib.compress(rows.tobytes())
+
+
+def _crop_tight(fig, canvas, pixels):
+    """Recorta el lienzo al área que savefig(bbox_inches='tight') habría exportado."""
+    bbox = fig.get_tightbbox(canvas.get_renderer()).padded(TIGHT_PAD_INCHES)
+    dpi = fig.dpi
+    height = pixels.shape[0]
+    x0, x1 = max(int(round(bbox.x0 * dpi)), 0), int(round(bbox.x1 * dpi))
+    y0, y1 = max(height - int(round(bbox.y1 * dpi)), 0), height - int(round(bbox.y0 * dpi))
+    return pixels[y0:y1, x0:x1]
+
+
+class _DonutTemplate:
+    """Figura y ejes preconstruidos; cada render limpia los ejes y vuelve a dibujar."""
+
+    def __init__(self):
+        self.fig = Figure(figsize=DONUT_SIZE, dpi=DONUT_DPI)
+        self.fig.patch.set_alpha(0)
+        self.canvas = FigureCanvasAgg(self.fig)
+        self.ax = self.fig.add_subplot()
+        self.lock = threading.Lock()
+
+    def render(self, ingresos, gastos, balance):
+        with self.lock:
+            ax = self.ax
+            ax.clear()
+            ax.pie([ingresos, gastos], labels=['Ingresos', 'Egresos'], autopct='%1.1f%%', startangle=90,
+                   colors=['#007AFF', '#5AC8FA'], textprops=dict(color="#1C1C1E", fontsize=10, weight='bold'),
+                   pctdistance=0.85)
+            ax.add_artist(Circle((0, 0), 0.65, fc='white'))
+            ax.text(0, 0, "Balance", ha='center', va='bottom', fontsize=10, color='gray')
+            ax.text(0, 0, f"\n{format_money(balance)}", ha='center', va='center', fontsize=12, fontweight='bold', color='#007AFF')
+            ax.axis('equal')
+            ax.patch.set_alpha(0)
+            self.canvas.draw()
+            pixels = np.asarray(self.canvas.buffer_rgba())
+            return Raster(_crop_tight(self.fig, self.canvas, pixels))
+
+
+_template = None
+_template_lock = threading.Lock()
+
+
+def _get_template():
+    global _template
+    with _template_lock:
+        if _template is None:
+            _template = _DonutTemplate()
+        return _template
+
+
+@lru_cache(maxsize=DONUT_CACHE_SIZE)
+def render_donut(ingresos, gastos, balance):
+    """Dona Ingresos/Egresos con el balance al centro; cacheada por (ingresos, gastos, balance)."""
+    return _get_template().render(float(ingresos), float(gastos), float(balance))
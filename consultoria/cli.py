@@ -0,0 +1,88 @@
+"""Línea de comandos para exportaciones y reportes (pensada para cron).
+
+    python -m consultoria excel Base.xlsx
+    python -m consultoria reportes Reportes.zip --workers 4
+    python -m consultoria importar estado.csv --salida normalizado.csv
+
+Cada subcomando importa solo lo que usa, así que el arranque no paga por pandas,
+matplotlib, fpdf ni openpyxl salvo que el trabajo los necesite.
+"""
+import argparse
+import sqlite3
+import sys
+
+DEFAULT_DB = "financial_db.sqlite3"
+
+
+def _excel(args):
+    from .excel_export import generate_complex_excel
+    from .storage import load_records
+
+    data = generate_complex_excel(load_records(args.db))
+    with open(args.salida, 'wb') as f:
+        f.write(data)
+    print(f"Excel escrito en {args.salida} ({len(data) // 1024} KB)")
+
+
+def _reportes(args):
+    from .batch_reports import render_all
+    from .storage import load_records
+
+    def progreso(hechos, total):
+        print(f"\r{hechos}/{total} cortes", end='', file=sys.stderr, flush=True)
+
+    archivos = render_all(load_records(args.db), args.salida, args.workers, progreso)
+    print(f"\n{archivos} PDF generados en {args.salida}")
+
+
+def _importar(args):
+    import csv
+
+    from .importer import import_statement
+
+    with open(args.archivo, 'rb') as f:
+        resultado = import_statement(f, args.archivo)
+    print(f"{resultado.aceptados} movimientos válidos, {resultado.rechazados} rechazados")
+    for fila, motivo in resultado.muestras[:args.max_rechazos]:
+        print(f"  fila {fila}: {motivo}")
+    if args.salida:
+        columnas = resultado.columnas
+        with open(args.salida, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.writer(f)
+            writer.writerow(list(columnas))
+            writer.writerows(zip(*columnas.values()))
+        print(f"Movimientos normalizados en {args.salida}")
+    return 1 if resultado.rechazados and args.estricto else 0
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="consultoria", description="Exportaciones y reportes de Consultoría.")
+    sub = parser.add_subparsers(dest="comando", required=True)
+
+    p = sub.add_parser("excel", help="Exporta el historial completo a Excel")
+    p.add_argument("salida")
+    p.add_argument("--db", default=DEFAULT_DB, help="base SQLite o financial_db.json")
+    p.set_defaults(func=_excel)
+
+    p = sub.add_parser("reportes", help="PDF de análisis y proyección de todos los cortes")
+    p.add_argument("salida", help="directorio o archivo .zip")
+    p.add_argument("--db", default=DEFAULT_DB, help="base SQLite o financial_db.json")
+    p.add_argument("--workers", type=int, default=None)
+    p.set_defaults(func=_reportes)
+
+    p = sub.add_parser("importar", help="Valida y normaliza un estado de cuenta CSV/XLSX")
+    p.add_argument("archivo")
+    p.add_argument("--salida", help="CSV con los movimientos normalizados")
+    p.add_argument("--max-rechazos", type=int, default=20)
+    p.add_argument("--estricto", action="store_true", help="sale con código 1 si hay rechazos")
+    p.set_defaults(func=_importar)
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    try:
+        return args.func(args) or 0
+    except (OSError, ValueError, sqlite3.Error) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 2
@@ -0,0 +1,145 @@
+"""Amortización de deudas y comparación de estrategias de pago.
+
+Todas las estrategias se simulan a la vez: el estado es una matriz (estrategias × deudas)
+y cada mes se actualiza con operaciones de NumPy, así que el costo por mes no depende
+del número de deudas ni de estrategias más allá de la aritmética de arreglos.
+
+Cada mes: se capitaliza el interés, se paga el mínimo de cada deuda y el resto del
+presupuesto se aplica en el orden de prioridad de la estrategia. Lo que deja de pagarse
+en mínimos de deudas liquidadas se suma solo al excedente (el presupuesto es fijo).
+"""
+import numpy as np
+
+# Si una deuda no trae pago mínimo se usa este porcentaje del saldo inicial.
+MINIMO_PCT = 0.02
+MAX_MESES = 600
+EPS = 0.005
+ESTRATEGIAS = ('Avalancha', 'Bola de nieve', 'Personalizado')
+
+
+def strategy_orders(saldos, tasas, personalizado=None):
+    """Órdenes de prioridad (índices de deuda) para avalancha, bola de nieve y personalizado."""
+    saldos = np.asarray(saldos, dtype=float)
+    tasas = np.asarray(tasas, dtype=float)
+    n = len(saldos)
+    # lexsort usa la última llave como la principal; el índice desempata de forma estable.
+    avalancha = np.lexsort((np.arange(n), -tasas))
+    bola = np.lexsort((np.arange(n), saldos))
+    propio = np.asarray(personalizado if personalizado is not None else range(n), dtype=int)
+    return np.vstack([avalancha, bola, propio])
+
+
+def simulate(saldos, tasas_anuales, presupuesto, ordenes, minimos=None, max_meses=MAX_MESES):
+    """Simula el pago de todas las deudas para cada orden de prioridad.
+
+    `ordenes` es (estrategias × deudas) con índices de deuda por prioridad. Devuelve un
+    dict con arreglos por estrategia: 'saldo' (E, meses+1, D), 'pago' e 'interes'
+    (E, meses, D), 'meses' (mes de liquidación total o -1 si no se liquida dentro de
+    `max_meses` o la deuda deja de bajar), 'intereses_totales', 'pagado_total' y
+    'liquidacion' (E, D).
+    """
+    saldos = np.asarray(saldos, dtype=float)
+    tasas_m = np.asarray(tasas_anuales, dtype=float) / 12.0
+    ordenes = np.atleast_2d(np.asarray(ordenes, dtype=int))
+    minimos = np.asarray(minimos if minimos is not None else saldos * MINIMO_PCT, dtype=float)
+    estrategias, deudas = ordenes.shape
+
+    saldo = np.tile(saldos, (estrategias, 1))
+    historial = [saldo.copy()]
+    pagos, intereses = [], []
+    liquidacion = np.where(saldo > EPS, -1, 0)
+    filas = np.arange(estrategias)[:, None]
+
+    for mes in range(1, max_meses + 1):
+        if not (saldo > EPS).any():
+            break
+        interes = saldo * tasas_m
+        saldo = saldo + interes
+        pago = np.minimum(minimos, saldo)
+        excedente = np.maximum(presupuesto - pago.sum(axis=1), 0.0)
+        # Reparto del excedente en orden de prioridad: cada deuda recibe lo que quede
+        # después de cubrir por completo a las anteriores.
+        pendiente = (saldo - pago)[filas, ordenes]
+        antes = np.cumsum(pendiente, axis=1) - pendiente
+        extra_ordenado = np.clip(excedente[:, None] - antes, 0.0, pendiente)
+        extra = np.empty_like(extra_ordenado)
+        extra[filas, ordenes] = extra_ordenado
+        pago = pago + extra
+        saldo = saldo - pago
+        saldo[saldo < EPS] = 0.0
+        liquidacion[(liquidacion < 0) & (saldo == 0.0)] = mes
+        historial.append(saldo)
+        pagos.append(pago)
+        intereses.append(interes)
+        if mes % 12 == 0 and (saldo.sum(axis=1) >= historial[mes - 12].sum(axis=1) - EPS).all():
+            # Ninguna estrategia redujo la deuda en un año: el presupuesto no cubre los intereses.
+            break
+
+    saldo_hist = np.stack(historial, axis=1)
+    pago_hist = np.stack(pagos, axis=1) if pagos else np.zeros((estrategias, 0, deudas))
+    interes_hist = np.stack(intereses, axis=1) if intereses else np.zeros((estrategias, 0, deudas))
+    liquidada = (liquidacion >= 0).all(axis=1)
+    return {
+        'saldo': saldo_hist,
+        'pago': pago_hist,
+        'interes': interes_hist,
+        'liquidacion': liquidacion,
+        'meses': np.where(liquidada, liquidacion.max(axis=1), -1),
+        'intereses_totales': interes_hist.sum(axis=(1, 2)),
+        'pagado_total': pago_hist.sum(axis=(1, 2)),
+    }
+
+
+def compare_strategies(deudas, presupuesto, personalizado=None, max_meses=MAX_MESES):
+    """Simula avalancha, bola de nieve y un orden personalizado para las deudas de la sesión.
+
+    `deudas` son dicts con 'monto', 'tasa' (% anual) y opcionalmente 'minimo';
+    `personalizado` es una lista de índices en orden de prioridad.
+    """
+    saldos = [float(d['monto']) for d in deudas]
+    tasas = [float(d.get('tasa') or 0) / 100.0 for d in deudas]
+    minimos = [float(d.get('minimo') or s * MINIMO_PCT) for d, s in zip(deudas, saldos)]
+    ordenes = strategy_orders(saldos, tasas, personalizado)
+    resultado = simulate(saldos, tasas, presupuesto, ordenes, minimos, max_meses)
+    resultado['ordenes'] = ordenes
+    resultado['minimos'] = minimos
+    resultado['minimo_total'] = sum(minimos)
+    return resultado
+
+
+def summary_rows(resultado):
+    """Filas (estrategia, meses, intereses, total pagado) para tablas y reportes.
+
+    Si una estrategia no liquida, meses es -1 e intereses y total pagado son None:
+    los acumulados de una simulación cortada no significan nada.
+    """
+    filas = []
+    for i, nombre in enumerate(ESTRATEGIAS):
+        meses = int(resultado['meses'][i])
+        if meses < 0:
+            filas.append((nombre, -1, None, None))
+        else:
+            filas.append((nombre, meses, float(resultado['intereses_totales'][i]), float(resultado['pagado_total'][i])))
+    return filas
+
+
+def best_strategy(resultado):
+    """Índice de la estrategia que liquida todo pagando menos intereses (None si ninguna liquida)."""
+    liquidan = np.flatnonzero(resultado['meses'] >= 0)
+    if not len(liquidan):
+        return None
+    return int(liquidan[np.argmin(resultado['intereses_totales'][liquidan])])
+
+
+def yearly_schedule(resultado, estrategia, paso=12):
+    """Resumen del calendario de una estrategia cada `paso` meses: (mes, pagado, intereses, saldo)."""
+    pago = resultado['pago'][estrategia].sum(axis=1)
+    interes = resultado['interes'][estrategia].sum(axis=1)
+    saldo = resultado['saldo'][estrategia, 1:].sum(axis=1)
+    # La simulación corre hasta que termina la estrategia más lenta; se corta en la propia.
+    meses = int(resultado['meses'][estrategia]) if resultado['meses'][estrategia] >= 0 else len(pago)
+    filas = []
+    for inicio in range(0, meses, paso):
+        fin = min(inicio + paso, meses)
+        filas.append((fin, float(pago[inicio:fin].sum()), float(interes[inicio:fin].sum()), float(saldo[fin - 1])))
+    return filas
@@ -0,0 +1,247 @@
+"""Exportación del historial completo a Excel, escribiendo el XML del libro directamente.
+
+openpyxl (aun en modo write-only) crea objetos por celda y estilo y revisa el nombre de
+cada hoja contra todas las anteriores: ~3.5 ms por cliente y creciendo con el número de
+hojas. Aquí cada hoja es SpreadsheetML armado con plantillas y comprimido una vez; las
+hojas de cliente se guardan comprimidas en `hojas` con llave en el contenido de sus
+filas, así que entre versiones solo se rearman las de los clientes que cambiaron y las
+demás se copian tal cual al ZIP.
+"""
+import io
+import math
+import re
+import struct
+import zlib
+from xml.sax.saxutils import escape
+
+RESUMEN_COLS = ['Cliente', 'Ocupacion', 'Telefono', 'Email', 'Edad', 'Sexo']
+FINANCIAL_COLS = ['Periodo', 'Mes', 'Año', 'Ingresos', 'Egresos', 'Balance', 'Ahorro_Proyectado']
+PERSONAL_ROWS = [
+    ('Cliente', 'Cliente'), ('Ocupación', 'Ocupacion'), ('Teléfono', 'Telefono'),
+    ('Email', 'Email'), ('Edad', 'Edad'), ('Sexo', 'Sexo'),
+]
+INVALID_SHEET_CHARS = str.maketrans('', '', ':/?*[]\\')
+MAX_SHEET_TITLE = 31
+RESUMEN_WIDTH = 20
+# Caracteres de control que XML 1.0 no admite.
+_ILEGALES = re.compile(r'[\x00-\x08\x0b\x0c\x0e-\x1f]')
+
+_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+_NS_R = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+_CT_MAIN = 'application/vnd.openxmlformats-officedocument.spreadsheetml'
+_HOJA = f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{_NS}">'
+# Estilo 1: el encabezado que aplica pandas.DataFrame.to_excel (negritas, borde fino, centrado).
+_ESTILOS = (
+    f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<styleSheet xmlns="{_NS}">'
+    '<fonts count="2"><font><sz val="11"/><name val="Calibri"/></font>'
+    '<font><b/><sz val="11"/><name val="Calibri"/></font></fonts>'
+    '<fills count="2"><fill><patternFill patternType="none"/></fill><fill><patternFill patternType="gray125"/></fill></fills>'
+    '<borders count="2"><border><left/><right/><top/><bottom/><diagonal/></border>'
+    '<border><left style="thin"/><right style="thin"/><top style="thin"/><bottom style="thin"/><diagonal/></border></borders>'
+    '<cellStyleXfs count="1"><xf numFmtId="0" fontId="0" fillId="0" borderId="0"/></cellStyleXfs>'
+    '<cellXfs count="2"><xf numFmtId="0" fontId="0" fillId="0" borderId="0" xfId="0"/>'
+    '<xf numFmtId="0" fontId="1" fillId="0" borderId="1" xfId="0" applyFont="1" applyBorder="1" applyAlignment="1">'
+    '<alignment horizontal="center" vertical="top"/></xf></cellXfs>'
+    '<cellStyles count="1"><cellStyle name="Normal" xfId="0" builtinId="0"/></cellStyles></styleSheet>'
+)
+_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+    f'<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    f'<Relationship Id="rId1" Type="{_NS_R}/officeDocument" Target="xl/workbook.xml"/></Relationships>'
+)
+
+
+def sheet_title(client_name):
+    return str(client_name)[:30].translate(INVALID_SHEET_CHARS) or "Cliente"
+
+
+def _unique_title(titulo, usados):
+    """`titulo` o, si ya existe (sin distinguir mayúsculas), con el primer sufijo libre."""
+    candidato, n = titulo, 1
+    while candidato.lower() in usados:
+        sufijo = str(n)
+        candidato = titulo[:MAX_SHEET_TITLE - len(sufijo)] + sufijo
+        n += 1
+    usados.add(candidato.lower())
+    return candidato
+
+
+def group_by_client(data):
+    """Una sola pasada: registros por cliente (orden de aparición) y columnas presentes."""
+    grupos = {}
+    columnas = set()
+    for record in data:
+        grupos.setdefault(record.get('Cliente', ''), []).append(record)
+        columnas.update(record)
+    return grupos, columnas
+
+
+def _column(i):
+    letras = ''
+    while i:
+        i, resto = divmod(i - 1, 26)
+        letras = chr(65 + resto) + letras
+    return letras
+
+
+_LETRAS = [_column(i) for i in range(64)]
+
+
+def _text(valor):
+    texto = str(valor)
+    if not texto.isprintable():
+        texto = _ILEGALES.sub('', texto)
+    return escape(texto)
+
+
+def _cell(ref, valor, estilo=''):
+    tipo = type(valor)
+    if tipo is str:
+        return f'<c r="{ref}" t="inlineStr"{estilo}><is><t xml:space="preserve">{_text(valor)}</t></is></c>'
+    if valor is None:
+        return ''
+    if tipo is bool:
+        return f'<c r="{ref}" t="b"{estilo}><v>{int(valor)}</v></c>'
+    if isinstance(valor, (int, float)):
+        # Mismo formato que openpyxl: 16 cifras significativas; NaN e infinito quedan vacíos.
+        return f'<c r="{ref}"{estilo}><v>{valor:.16g}</v></c>' if math.isfinite(valor) else ''
+    return f'<c r="{ref}" t="inlineStr"{estilo}><is><t xml:space="preserve">{_text(valor)}</t></is></c>'
+
+
+def _row(n, valores, primera=1, encabezado=False):
+    estilo = ' s="1"' if encabezado else ''
+    celdas = ''.join(_cell(f'{_LETRAS[c] if c < 64 else _column(c)}{n}', v, estilo) for c, v in enumerate(valores, primera))
+    return f'<row r="{n}">{celdas}</row>'
+
+
+def _sheet(filas, cols=''):
+    return f'{_HOJA}{cols}<sheetData>{"".join(filas)}</sheetData></worksheet>'.encode('utf-8')
+
+
+def _client_sheet(financial_cols, personales, historial):
+    """Hoja de un cliente: datos personales en B2:C8 e historial financiero desde B10."""
+    filas = [_row(2, ['Dato', 'Valor'], 2, encabezado=True)]
+    filas += [_row(n, [etiqueta, valor], 2) for n, ((etiqueta, _), valor) in enumerate(zip(PERSONAL_ROWS, personales), 3)]
+    filas.append(_row(10, ['Historial Financiero'], 2))
+    filas.append(_row(11, financial_cols, 2, encabezado=True))
+    filas += [_row(n, valores, 2) for n, valores in enumerate(historial, 12)]
+    return _sheet(filas)
+
+
+def _deflate(data):
+    """(crc, tamaño, bytes en deflate crudo) de una parte del libro."""
+    comp = zlib.compressobj(6, zlib.DEFLATED, -15)
+    return zlib.crc32(data), len(data), comp.compress(data) + comp.flush()
+
+
+class _ZipWriter:
+    """ZIP mínimo (deflate, sin zip64) que acepta partes ya comprimidas con `_deflate`."""
+
+    # 1980-01-01 00:00: fecha fija, el mismo historial da el mismo archivo.
+    FECHA = 33
+
+    def __init__(self, out):
+        self.out = out
+        self.central = []
+
+    def add(self, nombre, data):
+        self.add_deflated(nombre, *_deflate(data))
+
+    def add_deflated(self, nombre, crc, tamano, comprimido):
+        nombre = nombre.encode('ascii')
+        offset = self.out.tell()
+        self.out.write(struct.pack('<IHHHHHIIIHH', 0x04034B50, 20, 0, 8, 0, self.FECHA, crc,
+                                   len(comprimido), tamano, len(nombre), 0))
+        self.out.write(nombre)
+        self.out.write(comprimido)
+        self.central.append(struct.pack('<IHHHHHHIIIHHHHHII', 0x02014B50, 20, 20, 0, 8, 0, self.FECHA, crc,
+                                        len(comprimido), tamano, len(nombre), 0, 0, 0, 0, 0, offset) + nombre)
+
+    def close(self):
+        if len(self.central) > 0xFFFF:
+            raise ValueError("Demasiadas hojas para un solo libro.")
+        inicio = self.out.tell()
+        for entrada in self.central:
+            self.out.write(entrada)
+        self.out.write(struct.pack('<IHHHHIIH', 0x06054B50, 0, 0, len(self.central), len(self.central),
+                                   self.out.tell() - inicio, inicio, 0))
+
+
+def _package(zipw, titulos):
+    """Partes fijas del libro: tipos de contenido, relaciones, índice de hojas y estilos."""
+    n = len(titulos)
+    hojas = ''.join(f'<Override PartName="/xl/worksheets/sheet{i}.xml" ContentType="{_CT_MAIN}.worksheet+xml"/>'
+                    for i in range(1, n + 1))
+    zipw.add('[Content_Types].xml', (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+        '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+        '<Default Extension="xml" ContentType="application/xml"/>'
+        f'<Override PartName="/xl/workbook.xml" ContentType="{_CT_MAIN}.sheet.main+xml"/>'
+        f'<Override PartName="/xl/styles.xml" ContentType="{_CT_MAIN}.styles+xml"/>{hojas}</Types>'
+    ).encode())
+    zipw.add('_rels/.rels', _RELS.encode())
+    relaciones = ''.join(f'<Relationship Id="rId{i}" Type="{_NS_R}/worksheet" Target="worksheets/sheet{i}.xml"/>'
+                         for i in range(1, n + 1))
+    zipw.add('xl/_rels/workbook.xml.rels', (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+        f'{relaciones}<Relationship Id="rId{n + 1}" Type="{_NS_R}/styles" Target="styles.xml"/></Relationships>'
+    ).encode())
+    indice = ''.join(f'<sheet name={_attr(t)} sheetId="{i}" r:id="rId{i}"/>' for i, t in enumerate(titulos, 1))
+    zipw.add('xl/workbook.xml', (
+        '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n'
+        f'<workbook xmlns="{_NS}" xmlns:r="{_NS_R}"><sheets>{indice}</sheets></workbook>'
+    ).encode('utf-8'))
+    zipw.add('xl/styles.xml', _ESTILOS.encode())
+
+
+def _attr(texto):
+    return '"' + _text(texto).replace('"', '&quot;') + '"'
+
+
+def generate_complex_excel(data, hojas=None):
+    """Libro con una hoja resumen y una hoja por cliente.
+
+    `hojas` es un dict opcional que se conserva entre llamadas: por cliente guarda el
+    contenido de sus filas y su hoja ya comprimida, y solo se rearman las que cambiaron.
+    Al terminar conserva solo los clientes presentes.
+    """
+    grupos, columnas = group_by_client(data)
+    cols_resumen = [c for c in RESUMEN_COLS if c in columnas]
+    financial_cols = [c for c in FINANCIAL_COLS if c in columnas]
+    usados = set()
+    titulos = [_unique_title('Resumen Clientes', usados)]
+    titulos += [_unique_title(sheet_title(nombre), usados) for nombre in grupos]
+
+    output = io.BytesIO()
+    zipw = _ZipWriter(output)
+    _package(zipw, titulos)
+
+    filas = [_row(1, cols_resumen, encabezado=True)]
+    for n, client_name in enumerate(sorted(grupos, key=str), 2):
+        ultimo = max(grupos[client_name], key=lambda r: r.get('id', 0))
+        filas.append(_row(n, [ultimo.get(c) for c in cols_resumen]))
+    anchos = ''.join(f'<col min="{i}" max="{i}" width="{RESUMEN_WIDTH}" customWidth="1"/>' for i in range(1, len(cols_resumen) + 1))
+    cols = f'<cols>{anchos}</cols>' if anchos else ''
+    zipw.add('xl/worksheets/sheet1.xml', _sheet(filas, cols))
+
+    previas = hojas if hojas is not None else {}
+    for i, (client_name, registros) in enumerate(grupos.items(), 2):
+        ultimo = registros[-1]
+        llave = (
+            tuple(financial_cols),
+            tuple(ultimo.get(campo, '') for _, campo in PERSONAL_ROWS),
+            tuple(tuple(record.get(c) for c in financial_cols) for record in registros),
+        )
+        hoja = previas.get(client_name)
+        if hoja is None or hoja[0] != llave:
+            hoja = (llave, *_deflate(_client_sheet(*llave)))
+            if hojas is not None:
+                hojas[client_name] = hoja
+        zipw.add_deflated(f'xl/worksheets/sheet{i}.xml', *hoja[1:])
+    if hojas is not None:
+        for client_name in hojas.keys() - grupos.keys():
+            hojas.pop(client_name, None)
+    zipw.close()
+    return output.getvalue()
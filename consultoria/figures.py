@@ -0,0 +1,118 @@
+"""Figuras de Plotly de la app, construidas con graph_objects y reutilizadas entre reruns.
+
+Plotly Express arma un DataFrame y valida cada trazo en cada llamada (decenas de ms por
+gráfica); aquí las figuras se construyen directamente y se guardan en un LRU por proceso
+con llave en sus entradas (totales, colores, horizonte, supuestos), así que una gráfica
+que no cambió no se vuelve a construir. Las series largas se submuestrean antes de
+enviarse al navegador. Las figuras devueltas se comparten: no deben modificarse.
+"""
+from functools import lru_cache
+
+import numpy as np
+import plotly.graph_objects as go
+
+from .debts import ESTRATEGIAS, compare_strategies
+from .projections import monte_carlo, project
+
+FIGURE_CACHE_SIZE = 64
+# Puntos por serie que se envían al navegador; a este ancho no se distinguen más.
+MAX_POINTS = 240
+BAND_FILL = "rgba(0, 122, 255, 0.15)"
+TRANSPARENT = "rgba(0,0,0,0)"
+
+
+def downsample_index(n, max_points=MAX_POINTS):
+    """Índices para reducir una serie de `n` puntos a `max_points`, con el primero y el último."""
+    if n <= max_points:
+        return slice(None)
+    return np.unique(np.linspace(0, n - 1, max_points).round().astype(int))
+
+
+def _layout(fig, text_color, **kwargs):
+    fig.update_layout(paper_bgcolor=TRANSPARENT, plot_bgcolor=TRANSPARENT, font=dict(color=text_color), **kwargs)
+    return fig
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def donut_figure(ingresos, gastos, colores, text_color, hole=0.5, centro=None, alto=None):
+    """Dona de Ingresos/Egresos; con `centro` se muestra ese texto al medio y sin leyenda."""
+    fig = go.Figure(go.Pie(
+        labels=['Ingresos', 'Egresos'], values=[ingresos, gastos],
+        marker=dict(colors=list(colores)), hole=hole,
+    ))
+    if centro is None:
+        return _layout(fig, text_color)
+    fig.add_annotation(text=centro, x=0.5, y=0.5, showarrow=False, font=dict(size=16, color=text_color, weight="bold"))
+    return _layout(fig, text_color, showlegend=False, margin=dict(t=0, b=0, l=0, r=0), height=alto)
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def _bands(ahorro, meses, tasa, volatilidad, crecimiento):
+    """Bandas Monte Carlo; no dependen de la inflación, así que se reutilizan al cambiarla."""
+    return monte_carlo(ahorro, meses, tasa, volatilidad, crecimiento)
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def projection_figure(ahorro, meses, tasa, inflacion, crecimiento, volatilidad, colores, text_color):
+    """Capital proyectado, banda P10–P90 si hay volatilidad y valor real si hay inflación.
+
+    `colores` es (capital, valor real).
+    """
+    proy = project(ahorro, meses, tasa, inflacion, crecimiento)
+    idx = downsample_index(meses)
+    mes = proy['mes'][idx]
+    color_capital, color_real = colores
+    fig = go.Figure(go.Scatter(
+        x=mes, y=proy['capital'][idx], mode="lines", fill="tozeroy", line=dict(color=color_capital),
+        name="Total", showlegend=False,
+    ))
+    if volatilidad:
+        bandas = _bands(ahorro, meses, tasa, volatilidad, crecimiento)
+        fig.add_scatter(x=mes, y=bandas['p90'][idx], mode="lines", line=dict(width=0), name="P90", showlegend=False)
+        fig.add_scatter(x=mes, y=bandas['p10'][idx], mode="lines", line=dict(width=0), fill="tonexty",
+                        fillcolor=BAND_FILL, name="Rango P10–P90")
+    if inflacion:
+        fig.add_scatter(x=mes, y=proy['real'][idx], mode="lines", line=dict(color=color_real, dash="dash"), name="Valor real (hoy)")
+    return _layout(fig, text_color, title="Crecimiento del Capital", xaxis_title="Mes", yaxis_title="Total")
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def debt_figure(deudas, presupuesto, personalizado, text_color):
+    """Saldo total por estrategia. `deudas` es una tupla de (monto, tasa, mínimo)."""
+    plan = compare_strategies(
+        [{'monto': m, 'tasa': t, 'minimo': minimo} for m, t, minimo in deudas], presupuesto, list(personalizado)
+    )
+    saldos = plan['saldo'].sum(axis=2)
+    idx = downsample_index(saldos.shape[1])
+    mes = np.arange(saldos.shape[1])[idx]
+    fig = go.Figure([go.Scatter(x=mes, y=saldos[i][idx], mode="lines", name=nombre) for i, nombre in enumerate(ESTRATEGIAS)])
+    return _layout(fig, text_color, title="Saldo Total por Estrategia", xaxis_title="Mes", yaxis_title="Saldo",
+                   legend_title_text="Estrategia")
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def trend_figure(periodos, ingresos, egresos, balance, promedio, colores, text_color):
+    """Ingresos, Egresos y Balance por mes de un cliente, con el promedio acumulado del balance.
+
+    Las series son tuplas alineadas con `periodos`; `colores` es (ingresos, egresos, balance).
+    """
+    color_ingreso, color_gasto, color_balance = colores
+    fig = go.Figure([
+        go.Bar(x=periodos, y=ingresos, name="Ingresos", marker_color=color_ingreso),
+        go.Bar(x=periodos, y=egresos, name="Egresos", marker_color=color_gasto),
+        go.Scatter(x=periodos, y=balance, mode="lines+markers", name="Balance", line=dict(color=color_balance)),
+        go.Scatter(x=periodos, y=promedio, mode="lines", name="Balance promedio", line=dict(color=color_balance, dash="dot")),
+    ])
+    return _layout(fig, text_color, barmode="group", xaxis_type="category", margin=dict(t=30, b=0, l=0, r=0),
+                   legend=dict(orientation="h"))
+
+
+@lru_cache(maxsize=FIGURE_CACHE_SIZE)
+def balance_histogram_figure(desde, hasta, clientes, color, text_color):
+    """Histograma de balances de la cartera a partir de los bordes y conteos ya calculados."""
+    centros = [(a + b) / 2 for a, b in zip(desde, hasta)]
+    anchos = [b - a for a, b in zip(desde, hasta)]
+    fig = go.Figure(go.Bar(x=centros, y=clientes, width=anchos, marker_color=color, name="Clientes"))
+    fig.add_vline(x=0, line_dash="dot", line_color=text_color)
+    return _layout(fig, text_color, title="Distribución de Balances", xaxis_title="Balance", yaxis_title="Clientes",
+                   bargap=0.05, margin=dict(t=40, b=0, l=0, r=0))
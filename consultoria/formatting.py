@@ -0,0 +1,18 @@
+"""Formato de montos y periodos usado en la app y en los reportes."""
+
+MESES = ("Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto",
+         "Septiembre", "Octubre", "Noviembre", "Diciembre")
+
+
+def format_money(amount):
+    return f"${amount:,.2f}"
+
+
+def format_years(meses):
+    years = meses / 12
+    if meses < 12:
+        return f"{meses} Meses"
+    elif meses % 12 == 0:
+        return f"{int(years)} Años"
+    else:
+        return f"{meses} Meses ({years:.1f} Años)"
@@ -0,0 +1,170 @@
+"""Historial de cortes con un índice por cliente mantenido en cada alta, edición o baja."""
+import threading
+from collections import Counter
+
+
+class Historial:
+    """Registros del historial en orden de alta, indexados también por cliente.
+
+    Las consultas de un cliente (sus registros, su último perfil, sus periodos) cuestan
+    O(registros del cliente), no O(base completa). Las ediciones llegan como altas o
+    bajas de registros sueltos desde `SharedHistory.sync`.
+    """
+
+    def __init__(self, records=()):
+        self._registros = {}
+        self._por_cliente = {}
+        for record in records:
+            self.append(record)
+
+    def __len__(self):
+        return len(self._registros)
+
+    def __iter__(self):
+        return iter(self._registros.values())
+
+    def append(self, record):
+        """Alta o reemplazo de un registro; si cambió de cliente, se mueve de índice."""
+        previo = self._registros.get(record['id'])
+        if previo is not None and previo.get('Cliente', '') != record.get('Cliente', ''):
+            self.discard(record['id'])
+        self._registros[record['id']] = record
+        self._por_cliente.setdefault(record.get('Cliente', ''), {})[record['id']] = record
+
+    def discard(self, record_id):
+        record = self._registros.pop(record_id, None)
+        if record is None:
+            return
+        cliente = record.get('Cliente', '')
+        registros = self._por_cliente.get(cliente, {})
+        registros.pop(record_id, None)
+        if not registros:
+            self._por_cliente.pop(cliente, None)
+
+    def clientes(self):
+        """Nombres de cliente en orden de primera aparición."""
+        return list(self._por_cliente)
+
+    def registros(self, cliente):
+        return list(self._por_cliente.get(cliente, {}).values())
+
+    def ultimo(self, cliente):
+        """Registro más reciente del cliente (el que tiene su perfil vigente)."""
+        registros = self._por_cliente.get(cliente)
+        return next(reversed(registros.values())) if registros else None
+
+    def periodos(self, cliente):
+        return [r.get('Periodo') for r in self._por_cliente.get(cliente, {}).values()]
+
+
+class SharedHistory:
+    """Un solo historial por proceso, compartido por todas las sesiones.
+
+    Las escrituras van primero al `RecordStore` (SQLite serializa a los escritores de
+    cualquier proceso y cada alta es atómica) y luego se aplican aquí. `sync()` compara
+    la versión del almacén y trae solo las filas cambiadas desde la última lectura, así
+    que cada sesión ve los cortes guardados por las demás sin recargar la base.
+
+    La carga es perezosa: la primera sincronización solo lee el directorio de clientes
+    (nombre y número de cortes, sin decodificar registros); los registros de un cliente
+    se leen la primera vez que se consultan y la base completa solo al recorrerla.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.version = None
+        self._clientes = {}
+        self._historial = Historial()
+        self._cargados = set()
+        self._completo = False
+        self._lock = threading.RLock()
+
+    def sync(self):
+        """Aplica los cambios del almacén posteriores a la última versión vista."""
+        if self.version is not None and self.store.version == self.version:
+            return False
+        with self._lock:
+            cambios = None
+            if self.version is not None:
+                cambios, version = self.store.changes_since(self.version)
+            if cambios is None:
+                filas, version = self.store.clients()
+                self._clientes = dict(filas)
+                self._historial = Historial()
+                self._cargados = set()
+                self._completo = False
+            elif cambios:
+                for record_id, record in cambios:
+                    if record is not None and self._loaded(record.get('Cliente', '')):
+                        self._historial.append(record)
+                    else:
+                        self._historial.discard(record_id)
+                self._clientes = dict(self.store.clients()[0])
+            self.version = version
+        return True
+
+    def _loaded(self, cliente):
+        return self._completo or cliente in self._cargados
+
+    def _load_client(self, cliente):
+        if not self._loaded(cliente):
+            for record in self.store.client_records(cliente):
+                self._historial.append(record)
+            self._cargados.add(cliente)
+
+    def _load_all(self):
+        if self._completo:
+            return
+        version, registros = self.store.stream()
+        self._historial = Historial(registros)
+        self._clientes = dict(Counter(r.get('Cliente', '') for r in self._historial))
+        self._completo = True
+        self.version = version
+
+    # --- Lecturas (copias, para no exponer los dicts internos a otros hilos) ---
+
+    def __len__(self):
+        return sum(self._clientes.values())
+
+    def __iter__(self):
+        with self._lock:
+            self._load_all()
+            return iter(list(self._historial))
+
+    def clientes(self):
+        """Nombres de cliente en orden de primera alta; no decodifica registros."""
+        with self._lock:
+            return list(self._clientes)
+
+    def registros(self, cliente):
+        with self._lock:
+            self._load_client(cliente)
+            return self._historial.registros(cliente)
+
+    def ultimo(self, cliente):
+        with self._lock:
+            self._load_client(cliente)
+            return self._historial.ultimo(cliente)
+
+    def periodos(self, cliente):
+        with self._lock:
+            self._load_client(cliente)
+            return self._historial.periodos(cliente)
+
+    # --- Escrituras ---
+
+    def append(self, record):
+        self.store.append(record)
+        self.sync()
+
+    def update_client(self, cliente, cambios):
+        self.store.update_client(cliente, cambios)
+        self.sync()
+
+    def update_record(self, record_id, cambios):
+        self.store.update_record(record_id, cambios)
+        self.sync()
+
+    def remove_client(self, cliente):
+        self.store.delete_client(cliente)
+        self.sync()
@@ -0,0 +1,229 @@
+"""Importación masiva de estados de cuenta (CSV/XLSX) al libro de movimientos.
+
+El archivo se lee por bloques y cada bloque se valida y normaliza con operaciones
+vectorizadas de pandas; las filas inválidas se reportan con su número y motivo.
+"""
+import csv
+import io
+import unicodedata
+from datetime import datetime
+
+import pandas as pd
+from openpyxl import load_workbook
+
+CHUNK_ROWS = 50_000
+# Máximo de rechazos que se conservan con detalle; el total se cuenta siempre.
+MAX_REJECT_SAMPLES = 1_000
+
+# Nombres de columna aceptados (ya normalizados: minúsculas y sin acentos).
+ALIASES = {
+    'fecha': ('fecha', 'fecha operacion', 'fecha movimiento', 'date'),
+    'concepto': ('concepto', 'descripcion', 'detalle', 'referencia', 'description', 'concept'),
+    'monto': ('monto', 'importe', 'cantidad', 'amount', 'valor'),
+    'tipo': ('tipo', 'tipo movimiento', 'type'),
+    'cargo': ('cargo', 'cargos', 'retiro', 'retiros', 'debito', 'debit'),
+    'abono': ('abono', 'abonos', 'deposito', 'depositos', 'credito', 'credit'),
+}
+TIPO_VALUES = {
+    'ingreso': 'Ingreso', 'abono': 'Ingreso', 'deposito': 'Ingreso', 'credito': 'Ingreso',
+    'income': 'Ingreso', 'credit': 'Ingreso',
+    'gasto': 'Gasto', 'egreso': 'Gasto', 'cargo': 'Gasto', 'retiro': 'Gasto', 'debito': 'Gasto',
+    'expense': 'Gasto', 'debit': 'Gasto',
+}
+
+
+class StatementError(ValueError):
+    """El archivo no tiene las columnas mínimas para importarse."""
+
+
+def normalize_text(value):
+    """Minúsculas, sin acentos y sin espacios sobrantes."""
+    value = unicodedata.normalize('NFKD', str(value))
+    return ''.join(c for c in value if not unicodedata.combining(c)).strip().lower()
+
+
+def _map_columns(columns):
+    mapping = {}
+    normalizadas = {normalize_text(c): c for c in columns}
+    for campo, aliases in ALIASES.items():
+        for alias in aliases:
+            if alias in normalizadas:
+                mapping[campo] = normalizadas[alias]
+                break
+    if 'concepto' not in mapping or not ('monto' in mapping or 'cargo' in mapping or 'abono' in mapping):
+        raise StatementError("El archivo debe tener una columna de concepto y una de monto (o cargo/abono).")
+    return mapping
+
+
+def parse_amounts(values):
+    """Convierte textos como '$1,234.50', '1.234,50' o '(200)' a float; NaN si no es un número."""
+    s = values.astype('string').str.strip().str.replace(r'[\s$€]', '', regex=True)
+    negativo = s.str.startswith('(') & s.str.endswith(')')
+    s = s.str.strip('()')
+    coma_decimal = s.str.contains(r',\d{1,2}$', regex=True) & ~s.str.contains(r'\.\d{1,2}$', regex=True)
+    s = s.where(~coma_decimal, s.str.replace('.', '', regex=False).str.replace(',', '.', regex=False))
+    s = s.where(coma_decimal, s.str.replace(',', '', regex=False))
+    montos = pd.to_numeric(s, errors='coerce').astype('float64')
+    return montos.where(~negativo.fillna(False), -montos)
+
+
+def parse_dates(values):
+    """Fechas ISO o dd/mm/aaaa (las de los bancos locales); NaT si no se reconocen.
+
+    Cada formato fijo se resuelve en una sola pasada vectorizada; solo lo que no encaja
+    en ninguno pasa por el parser flexible, que es mucho más lento.
+    """
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return values
+    texto = values.astype('string').str.strip().str.split(' ').str[0]
+    fechas = pd.to_datetime(texto, format='%Y-%m-%d', errors='coerce')
+    for formato in ('%d/%m/%Y', '%d-%m-%Y', '%d/%m/%y'):
+        faltan = fechas.isna() & texto.notna()
+        if not faltan.any():
+            return fechas
+        fechas = fechas.fillna(pd.to_datetime(texto.where(faltan), format=formato, errors='coerce'))
+    faltan = fechas.isna() & texto.notna()
+    if faltan.any():
+        fechas = fechas.fillna(pd.to_datetime(texto.where(faltan), format='mixed', dayfirst=True, errors='coerce'))
+    return fechas
+
+
+def normalize_chunk(df, mapping, first_row, hoy):
+    """Valida y normaliza un bloque. Devuelve (DataFrame válido, DataFrame de rechazos).
+
+    Las filas se numeran por su posición en el archivo a partir de `first_row`; las
+    completamente vacías se descartan después de numerar, sin contarlas como rechazo.
+    """
+    df = df.set_axis(pd.RangeIndex(first_row, first_row + len(df)))
+    df = df[df.notna().any(axis=1)]
+    fila = df.index
+    concepto = df[mapping['concepto']].astype('string').str.strip()
+
+    if 'monto' in mapping:
+        monto = parse_amounts(df[mapping['monto']])
+        # Sin columna de tipo (o con la celda vacía) manda el signo del monto.
+        tipo = pd.Series('Gasto', index=fila).where(monto.lt(0), 'Ingreso').where(monto.notna())
+        if 'tipo' in mapping:
+            crudo = df[mapping['tipo']].astype('string').str.strip()
+            vacio = crudo.isna() | crudo.eq('')
+            explicito = crudo.map(normalize_text, na_action='ignore').map(TIPO_VALUES)
+            tipo = explicito.where(~vacio, tipo)
+    else:
+        cargo = parse_amounts(df[mapping['cargo']]) if 'cargo' in mapping else pd.Series(float('nan'), index=fila)
+        abono = parse_amounts(df[mapping['abono']]) if 'abono' in mapping else pd.Series(float('nan'), index=fila)
+        es_abono = abono.fillna(0).ne(0)
+        monto = abono.where(es_abono, cargo)
+        tipo = pd.Series('Gasto', index=fila).where(~es_abono, 'Ingreso').where(monto.notna())
+    monto = monto.abs()
+
+    if 'fecha' in mapping:
+        fechas = parse_dates(df[mapping['fecha']])
+        fecha = fechas.dt.strftime('%Y-%m-%d')
+        fecha_invalida = fechas.isna() & df[mapping['fecha']].notna()
+        fecha = fecha.fillna(hoy)
+    else:
+        fecha = pd.Series(hoy, index=fila)
+        fecha_invalida = pd.Series(False, index=fila)
+
+    motivo = pd.Series(pd.NA, index=fila, dtype='string')
+    motivo = motivo.mask(fecha_invalida, 'fecha inválida')
+    motivo = motivo.mask(tipo.isna(), 'tipo no reconocido')
+    motivo = motivo.mask(monto.isna() | monto.eq(0), 'monto inválido o cero')
+    motivo = motivo.mask(concepto.isna() | concepto.eq(''), 'concepto vacío')
+    rechazados = motivo.notna()
+
+    validos = pd.DataFrame({'fecha': fecha, 'concepto': concepto, 'monto': monto, 'tipo': tipo})[~rechazados]
+    rechazos = pd.DataFrame({'fila': fila[rechazados.to_numpy()], 'motivo': motivo[rechazados]})
+    return validos, rechazos
+
+
+def _csv_chunks(raw):
+    muestra = raw.read(4096)
+    raw.seek(0)
+    try:
+        sep = csv.Sniffer().sniff(muestra.decode('utf-8', 'replace'), delimiters=',;\t|').delimiter
+    except csv.Error:
+        sep = ','
+    # Las líneas en blanco se conservan para no desfasar los números de fila.
+    with pd.read_csv(raw, sep=sep, dtype=str, chunksize=CHUNK_ROWS, encoding='utf-8-sig',
+                     encoding_errors='replace', skip_blank_lines=False) as lector:
+        yield from lector
+
+
+def _xlsx_chunks(raw):
+    wb = load_workbook(raw, read_only=True, data_only=True)
+    try:
+        filas = wb.active.iter_rows(values_only=True)
+        encabezado = [str(c) if c is not None else '' for c in next(filas, [])]
+        bloque, vacias = [], 0
+        for fila in filas:
+            # Las filas vacías cuentan para la numeración, pero solo se agregan si después
+            # viene una con datos: las del final de la hoja no llegan a memoria.
+            if all(v is None for v in fila):
+                vacias += 1
+                continue
+            bloque.extend([(None,) * len(fila)] * vacias)
+            bloque.append(fila)
+            vacias = 0
+            if len(bloque) >= CHUNK_ROWS:
+                yield pd.DataFrame(bloque, columns=encabezado)
+                bloque = []
+        if bloque:
+            yield pd.DataFrame(bloque, columns=encabezado)
+    finally:
+        wb.close()
+
+
+def read_statement(file, nombre):
+    """Itera el archivo en bloques de DataFrame según su extensión.
+
+    `file` es un objeto con `read()` o una ruta; en ese caso el archivo se cierra al
+    terminar de leerlo.
+    """
+    if not hasattr(file, 'read'):
+        with open(file, 'rb') as raw:
+            yield from read_statement(raw, nombre)
+        return
+    raw = file if hasattr(file, 'seek') else io.BytesIO(file.read())
+    if str(nombre).lower().endswith(('.xlsx', '.xlsm')):
+        yield from _xlsx_chunks(raw)
+    else:
+        yield from _csv_chunks(raw)
+
+
+class ImportResult:
+    __slots__ = ('columnas', 'aceptados', 'rechazados', 'muestras')
+
+    def __init__(self):
+        self.columnas = {'fecha': [], 'concepto': [], 'monto': [], 'tipo': []}
+        self.aceptados = 0
+        self.rechazados = 0
+        self.muestras = []
+
+
+def import_statement(file, nombre, hoy=None):
+    """Lee y normaliza un estado de cuenta completo, bloque a bloque.
+
+    Devuelve un ImportResult con los movimientos válidos en formato columnar (listo
+    para `Ledger.extend`) y los rechazos (fila del archivo y motivo).
+    """
+    hoy = hoy or datetime.now().strftime('%Y-%m-%d')
+    resultado = ImportResult()
+    mapping = None
+    # La fila 1 es el encabezado: la primera fila de datos es la 2, como en Excel.
+    siguiente_fila = 2
+    for chunk in read_statement(file, nombre):
+        if mapping is None:
+            mapping = _map_columns(chunk.columns)
+        validos, rechazos = normalize_chunk(chunk, mapping, siguiente_fila, hoy)
+        siguiente_fila += len(chunk)
+        for campo, valores in resultado.columnas.items():
+            valores.extend(validos[campo].tolist())
+        resultado.aceptados += len(validos)
+        resultado.rechazados += len(rechazos)
+        faltan = MAX_REJECT_SAMPLES - len(resultado.muestras)
+        if faltan > 0:
+            resultado.muestras.extend(rechazos.head(faltan).itertuples(index=False, name=None))
+    if mapping is None:
+        raise StatementError("El archivo está vacío.")
+    return resultado
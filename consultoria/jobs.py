@@ -0,0 +1,168 @@
+"""Trabajos en segundo plano: guardados, PDFs y exportaciones fuera del rerun.
+
+Un `JobRunner` por proceso ejecuta los trabajos en un pool de hilos con una cola
+acotada. `submit()` regresa de inmediato con el id del trabajo (o `QueueFull` si ya hay
+demasiados pendientes) y la interfaz consulta su estado, progreso y resultado en cada
+rerun. Los trabajos de CPU que ya reparten su carga en procesos (los reportes por lote)
+lo siguen haciendo dentro del hilo del trabajo.
+
+Los tipos de `DEDICATED` tienen hilos y cupo propios: un guardado no espera detrás de
+un lote o una exportación larga. Los resultados grandes (ZIPs) van a un `FileResult`
+en disco, que se borra cuando el trabajo se descarta.
+"""
+import itertools
+import os
+import tempfile
+import threading
+import time
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_WORKERS = 2
+# Trabajos en cola o en curso que acepta cada grupo de hilos; los demás se rechazan.
+MAX_PENDING = 8
+# Hilos propios por tipo de trabajo.
+DEDICATED = {'guardar': 1}
+# Trabajos terminados que se conservan para que las sesiones lean su resultado.
+MAX_FINISHED = 32
+
+EN_COLA = 'en cola'
+EN_CURSO = 'en curso'
+LISTO = 'listo'
+FALLIDO = 'error'
+
+
+class QueueFull(RuntimeError):
+    """La cola de trabajos del proceso está llena."""
+
+
+def _remove(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+class FileResult:
+    """Resultado de un trabajo escrito en un archivo temporal en vez de en memoria.
+
+    El archivo se borra con `close()` (al descartar el trabajo) o, a más tardar, cuando
+    el objeto se recolecta o termina el proceso.
+    """
+
+    def __init__(self, suffix=''):
+        fd, self.path = tempfile.mkstemp(prefix='trabajo-', suffix=suffix)
+        os.close(fd)
+        self._borrar = weakref.finalize(self, _remove, self.path)
+
+    @property
+    def size(self):
+        return os.path.getsize(self.path)
+
+    def read(self):
+        """Contenido completo; se llama solo al descargarlo."""
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def close(self):
+        self._borrar()
+
+
+def _close(resultado):
+    if isinstance(resultado, FileResult):
+        resultado.close()
+
+
+class Job:
+    """Estado de un trabajo: lo escribe el hilo que lo ejecuta y lo leen los reruns."""
+
+    def __init__(self, job_id, tipo, etiqueta):
+        self.id = job_id
+        self.tipo = tipo
+        self.etiqueta = etiqueta
+        self.estado = EN_COLA
+        self.progreso = 0.0
+        self.mensaje = ''
+        self.resultado = None
+        self.error = None
+        self.creado = time.time()
+        self.terminado = None
+
+    @property
+    def activo(self):
+        return self.estado in (EN_COLA, EN_CURSO)
+
+    def progress(self, fraccion, mensaje=None):
+        """Callback que recibe la función del trabajo: avance entre 0 y 1 y un texto opcional."""
+        self.progreso = min(max(float(fraccion), 0.0), 1.0)
+        if mensaje is not None:
+            self.mensaje = mensaje
+
+
+class JobRunner:
+    """Pools de hilos con cola acotada y registro de los trabajos recientes.
+
+    Cada tipo de `dedicated` ({tipo: hilos}) tiene su propio pool; los demás comparten
+    uno de `max_workers` hilos. `max_pending` se cuenta por pool.
+    """
+
+    def __init__(self, max_workers=MAX_WORKERS, max_pending=MAX_PENDING, max_finished=MAX_FINISHED,
+                 dedicated=DEDICATED):
+        self.max_pending = max_pending
+        self.max_finished = max_finished
+        self._pool = ThreadPoolExecutor(max_workers, thread_name_prefix='trabajo')
+        self._dedicados = {
+            tipo: ThreadPoolExecutor(hilos, thread_name_prefix=f'trabajo-{tipo}') for tipo, hilos in dedicated.items()
+        }
+        self._jobs = OrderedDict()
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def submit(self, tipo, fn, *args, etiqueta='', **kwargs):
+        """Encola `fn(progress, *args, **kwargs)` y devuelve el id del trabajo."""
+        pool = self._dedicados.get(tipo, self._pool)
+        with self._lock:
+            pendientes = sum(job.activo and self._dedicados.get(job.tipo, self._pool) is pool for job in self._jobs.values())
+            if pendientes >= self.max_pending:
+                raise QueueFull(f"Hay {self.max_pending} trabajos pendientes.")
+            job = Job(f"{tipo}-{next(self._ids)}", tipo, etiqueta or tipo)
+            self._jobs[job.id] = job
+            self._prune()
+        pool.submit(self._run, job, fn, args, kwargs)
+        return job.id
+
+    def _run(self, job, fn, args, kwargs):
+        job.estado = EN_CURSO
+        try:
+            job.resultado = fn(job.progress, *args, **kwargs)
+            job.progreso = 1.0
+            job.estado = LISTO
+        except Exception as e:
+            job.error = str(e) or type(e).__name__
+            job.estado = FALLIDO
+        finally:
+            job.terminado = time.time()
+
+    def _prune(self):
+        terminados = [job_id for job_id, job in self._jobs.items() if not job.activo]
+        for job_id in terminados[:max(0, len(terminados) - self.max_finished)]:
+            _close(self._jobs.pop(job_id).resultado)
+
+    def get(self, job_id):
+        """El trabajo `job_id`, o None si no existe o ya se descartó."""
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def stats(self):
+        with self._lock:
+            estados = [job.estado for job in self._jobs.values()]
+        return {estado: estados.count(estado) for estado in (EN_COLA, EN_CURSO, LISTO, FALLIDO)}
+
+    def shutdown(self, wait=True):
+        for pool in (self._pool, *self._dedicados.values()):
+            pool.shutdown(wait=wait)
+        with self._lock:
+            for job in self._jobs.values():
+                if not job.activo:
+                    _close(job.resultado)
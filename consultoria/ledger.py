@@ -0,0 +1,149 @@
+"""Movimientos del cliente en sesión, con totales por tipo mantenidos al vuelo."""
+import time
+from itertools import islice
+
+from .search import SearchIndex
+
+TIPOS = ('Ingreso', 'Gasto')
+COLUMNAS = ['id', 'fecha', 'concepto', 'monto', 'tipo']
+
+
+class Transaccion:
+    """Un movimiento; con `__slots__` ocupa una fracción de lo que ocupa un dict."""
+
+    __slots__ = tuple(COLUMNAS)
+
+    def __init__(self, id, fecha, concepto, monto, tipo):
+        self.id = id
+        self.fecha = fecha
+        self.concepto = concepto
+        self.monto = monto
+        self.tipo = tipo
+
+    def to_dict(self):
+        return {c: getattr(self, c) for c in COLUMNAS}
+
+
+class Ledger:
+    """Movimientos indexados por id, con totales y conteos actualizados en cada cambio.
+
+    El dict interno conserva el orden de alta y da búsqueda, edición y baja en O(1);
+    leer el balance también es O(1) y el DataFrame solo se arma cuando se pide. El
+    índice de conceptos se arma con la primera búsqueda y después se mantiene en cada
+    cambio.
+    """
+
+    def __init__(self, transacciones=None):
+        self._items = {}
+        self._indice = None
+        self._ultimo_id = 0
+        self.totales = dict.fromkeys(TIPOS, 0.0)
+        self.conteos = dict.fromkeys(TIPOS, 0)
+        for t in transacciones or []:
+            self.add(t)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items.values())
+
+    def __reversed__(self):
+        return reversed(self._items.values())
+
+    def _sumar(self, t, signo):
+        tipo = t.tipo
+        self.totales[tipo] += signo * t.monto
+        self.conteos[tipo] += signo
+        if not self.conteos[tipo]:
+            # Sin movimientos del tipo, el total vuelve a cero exacto (sin residuo flotante).
+            self.totales[tipo] = 0.0
+
+    def get(self, tx_id):
+        return self._items.get(tx_id)
+
+    def add(self, t):
+        if isinstance(t, dict):
+            t = Transaccion(**t)
+        if t.id in self._items:
+            self.remove(t.id)
+        self._items[t.id] = t
+        self._ultimo_id = max(self._ultimo_id, t.id)
+        self._sumar(t, 1)
+        if self._indice is not None:
+            self._indice.add(t.id, {'concepto': t.concepto})
+
+    def nuevo_id(self):
+        """Id en milisegundos que no choca con los ya asignados (una importación reserva varios)."""
+        return max(int(time.time() * 1000), self._ultimo_id + 1)
+
+    def extend(self, columnas):
+        """Alta en lote desde columnas fecha/concepto/monto/tipo; asigna ids consecutivos.
+
+        Los totales se acumulan por tipo una sola vez para todo el lote.
+        """
+        inicio = self.nuevo_id()
+        nuevos = list(map(Transaccion, range(inicio, inicio + len(columnas['monto'])),
+                          columnas['fecha'], columnas['concepto'], columnas['monto'], columnas['tipo']))
+        if not nuevos:
+            return 0
+        self._items.update((t.id, t) for t in nuevos)
+        self._ultimo_id = nuevos[-1].id
+        if self._indice is not None:
+            self._indice.add_many((t.id, {'concepto': t.concepto}) for t in nuevos)
+        for tipo in TIPOS:
+            montos = [t.monto for t in nuevos if t.tipo == tipo]
+            self.totales[tipo] += sum(montos)
+            self.conteos[tipo] += len(montos)
+        return len(nuevos)
+
+    def update(self, tx_id, **cambios):
+        t = self._items.get(tx_id)
+        if t is None:
+            return
+        self._sumar(t, -1)
+        for campo, valor in cambios.items():
+            setattr(t, campo, valor)
+        self._sumar(t, 1)
+        if self._indice is not None and 'concepto' in cambios:
+            self._indice.add(tx_id, {'concepto': t.concepto})
+
+    def remove(self, tx_id):
+        t = self._items.pop(tx_id, None)
+        if t is not None:
+            self._sumar(t, -1)
+            if self._indice is not None:
+                self._indice.remove(tx_id)
+
+    def contar(self, tipo=None):
+        return self.conteos[tipo] if tipo else len(self._items)
+
+    def pagina(self, inicio, cantidad, tipo=None):
+        """Ventana de movimientos del más reciente al más antiguo, opcionalmente de un solo tipo."""
+        items = reversed(self._items.values())
+        if tipo:
+            items = (t for t in items if t.tipo == tipo)
+        return list(islice(items, inicio, inicio + cantidad))
+
+    def buscar(self, consulta, tipo=None):
+        """Movimientos cuyo concepto coincide con `consulta` (sin acentos y tolerando
+        errores de tecleo), del más relevante al menos; opcionalmente de un solo tipo."""
+        if self._indice is None:
+            self._indice = SearchIndex({'concepto': 1.0})
+            self._indice.add_many((t.id, {'concepto': t.concepto}) for t in self._items.values())
+        encontrados = (self._items[tx_id] for tx_id in self._indice.search(consulta))
+        return [t for t in encontrados if not tipo or t.tipo == tipo]
+
+    def balance(self):
+        """(ingresos, gastos, balance) sin recorrer los movimientos."""
+        ingresos, gastos = self.totales['Ingreso'], self.totales['Gasto']
+        return ingresos, gastos, ingresos - gastos
+
+    def columnas(self):
+        """Los movimientos en formato columnar (dict de listas), listo para pandas o para hashear."""
+        items = self._items.values()
+        return {c: [getattr(t, c) for t in items] for c in COLUMNAS}
+
+    def to_frame(self):
+        import pandas as pd
+        return pd.DataFrame(self.columnas(), columns=COLUMNAS)
@@ -0,0 +1,142 @@
+"""Analítica de cartera: totales, distribución de balances y desgloses de todos los clientes.
+
+Se mantiene una copia columnar tipada del historial (un DataFrame indexado por id, con
+categorías para Cliente y Sexo y float64 para los montos). Se arma una vez con las
+columnas tipadas del almacén (un SELECT, sin decodificar registros) y después solo se le
+aplican las filas que cambiaron desde la última versión.
+Cada indicador sale de una pasada vectorizada (groupby, cut, histogram) sobre el último
+corte de cada cliente, y el resumen se guarda mientras no cambie la versión del almacén.
+"""
+import threading
+
+import numpy as np
+import pandas as pd
+
+from .storage import PORTFOLIO_COLUMNS, portfolio_fields
+
+COLUMNAS = ('id', 'cliente', *(nombre for nombre, _ in PORTFOLIO_COLUMNS))
+MONTOS = ('Ingresos', 'Egresos', 'Balance', 'Ahorro_Proyectado')
+BANDAS_EDAD = (0, 25, 35, 45, 55, 65, np.inf)
+ETIQUETAS_EDAD = ('Menos de 25', '25–34', '35–44', '45–54', '55–64', '65 o más')
+SIN_SEXO = 'No especificar'
+BINS_BALANCE = 20
+
+
+def to_frame(filas):
+    """DataFrame tipado (índice id) desde filas (id, cliente, *PORTFOLIO_COLUMNS) del almacén.
+
+    'periodo' (año * 12 + mes − 1, o −1 sin mes) ordena los cortes de un cliente.
+    """
+    crudo = pd.DataFrame.from_records(list(filas), columns=COLUMNAS)
+    frame = pd.DataFrame({
+        'Cliente': crudo['cliente'].astype(str),
+        'Edad': crudo['edad'].astype('float64'),
+        'Sexo': crudo['sexo'].fillna(SIN_SEXO).astype(str),
+        'Periodo': crudo['etiqueta'].fillna('').astype(str),
+        'periodo': crudo['periodo'].astype('int64'),
+        'Ingresos': crudo['ingresos'].astype('float64'),
+        'Egresos': crudo['egresos'].astype('float64'),
+        'Balance': crudo['balance'].astype('float64'),
+        'Ahorro_Proyectado': crudo['ahorro'].astype('float64'),
+    })
+    frame.index = pd.Index(crudo['id'].astype('int64'), name='id')
+    return _typed(frame)
+
+
+def _typed(frame):
+    # Tras un concat las categorías de ambos lados se unen en object; se vuelven a tipar.
+    return frame.astype({'Cliente': 'category', 'Sexo': 'category', 'Periodo': 'category'})
+
+
+def latest(frame):
+    """Último corte de cada cliente: el de periodo más reciente y, a igual periodo, el último guardado."""
+    ordenado = frame.reset_index().sort_values(['periodo', 'id'])
+    return ordenado[~ordenado['Cliente'].duplicated(keep='last')].reset_index(drop=True)
+
+
+def _breakdown(ultimos, llave):
+    tabla = ultimos.groupby(llave, observed=False).agg(
+        clientes=('Cliente', 'size'),
+        ingresos=('Ingresos', 'sum'),
+        egresos=('Egresos', 'sum'),
+        balance_medio=('Balance', 'mean'),
+        negativos=('negativo', 'sum'),
+    )
+    return tabla.reset_index()
+
+
+def analyze(frame, bins=BINS_BALANCE):
+    """Indicadores de cartera sobre el último corte de cada cliente.
+
+    Devuelve un dict con 'clientes', 'cortes', los totales por monto ('Ingresos',
+    'Egresos', 'Balance', 'Ahorro_Proyectado'), 'percentiles' del balance (p10, p50, p90),
+    'distribucion' (histograma: desde, hasta, clientes), 'negativos' (clientes con balance
+    negativo, del más negativo al menos) y los desgloses 'por_edad' y 'por_sexo'.
+    """
+    ultimos = latest(frame)
+    ultimos['negativo'] = ultimos['Balance'] < 0
+    ultimos['banda_edad'] = pd.cut(ultimos['Edad'], BANDAS_EDAD, right=False, labels=ETIQUETAS_EDAD)
+    balance = ultimos['Balance'].to_numpy()
+    conteos, bordes = np.histogram(balance, bins=bins) if len(balance) else (np.zeros(0, int), np.zeros(1))
+    return {
+        'clientes': len(ultimos),
+        'cortes': len(frame),
+        **{m: float(ultimos[m].sum()) for m in MONTOS},
+        'percentiles': dict(zip(('p10', 'p50', 'p90'), np.percentile(balance, (10, 50, 90)).tolist()))
+        if len(balance) else {},
+        'distribucion': pd.DataFrame({'desde': bordes[:-1], 'hasta': bordes[1:], 'clientes': conteos}),
+        'negativos': ultimos.loc[ultimos['negativo'], ['Cliente', 'Periodo', 'Ingresos', 'Egresos', 'Balance']]
+        .sort_values('Balance').reset_index(drop=True),
+        'por_edad': _breakdown(ultimos, 'banda_edad'),
+        'por_sexo': _breakdown(ultimos, 'Sexo'),
+    }
+
+
+class Portfolio:
+    """Copia columnar del historial de un `RecordStore`, al día por versión, y su resumen.
+
+    Como `SharedHistory`, trae del almacén solo las filas cambiadas desde la última
+    versión vista; si una compactación ya purgó bajas, vuelve a leer la base completa.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.version = None
+        self._frame = None
+        self._resumen = None
+        self._version_resumen = None
+        self._lock = threading.Lock()
+
+    def _refresh(self):
+        if self.version is not None and self.store.version == self.version:
+            return
+        cambios = None
+        if self.version is not None:
+            cambios, version = self.store.changes_since(self.version)
+        if cambios is None:
+            version, filas = self.store.portfolio_rows()
+            self._frame = to_frame(filas)
+        elif cambios:
+            ids = [record_id for record_id, _ in cambios]
+            nuevos = [(record_id, str(record.get('Cliente', '')), *portfolio_fields(record))
+                      for record_id, record in cambios if record is not None]
+            frame = self._frame.drop(ids, errors='ignore')
+            if nuevos:
+                frame = _typed(pd.concat([frame, to_frame(nuevos)]))
+            self._frame = frame
+        self.version = version
+
+    def frame(self):
+        """Copia columnar al día (compartida: no debe modificarse)."""
+        with self._lock:
+            self._refresh()
+            return self._frame
+
+    def summary(self):
+        """`analyze()` del historial actual, recalculado solo si cambió la versión."""
+        with self._lock:
+            self._refresh()
+            if self._resumen is None or self._version_resumen != self.version:
+                self._resumen = analyze(self._frame)
+                self._version_resumen = self.version
+            return self._resumen
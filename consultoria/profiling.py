@@ -0,0 +1,132 @@
+"""Instrumentación por rerun: tramos con nombre, contadores y eventos de descarga.
+
+Cada sesión tiene un `Profiler`. `begin()`/`end()` enmarcan un rerun completo; dentro,
+`span(nombre)` mide un tramo (los tramos anidados se nombran "padre/hijo") y `count`
+acumula contadores. Los fragmentos que Streamlit re-ejecuta solos se registran como
+reruns propios con `fragment`. Las descargas diferidas corren fuera del rerun, así que
+`track` las registra como eventos independientes. Si hay un log configurado, cada rerun y cada
+evento se escribe como una línea JSON en un archivo rotativo.
+"""
+import functools
+import json
+import logging
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler
+
+LOG_MAX_BYTES = 5 * 1024 * 1024
+LOG_BACKUPS = 3
+KEEP_RUNS = 20
+
+_log_lock = threading.Lock()
+
+
+def open_log(path, max_bytes=LOG_MAX_BYTES, backups=LOG_BACKUPS):
+    """Logger JSONL rotativo compartido por todas las sesiones del proceso."""
+    logger = logging.getLogger('consultoria.profiling')
+    with _log_lock:
+        if not logger.handlers:
+            handler = RotatingFileHandler(path, maxBytes=max_bytes, backupCount=backups, encoding='utf-8')
+            handler.setFormatter(logging.Formatter('%(message)s'))
+            logger.addHandler(handler)
+            logger.setLevel(logging.INFO)
+            logger.propagate = False
+    return logger
+
+
+class Profiler:
+    def __init__(self, log=None, keep=KEEP_RUNS):
+        self.session = uuid.uuid4().hex[:8]
+        self.runs = deque(maxlen=keep)
+        self.events = deque(maxlen=keep)
+        self._log = log
+        self._lock = threading.Lock()
+        self._run = None
+        self._stack = []
+        self._inicio = 0.0
+
+    def begin(self):
+        if self._run is not None:
+            # El rerun anterior terminó con st.rerun()/st.stop() antes de llegar a end().
+            self.end(interrumpido=True)
+        self._run = {'tipo': 'rerun', 'sesion': self.session, 'ts': time.time(), 'spans': [], 'counters': {}}
+        self._stack = []
+        self._inicio = time.perf_counter()
+
+    def end(self, interrumpido=False):
+        run, self._run = self._run, None
+        if run is None:
+            return None
+        run['total_ms'] = round((time.perf_counter() - self._inicio) * 1000, 3)
+        if interrumpido:
+            run['interrumpido'] = True
+        self.runs.append(run)
+        self._write(run)
+        return run
+
+    @contextmanager
+    def span(self, name):
+        if self._run is None:
+            yield
+            return
+        self._stack.append(name)
+        ruta = '/'.join(self._stack)
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            if self._run is not None:
+                self._run['spans'].append((ruta, round((time.perf_counter() - inicio) * 1000, 3)))
+            self._stack.pop()
+
+    def count(self, name, n=1):
+        if self._run is not None:
+            counters = self._run['counters']
+            counters[name] = counters.get(name, 0) + n
+
+    def fragment(self, name):
+        """Decorador para el cuerpo de un `st.fragment`.
+
+        Dentro de un rerun completo el fragmento es un tramo más; cuando se re-ejecuta
+        solo, se registra como un rerun propio marcado con el nombre del fragmento.
+        """
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                if self._run is not None:
+                    with self.span(name):
+                        return fn(*args, **kwargs)
+                self.begin()
+                self._run['fragmento'] = name
+                try:
+                    with self.span(name):
+                        return fn(*args, **kwargs)
+                finally:
+                    self.end()
+            return wrapper
+        return decorator
+
+    def track(self, name, fn):
+        """Envuelve un callable de descarga para medir su tiempo y los bytes entregados."""
+        def wrapper():
+            inicio = time.perf_counter()
+            data = fn()
+            evento = {
+                'tipo': 'descarga', 'sesion': self.session, 'ts': time.time(), 'nombre': name,
+                'ms': round((time.perf_counter() - inicio) * 1000, 3), 'bytes': len(data or b''),
+            }
+            with self._lock:
+                self.events.append(evento)
+            self._write(evento)
+            return data
+        return wrapper
+
+    def last(self):
+        return self.runs[-1] if self.runs else None
+
+    def _write(self, record):
+        if self._log is not None:
+            self._log.info(json.dumps(record, ensure_ascii=False, separators=(',', ':'), default=str))
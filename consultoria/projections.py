@@ -0,0 +1,80 @@
+"""Proyección de ahorro con interés compuesto, inflación y crecimiento del aporte.
+
+Todo se calcula con arreglos de NumPy sobre el eje de meses (y, en la simulación,
+sobre trayectorias), sin bucles de Python por mes.
+
+Convenciones: tasas anuales en fracción (0.08 = 8%), capitalización mensual equivalente,
+aporte al final de cada mes y crecimiento del aporte una vez por año.
+"""
+import numpy as np
+
+PERCENTILES = (10, 50, 90)
+SIMULACIONES = 2_000
+SEED = 2024
+
+
+def monthly_rate(tasa_anual):
+    """Tasa mensual equivalente a una tasa efectiva anual (acepta arreglos)."""
+    return np.power(1.0 + np.asarray(tasa_anual, dtype=float), 1.0 / 12.0) - 1.0
+
+
+def contributions(ahorro, meses, crecimiento=0.0):
+    """Aporte de cada mes 1..meses; sube `crecimiento` al cumplir cada año.
+
+    Con `crecimiento` como arreglo de forma (S, 1) devuelve (S, meses).
+    """
+    anio = np.arange(meses) // 12
+    return ahorro * np.power(1.0 + np.asarray(crecimiento, dtype=float), anio)
+
+
+def _accumulate(aportes, factores, capital_inicial):
+    """Valor al cierre de cada mes dados los aportes y el factor de crecimiento acumulado.
+
+    V_t = F_t * (C0 + sum_{k<=t} a_k / F_k): una suma acumulada en lugar de la recurrencia.
+    """
+    return factores * (capital_inicial + np.cumsum(aportes / factores, axis=-1))
+
+
+def project(ahorro, meses, tasa=0.0, inflacion=0.0, crecimiento=0.0, capital_inicial=0.0):
+    """Proyección determinista mes a mes.
+
+    Devuelve un dict de arreglos de longitud `meses`: 'mes', 'aportado' (acumulado),
+    'capital' (nominal) y 'real' (en pesos de hoy, descontando la inflación).
+    """
+    meses = int(meses)
+    mes = np.arange(1, meses + 1)
+    aportes = contributions(ahorro, meses, crecimiento)
+    factores = np.power(1.0 + monthly_rate(tasa), mes)
+    capital = _accumulate(aportes, factores, capital_inicial)
+    deflactor = np.power(1.0 + monthly_rate(inflacion), mes)
+    return {
+        'mes': mes,
+        'aportado': capital_inicial + np.cumsum(aportes),
+        'capital': capital,
+        'real': capital / deflactor,
+    }
+
+
+def monte_carlo(ahorro, meses, tasa, volatilidad, crecimiento=0.0, inflacion=0.0, capital_inicial=0.0,
+                simulaciones=SIMULACIONES, percentiles=PERCENTILES, seed=SEED):
+    """Bandas de percentiles con rendimientos mensuales aleatorios (normales).
+
+    La media mensual corresponde a `tasa` anual y la desviación a `volatilidad` anual.
+    Devuelve un dict: 'mes' y, por percentil p, 'p{p}' (nominal) y 'p{p}_real'.
+    """
+    meses = int(meses)
+    rng = np.random.default_rng(seed)
+    media = monthly_rate(tasa)
+    desviacion = volatilidad / np.sqrt(12.0)
+    rendimientos = rng.normal(media, desviacion, size=(simulaciones, meses))
+    # Un mes no puede perder más del 99% del capital.
+    factores = np.cumprod(1.0 + np.maximum(rendimientos, -0.99), axis=1)
+    caminos = _accumulate(contributions(ahorro, meses, crecimiento), factores, capital_inicial)
+    bandas = np.percentile(caminos, percentiles, axis=0)
+    mes = np.arange(1, meses + 1)
+    deflactor = np.power(1.0 + monthly_rate(inflacion), mes)
+    resultado = {'mes': mes}
+    for p, banda in zip(percentiles, bandas):
+        resultado[f'p{p}'] = banda
+        resultado[f'p{p}_real'] = banda / deflactor
+    return resultado
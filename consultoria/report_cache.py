@@ -0,0 +1,117 @@
+"""Cachés de reportes: LRU de PDFs por hash de sus datos y último Excel por versión."""
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+
+def report_key(report_type, inputs):
+    """Hash estable del tipo de reporte y de todos los datos que lo determinan."""
+    payload = json.dumps([report_type, inputs], sort_keys=True, default=str, separators=(',', ':'))
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class ReportCache:
+    """Guarda los PDF ya generados hasta `max_bytes`, expulsando el menos usado."""
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES):
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._items = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            data = self._items.get(key)
+            if data is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return data
+
+    def put(self, key, data):
+        if len(data) > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._items:
+                self._bytes -= len(self._items.pop(key))
+            self._items[key] = data
+            self._bytes += len(data)
+            while self._bytes > self.max_bytes:
+                _, old = self._items.popitem(last=False)
+                self._bytes -= len(old)
+                self.evictions += 1
+
+    def get_or_create(self, key, factory):
+        """Devuelve el PDF de `key`; si no está, lo genera con `factory()` y lo guarda."""
+        data = self.get(key)
+        if data is None:
+            data = factory()
+            self.put(key, data)
+        return data
+
+    def stats(self):
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'items': len(self._items),
+                'bytes': self._bytes,
+            }
+
+
+class ExcelCache:
+    """Último Excel generado, válido mientras no cambie la versión del historial.
+
+    El libro se arma fuera del candado y se publica de una vez como la tupla
+    (versión, bytes), así que `peek()` nunca espera a que termine una generación. Las
+    hojas de cliente ya comprimidas se conservan entre versiones: una nueva versión solo
+    rearma las de los clientes que cambiaron.
+    """
+
+    def __init__(self):
+        self._actual = (None, None)
+        self._lock = threading.Lock()
+        # Una generación a la vez: comparten `_hojas` y la segunda reutiliza la primera.
+        self._generando = threading.Lock()
+        self._hojas = {}
+
+    @property
+    def version(self):
+        return self._actual[0]
+
+    @property
+    def data(self):
+        return self._actual[1]
+
+    def peek(self, version):
+        """El Excel de `version` si ya está generado; None si hay que generarlo."""
+        actual, data = self._actual
+        return data if actual == version else None
+
+    def get(self, version, load_records):
+        """El Excel de `version`, generándolo con `load_records()` si no es el guardado.
+
+        `load_records` debe devolver los registros de exactamente esa versión.
+        """
+        data = self.peek(version)
+        if data is not None:
+            return data
+        from .excel_export import generate_complex_excel
+        with self._generando:
+            data = self.peek(version)
+            if data is not None:
+                return data
+            data = generate_complex_excel(load_records(), self._hojas)
+        with self._lock:
+            # Una generación más lenta de una versión anterior no pisa a la nueva.
+            if self._actual[0] is None or version >= self._actual[0]:
+                self._actual = (version, data)
+        return data
@@ -0,0 +1,259 @@
+"""Reportes PDF del cliente, independientes de la sesión de Streamlit.
+
+`create_pro_pdf` recibe todos sus datos en un snapshot (ver `report_snapshot` en index.py
+o `record_snapshots` para un corte guardado), así que puede correr en otro proceso.
+"""
+from datetime import datetime
+
+from fpdf import FPDF
+
+from .formatting import format_money, format_years
+
+PROYECCION_MESES = 12
+
+
+class PDFReport(FPDF):
+    def header(self):
+        self.set_fill_color(0, 122, 255) # Azul Apple
+        self.rect(0, 0, 210, 25, 'F')
+        self.set_font('Arial', 'B', 18)
+        self.set_text_color(255, 255, 255)
+        self.set_y(8)
+        self.cell(0, 10, 'Reporte Financiero Profesional', 0, 0, 'C')
+        self.ln(25) 
+    def footer(self):
+        self.set_y(-15)
+        self.set_font('Arial', 'I', 8)
+        self.set_text_color(128, 128, 128)
+        self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'C')
+    def chapter_title(self, label, color_rgb):
+        self.set_font('Arial', 'B', 12)
+        self.set_fill_color(color_rgb[0], color_rgb[1], color_rgb[2])
+        self.set_text_color(255, 255, 255)
+        self.cell(0, 8, f"  {label}", 0, 1, 'L', 1)
+        self.ln(4)
+        self.set_text_color(0, 0, 0)
+    def image_raster(self, raster, x=None, y=None, w=0, h=0):
+        """Inserta un `charts.Raster` ya comprimido, sin pasar por un archivo temporal.
+
+        Escribe en la tabla interna de imágenes de fpdf 1.7.2 (fijada en requirements.txt).
+        """
+        name = f"raster:{id(raster)}"
+        if name not in self.images:
+            info = raster.fpdf_info()
+            info['i'] = len(self.images) + 1
+            self.images[name] = info
+        self.image(name, x=x, y=y, w=w, h=h)
+
+
+def create_pro_pdf(report_type, extra_data=None):
+    pdf = PDFReport()
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    extra_data = extra_data or {}
+    cliente_nombre = extra_data.get('cliente_snap', '')
+    ocupacion_nombre = extra_data.get('ocupacion_snap', '')
+    fecha_reporte = extra_data.get('fecha_snap') or datetime.now().strftime('%d/%m/%Y')
+    
+    pdf.set_fill_color(242, 242, 247)
+    pdf.rect(10, 30, 190, 25, 'F')
+    pdf.set_y(32)
+    pdf.set_x(15)
+    pdf.set_font("Arial", 'B', 10)
+    pdf.set_text_color(28, 28, 30)
+    pdf.cell(90, 6, f"CLIENTE: {cliente_nombre.upper() or 'NO REGISTRADO'}", 0, 0)
+    pdf.cell(90, 6, f"FECHA: {fecha_reporte}", 0, 1, 'R')
+    pdf.set_x(15)
+    pdf.cell(90, 6, f"OCUPACIÓN: {ocupacion_nombre.upper() or 'N/A'}", 0, 1)
+    pdf.ln(12)
+
+    ingresos = extra_data.get('ingresos_snap', 0)
+    gastos = extra_data.get('gastos_snap', 0)
+    balance = extra_data.get('balance_snap', ingresos - gastos)
+    transacciones_data = extra_data.get('transacciones_snap', [])
+
+    if report_type == "analisis":
+        y_start = pdf.get_y()
+        def draw_kpi(x, title, amount, color_top, bg_color):
+            pdf.set_fill_color(bg_color[0], bg_color[1], bg_color[2])
+            pdf.rect(x, y_start, 60, 20, 'F')
+            pdf.set_fill_color(color_top[0], color_top[1], color_top[2])
+            pdf.rect(x, y_start, 60, 1, 'F')
+            pdf.set_xy(x, y_start + 4)
+            pdf.set_font("Arial", 'B', 8)
+            pdf.set_text_color(color_top[0], color_top[1], color_top[2])
+            pdf.cell(60, 4, title, 0, 2, 'C')
+            pdf.set_font("Arial", 'B', 12)
+            pdf.set_text_color(28, 28, 30)
+            pdf.cell(60, 6, amount, 0, 0, 'C')
+
+        draw_kpi(12, "TOTAL INGRESOS", format_money(ingresos), (0, 122, 255), (230, 242, 255))
+        draw_kpi(75, "TOTAL EGRESOS", format_money(gastos), (90, 200, 250), (230, 250, 255))
+        draw_kpi(138, "BALANCE FINAL", format_money(balance), (0, 122, 255), (242, 242, 247))
+        pdf.ln(28)
+
+        if ingresos > 0 or gastos > 0:
+            # matplotlib solo se carga si hay gráfica que dibujar.
+            from .charts import render_donut
+            x_img = (210 - 120) / 2
+            pdf.image_raster(render_donut(ingresos, gastos, balance), x=x_img, w=120)
+        pdf.ln(5)
+
+        if transacciones_data:
+            import pandas as pd
+            df = pd.DataFrame(transacciones_data)
+            def header_tabla(titulo, r, g, b):
+                pdf.set_font('Arial', 'B', 11)
+                pdf.set_fill_color(r, g, b)
+                pdf.set_text_color(255, 255, 255)
+                pdf.cell(190, 8, f"  {titulo}", 0, 1, 'L', 1)
+            def fila_tabla(concepto, monto, fill=False):
+                pdf.set_fill_color(242, 242, 247)
+                pdf.set_text_color(28, 28, 30)
+                pdf.set_font('Arial', '', 10)
+                pdf.cell(140, 7, f"  {concepto}", 'B', 0, 'L', fill)
+                pdf.set_font('Arial', 'B', 10)
+                pdf.cell(50, 7, f"{format_money(monto)}  ", 'B', 1, 'R', fill)
+
+            if not df.empty:
+                ingresos_list = df[df['tipo'] == 'Ingreso']
+                if not ingresos_list.empty:
+                    header_tabla("DETALLE DE INGRESOS", 0, 122, 255)
+                    for idx, row in ingresos_list.iterrows():
+                        fila_tabla(row['concepto'], row['monto'], idx % 2 != 0)
+                    pdf.ln(5)
+                gastos_list = df[df['tipo'] == 'Gasto']
+                if not gastos_list.empty:
+                    header_tabla("DETALLE DE EGRESOS", 90, 200, 250)
+                    for idx, row in gastos_list.iterrows():
+                        fila_tabla(row['concepto'], row['monto'], idx % 2 != 0)
+    elif report_type == "proyeccion":
+        pdf.chapter_title("PROYECCIÓN DE AHORRO", (0, 64, 221))
+        # numpy se carga solo para este reporte.
+        from .projections import monte_carlo, project
+
+        ahorro = extra_data.get('ahorro', 0)
+        meses = int(extra_data.get('meses', 0))
+        tasa = extra_data.get('tasa', 0.0)
+        inflacion = extra_data.get('inflacion', 0.0)
+        crecimiento = extra_data.get('crecimiento', 0.0)
+        volatilidad = extra_data.get('volatilidad', 0.0)
+        proy = project(ahorro, meses, tasa, inflacion, crecimiento) if meses > 0 else None
+        total = float(proy['capital'][-1]) if proy else extra_data.get('total', 0)
+        pdf.set_font("Arial", size=12)
+        pdf.cell(0, 8, f"Ahorro Mensual Base: {format_money(ahorro)}", ln=True)
+        pdf.cell(0, 8, f"Tiempo Estimado: {format_years(meses)}", ln=True)
+        if tasa or inflacion or crecimiento:
+            pdf.cell(0, 8, f"Rendimiento anual: {tasa:.1%}  |  Inflación anual: {inflacion:.1%}  |  Aumento anual del ahorro: {crecimiento:.1%}", ln=True)
+        pdf.ln(2)
+        pdf.set_fill_color(230, 242, 255)
+        pdf.set_font("Arial", 'B', 14)
+        pdf.set_text_color(0, 64, 221)
+        pdf.cell(0, 12, f"  Meta Total: {format_money(total)}", 0, 1, 'L', 1)
+        pdf.set_font("Arial", size=10)
+        pdf.set_text_color(28, 28, 30)
+        if proy and inflacion:
+            pdf.cell(0, 7, f"  Equivale a {format_money(proy['real'][-1])} en pesos de hoy.", ln=True)
+        if proy and volatilidad:
+            bandas = monte_carlo(ahorro, meses, tasa, volatilidad, crecimiento)
+            pdf.cell(0, 7, f"  Con volatilidad anual de {volatilidad:.1%}: entre {format_money(bandas['p10'][-1])} (P10) "
+                           f"y {format_money(bandas['p90'][-1])} (P90).", ln=True)
+        pdf.ln(5)
+        pdf.set_fill_color(0, 64, 221)
+        pdf.set_text_color(255, 255, 255)
+        pdf.set_font("Arial", 'B', 10)
+        pdf.cell(55, 8, "Periodo", 0, 0, 'C', 1)
+        pdf.cell(45, 8, "Aportado", 0, 0, 'C', 1)
+        pdf.cell(45, 8, "Capital Acumulado", 0, 0, 'C', 1)
+        pdf.cell(45, 8, "Valor Real (hoy)", 0, 1, 'C', 1)
+        pdf.set_text_color(0, 0, 0)
+        pdf.set_font("Arial", size=10)
+        # Horizontes largos se resumen por año para que la tabla no ocupe decenas de páginas.
+        paso = 6 if meses <= 120 else 12
+        for i in range(1, meses + 1):
+             if i == meses or i % paso == 0: 
+                fill = i % 12 == 0
+                pdf.set_fill_color(242, 242, 247)
+                pdf.cell(55, 7, f"Mes {i} ({format_years(i)})", 'B', 0, 'C', fill)
+                pdf.cell(45, 7, format_money(proy['aportado'][i - 1]), 'B', 0, 'C', fill)
+                pdf.cell(45, 7, format_money(proy['capital'][i - 1]), 'B', 0, 'C', fill)
+                pdf.cell(45, 7, format_money(proy['real'][i - 1]), 'B', 1, 'C', fill)
+    elif report_type == "deudas":
+        from .debts import ESTRATEGIAS, best_strategy, compare_strategies, summary_rows, yearly_schedule
+
+        deudas = extra_data.get('deudas', [])
+        presupuesto = extra_data.get('presupuesto', 0)
+        plan = compare_strategies(deudas, presupuesto, extra_data.get('personalizado')) if deudas else None
+        pdf.chapter_title("PLAN DE PAGO DE DEUDAS", (255, 59, 48))
+        pdf.set_font("Arial", size=12)
+        pdf.cell(0, 8, f"Presupuesto Mensual: {format_money(presupuesto)}", ln=True)
+        if plan and presupuesto < plan['minimo_total']:
+            pdf.set_font("Arial", 'I', 9)
+            pdf.cell(0, 6, f"Los pagos mínimos suman {format_money(plan['minimo_total'])}, más que el presupuesto; se simulan completos.", ln=True)
+        pdf.ln(2)
+        def encabezado(columnas):
+            pdf.set_fill_color(255, 59, 48)
+            pdf.set_text_color(255, 255, 255)
+            pdf.set_font("Arial", 'B', 10)
+            for i, (titulo, ancho) in enumerate(columnas):
+                pdf.cell(ancho, 8, titulo, 0, 1 if i == len(columnas) - 1 else 0, 'C', 1)
+            pdf.set_text_color(0, 0, 0)
+            pdf.set_font("Arial", size=10)
+        def fila(valores, anchos, fill):
+            pdf.set_fill_color(242, 242, 247)
+            for i, (valor, ancho) in enumerate(zip(valores, anchos)):
+                pdf.cell(ancho, 7, valor, 'B', 1 if i == len(anchos) - 1 else 0, 'C', fill)
+
+        anchos = (70, 40, 40, 40)
+        encabezado(list(zip(("Acreedor", "Saldo", "Tasa Anual", "Pago Mínimo"), anchos)))
+        if plan:
+            for i, (d, minimo) in enumerate(zip(deudas, plan['minimos'])):
+                fila((str(d['acreedor']), format_money(d['monto']), f"{d['tasa']}%", format_money(minimo)), anchos, i % 2 != 0)
+            pdf.ln(6)
+            anchos = (55, 45, 45, 45)
+            encabezado(list(zip(("Estrategia", "Tiempo", "Intereses", "Total Pagado"), anchos)))
+            for i, (nombre, meses, intereses, pagado) in enumerate(summary_rows(plan)):
+                if meses < 0:
+                    fila((nombre, "No se liquida", "-", "-"), anchos, i % 2 != 0)
+                else:
+                    fila((nombre, format_years(meses), format_money(intereses), format_money(pagado)), anchos, i % 2 != 0)
+            pdf.ln(6)
+            mejor = best_strategy(plan)
+            if mejor is None:
+                pdf.set_font("Arial", 'B', 11)
+                pdf.set_text_color(255, 59, 48)
+                pdf.multi_cell(0, 7, "Con este presupuesto ninguna estrategia liquida las deudas: el pago no cubre los intereses.")
+            else:
+                pdf.set_font("Arial", 'B', 11)
+                pdf.cell(0, 8, f"Calendario recomendado: {ESTRATEGIAS[mejor]}", ln=True)
+                anchos = (55, 45, 45, 45)
+                encabezado(list(zip(("Periodo", "Pagado", "Intereses", "Saldo Restante"), anchos)))
+                for i, (mes, pagado, intereses, saldo) in enumerate(yearly_schedule(plan, mejor)):
+                    fila((f"Mes {mes} ({format_years(mes)})", format_money(pagado), format_money(intereses),
+                          format_money(saldo)), anchos, i % 2 != 0)
+    return pdf.output(dest='S').encode('latin-1', 'replace')
+
+
+def record_snapshots(record, meses=PROYECCION_MESES):
+    """Snapshots de análisis y de proyección para un corte del historial.
+
+    Los cortes guardan solo totales (no el detalle de movimientos), así que el análisis
+    muestra KPIs y gráfica; la proyección usa el ahorro proyectado del corte.
+    """
+    fecha = record.get('Fecha') or ''
+    try:
+        fecha = datetime.strptime(fecha, '%Y-%m-%d').strftime('%d/%m/%Y')
+    except ValueError:
+        pass
+    base = {
+        'cliente_snap': str(record.get('Cliente') or ''),
+        'ocupacion_snap': str(record.get('Ocupacion') or ''),
+        'fecha_snap': fecha,
+    }
+    ingresos = float(record.get('Ingresos') or 0)
+    gastos = float(record.get('Egresos') or 0)
+    analisis = dict(base, ingresos_snap=ingresos, gastos_snap=gastos,
+                    balance_snap=float(record.get('Balance', ingresos - gastos) or 0))
+    ahorro = float(record.get('Ahorro_Proyectado') or 0)
+    proyeccion = dict(base, ahorro=ahorro, meses=meses, total=ahorro * meses)
+    return analisis, proyeccion
@@ -0,0 +1,318 @@
+"""Búsqueda por texto: índice invertido sin acentos y tolerante a errores de tecleo.
+
+`normalize()` pasa a minúsculas y quita los acentos (NFKD sin marcas combinantes), así
+que "José Peña" y "jose pena" dan los mismos términos. El índice guarda término →
+documentos y, para prefijos y errores, trigrama → términos del vocabulario: una consulta
+solo compara con distancia de edición acotada los términos que comparten trigramas con
+ella, nunca el vocabulario completo. Altas, cambios y bajas actualizan solo los términos
+del documento afectado.
+"""
+import re
+import threading
+import unicodedata
+from collections import Counter
+from functools import lru_cache
+
+_PALABRA = re.compile(r'[^\W_]+')
+# Calidad de cada tipo de coincidencia; se multiplica por el peso del campo.
+EXACTA = 1.0
+PREFIJO = 0.7
+APROXIMADA = 0.5
+PESOS_CLIENTE = {'Cliente': 3.0, 'Ocupacion': 1.0, 'Email': 1.0}
+# Candidatos aproximados (los que más trigramas comparten) que se verifican por consulta.
+MAX_CANDIDATOS = 64
+# Prefijos de hasta este largo tienen sus propias listas: al teclear la primera letra no
+# se recorren todos los términos que empiezan con ella.
+PREFIJO_CORTO = 2
+
+
+def normalize(texto):
+    """Minúsculas y sin acentos ni diéresis (la ñ queda como n)."""
+    texto = str(texto)
+    if texto.isascii():
+        return texto.lower()
+    texto = unicodedata.normalize('NFKD', texto).casefold()
+    return ''.join(c for c in texto if not unicodedata.combining(c))
+
+
+@lru_cache(maxsize=8192)
+def tokens(texto):
+    """Palabras normalizadas (letras y dígitos) de un texto, como tupla.
+
+    Los conceptos de un estado de cuenta se repiten mucho; se memorizan los recientes.
+    """
+    return tuple(_PALABRA.findall(normalize(texto)))
+
+
+def _grams(termino, cierre=True):
+    # Con dos espacios al inicio los prefijos cortos también tienen trigramas; sin el
+    # espacio final, los trigramas de un prefijo son un subconjunto de los del término.
+    texto = f"  {termino} " if cierre else f"  {termino}"
+    return {texto[i:i + 3] for i in range(len(texto) - 2)}
+
+
+@lru_cache(maxsize=8192)
+def _pairs(campos):
+    """(término, campo) distintos de un documento dado como tupla de (campo, texto)."""
+    return tuple({(termino, campo): None for campo, texto in campos for termino in tokens(texto or '')})
+
+
+def _short_prefixes(pares):
+    """(prefijo corto, campo) distintos de los (término, campo) de un documento."""
+    return {(termino[:n], campo) for termino, campo in pares for n in range(1, min(PREFIJO_CORTO, len(termino)) + 1)}
+
+
+def _discard(indice, termino, campo, llave):
+    """Quita `llave` de indice[termino][campo] y borra lo que quede vacío."""
+    por_campo = indice[termino]
+    llaves = por_campo[campo]
+    llaves.discard(llave)
+    if not llaves:
+        del por_campo[campo]
+        if not por_campo:
+            del indice[termino]
+
+
+def max_typos(termino):
+    """Errores tolerados según el largo: ninguno hasta 3 letras, 1 hasta 7 y 2 después.
+
+    Con dígitos (teléfonos, números en emails) no se toleran: solo exacto o prefijo.
+    """
+    if len(termino) < 4 or any(c.isdigit() for c in termino):
+        return 0
+    return 1 if len(termino) < 8 else 2
+
+
+def within_distance(a, b, maximo):
+    """True si a y b difieren en a lo más `maximo` ediciones (inserción, borrado,
+    sustitución o transposición de letras vecinas)."""
+    if abs(len(a) - len(b)) > maximo:
+        return False
+    previa, fila = None, list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        actual = [i] + [0] * len(b)
+        for j, cb in enumerate(b, 1):
+            actual[j] = min(fila[j] + 1, actual[j - 1] + 1, fila[j - 1] + (ca != cb))
+            if previa is not None and i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                actual[j] = min(actual[j], previa[j - 2] + 1)
+        if min(actual) > maximo:
+            return False
+        previa, fila = fila, actual
+    return fila[-1] <= maximo
+
+
+class SearchIndex:
+    """Índice invertido de documentos con campos de texto ponderados.
+
+    `pesos` es {campo: peso}. Cada documento se identifica con una llave (id de
+    registro, nombre de cliente...) y se reemplaza completo al volver a agregarlo.
+    """
+
+    def __init__(self, pesos):
+        self.pesos = dict(pesos)
+        # término → {campo: llaves}; por documento, sus (término, campo) y su orden de alta.
+        self._postings = {}
+        self._cortos = {}
+        self._terminos = {}
+        self._seq = {}
+        self._trigramas = {}
+        self._contador = 0
+
+    def __len__(self):
+        return len(self._terminos)
+
+    def __contains__(self, llave):
+        return llave in self._terminos
+
+    def add(self, llave, campos):
+        """Indexa (o reindexa) el documento `llave` con {campo: texto}."""
+        self.add_many([(llave, campos)])
+
+    def add_many(self, documentos):
+        """Indexa (o reindexa) varios (llave, {campo: texto}).
+
+        Los documentos con los mismos textos se agrupan: cada texto distinto se tokeniza
+        una vez y sus llaves entran a las listas de una sola vez. Si una llave se repite
+        en el lote, cuenta la última.
+        """
+        grupos = {}
+        for llave, campos in dict(documentos).items():
+            if llave in self._terminos:
+                self.remove(llave)
+            pares = _pairs(tuple(campos.items()))
+            self._contador += 1
+            self._seq[llave] = self._contador
+            self._terminos[llave] = pares
+            grupos.setdefault(pares, []).append(llave)
+        for pares, llaves in grupos.items():
+            for termino, campo in pares:
+                por_campo = self._postings.get(termino)
+                if por_campo is None:
+                    por_campo = self._postings[termino] = {}
+                    for gram in _grams(termino):
+                        self._trigramas.setdefault(gram, set()).add(termino)
+                por_campo.setdefault(campo, set()).update(llaves)
+            for prefijo, campo in _short_prefixes(pares):
+                self._cortos.setdefault(prefijo, {}).setdefault(campo, set()).update(llaves)
+
+    def remove(self, llave):
+        pares = self._terminos.pop(llave, None)
+        if pares is None:
+            return
+        del self._seq[llave]
+        for prefijo, campo in _short_prefixes(pares):
+            _discard(self._cortos, prefijo, campo, llave)
+        for termino, campo in pares:
+            por_campo = self._postings[termino]
+            _discard(self._postings, termino, campo, llave)
+            if not por_campo:
+                for gram in _grams(termino):
+                    terminos = self._trigramas[gram]
+                    terminos.discard(termino)
+                    if not terminos:
+                        del self._trigramas[gram]
+
+    def _prefixed(self, token):
+        conjuntos = sorted((self._trigramas.get(g, ()) for g in _grams(token, cierre=False)), key=len)
+        if not conjuntos or not conjuntos[0]:
+            return set()
+        candidatos = set(conjuntos[0]).intersection(*conjuntos[1:])
+        return {t for t in candidatos if t.startswith(token)}
+
+    def _similar(self, token):
+        maximo = max_typos(token)
+        if not maximo:
+            return set()
+        grams = _grams(token)
+        # Cada edición cambia a lo más cuatro trigramas (una transposición).
+        minimo = len(grams) - 4 * maximo
+        comunes = Counter(t for g in grams for t in self._trigramas.get(g, ()))
+        candidatos = (t for t, n in comunes.most_common(MAX_CANDIDATOS) if n >= minimo)
+        return {t for t in candidatos if within_distance(token, t, maximo)}
+
+    def matches(self, token):
+        """{término: calidad} que coinciden con un token ya normalizado."""
+        encontrados = {t: APROXIMADA for t in self._similar(token)}
+        encontrados.update((t, PREFIJO) for t in self._prefixed(token))
+        if token in self._postings:
+            encontrados[token] = EXACTA
+        return encontrados
+
+    def _hits(self, token):
+        """(calidad, {campo: llaves}) de cada coincidencia de un token."""
+        if len(token) <= PREFIJO_CORTO:
+            if token in self._postings:
+                yield EXACTA, self._postings[token]
+            yield PREFIJO, self._cortos.get(token, {})
+            return
+        for termino, calidad in self.matches(token).items():
+            yield calidad, self._postings[termino]
+
+    def search(self, consulta, limit=None):
+        """Llaves de los documentos que coinciden con todas las palabras de `consulta`.
+
+        Se ordenan por puntaje (calidad de la coincidencia por peso del campo, sumado
+        sobre las palabras) y, a igual puntaje, del más reciente al más antiguo.
+        """
+        puntajes = None
+        for token in dict.fromkeys(tokens(consulta)):
+            # Conjuntos de llaves por puntaje; cada llave se queda con su mejor puntaje.
+            niveles = {}
+            for calidad, por_campo in self._hits(token):
+                for campo, llaves in por_campo.items():
+                    niveles.setdefault(calidad * self.pesos.get(campo, 1.0), []).append(llaves)
+            mejores, vistas = {}, set()
+            for puntaje in sorted(niveles, reverse=True):
+                nuevas = set().union(*niveles[puntaje]) - vistas
+                vistas |= nuevas
+                mejores.update(dict.fromkeys(nuevas, puntaje))
+            if puntajes is None:
+                puntajes = mejores
+            else:
+                puntajes = {llave: puntajes[llave] + mejores[llave] for llave in puntajes.keys() & mejores.keys()}
+            if not puntajes:
+                return []
+        if puntajes is None:
+            return []
+        orden = sorted(puntajes, key=self._seq.__getitem__, reverse=True)
+        orden.sort(key=puntajes.__getitem__, reverse=True)
+        return orden[:limit] if limit else orden
+
+
+class ClientSearch:
+    """Búsqueda de clientes por nombre, ocupación y email, al día con un `RecordStore`.
+
+    Cada cliente es un documento con su nombre y las ocupaciones y emails de todos sus
+    cortes. Como `SharedHistory`, solo lee las filas cambiadas desde la última versión;
+    la primera búsqueda (o una compactación que purgó bajas) lee la base completa.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.version = None
+        self.indice = SearchIndex(PESOS_CLIENTE)
+        self._cortes = {}
+        self._cliente_de = {}
+        self._lock = threading.Lock()
+
+    def _put(self, record, tocados):
+        cliente = str(record.get('Cliente', ''))
+        self._cortes.setdefault(cliente, {})[record['id']] = (record.get('Ocupacion') or '', record.get('Email') or '')
+        self._cliente_de[record['id']] = cliente
+        tocados.add(cliente)
+
+    def _drop(self, record_id, tocados):
+        cliente = self._cliente_de.pop(record_id, None)
+        if cliente is None:
+            return
+        cortes = self._cortes[cliente]
+        del cortes[record_id]
+        if not cortes:
+            del self._cortes[cliente]
+        tocados.add(cliente)
+
+    def _document(self, cliente):
+        cortes = self._cortes[cliente]
+        return cliente, {
+            'Cliente': cliente,
+            'Ocupacion': ' '.join(dict.fromkeys(o for o, _ in cortes.values())),
+            'Email': ' '.join(dict.fromkeys(e for _, e in cortes.values())),
+        }
+
+    def _refresh(self):
+        if self.version is not None and self.store.version == self.version:
+            return
+        cambios = None
+        if self.version is not None:
+            cambios, version = self.store.changes_since(self.version)
+        tocados = set()
+        if cambios is None:
+            self.indice = SearchIndex(PESOS_CLIENTE)
+            self._cortes, self._cliente_de = {}, {}
+            version, registros = self.store.stream()
+            for record in registros:
+                self._put(record, tocados)
+        else:
+            for record_id, record in cambios:
+                self._drop(record_id, tocados)
+                if record is not None:
+                    self._put(record, tocados)
+        self.indice.add_many(self._document(cliente) for cliente in tocados if cliente in self._cortes)
+        for cliente in tocados - self._cortes.keys():
+            self.indice.remove(cliente)
+        self.version = version
+
+    @property
+    def ready(self):
+        """True si el índice ya se armó (las búsquedas siguientes solo aplican cambios)."""
+        return self.version is not None
+
+    def refresh(self):
+        with self._lock:
+            self._refresh()
+
+    def search(self, consulta, limit=None):
+        """Nombres de cliente que coinciden con `consulta`, del más relevante al menos."""
+        with self._lock:
+            self._refresh()
+            return self.indice.search(consulta, limit)
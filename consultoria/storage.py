@@ -0,0 +1,590 @@
+"""Almacén de historial en SQLite: altas por append, cambios y bajas por registro.
+
+Los PDF de cada corte no viven en la base: se guardan en un `BlobStore` y el
+registro solo conserva su referencia en `PDF_Ref`. Los datos de cada registro se
+guardan como JSON comprimido con deflate y un diccionario fijo de claves y valores
+frecuentes (~4x menos que el JSON plano); se leen en lotes con `stream()` y el
+directorio de clientes sale del índice por cliente sin decodificar ningún registro.
+
+Los campos que usa la analítica de cartera (edad, sexo, periodo y montos) se copian
+además a columnas tipadas de `registros` en cada escritura, así que la cartera se arma
+con un solo SELECT sin decodificar ningún registro.
+
+`resumen_mensual` guarda por cliente y mes los montos de su último corte (cada corte es
+la foto del mes, no un movimiento) y cuántos cortes tiene. Se recalcula
+para los clientes afectados dentro de la misma transacción de cada escritura, así que
+las tendencias de un cliente cuestan O(sus periodos) y nunca recorren la base completa.
+"""
+import base64
+import json
+import os
+import sqlite3
+import threading
+import zlib
+from collections import defaultdict
+from pathlib import Path
+
+from .formatting import MESES
+
+# Proporción de registros borrados (tombstones) a partir de la cual se compacta.
+COMPACT_RATIO = 0.25
+COMPACT_MIN = 50
+# Filas por lectura al recorrer la base en `stream()`.
+STREAM_BATCH = 1000
+# Versión del cálculo de `resumen_mensual`; al subirla se reconstruye en bases existentes.
+ROLLUP_VERSION = 2
+# Campos de los que depende `resumen_mensual`; cambiar otros no lo recalcula.
+ROLLUP_FIELDS = frozenset({'Cliente', 'Mes', 'Año', 'Fecha', 'Ingresos', 'Egresos', 'Balance', 'Ahorro_Proyectado'})
+# Columnas tipadas de `registros` para la analítica de cartera, con su tipo SQLite.
+PORTFOLIO_COLUMNS = (('edad', 'REAL'), ('sexo', 'TEXT'), ('etiqueta', 'TEXT'), ('periodo', 'INTEGER'),
+                     ('ingresos', 'REAL'), ('egresos', 'REAL'), ('balance', 'REAL'), ('ahorro', 'REAL'))
+# Versión del llenado de esas columnas; al subirla se recalculan en bases existentes.
+PORTFOLIO_VERSION = 1
+
+# Formato de la columna `datos`: texto JSON (filas antiguas) o un byte de formato seguido
+# de deflate crudo. El diccionario de cada formato no puede cambiar: uno nuevo lleva otro byte.
+FORMAT_DEFLATE = 1
+_ZDICT = (
+    b'"Sexo":"No especificar""Sexo":"Femenino""Sexo":"Masculino"'
+    b'"Julio""Agosto""Septiembre""Octubre""Noviembre""Diciembre""Enero""Febrero""Marzo""Abril""Mayo""Junio"'
+    b'@gmail.com@hotmail.com'
+    b'{"Cliente":"","Ocupacion":"","Telefono":"","Email":"","Edad":,"Sexo":"","Fecha":"20-","Periodo":" 20",'
+    b'"Mes":"","A\\u00f1o":20,"Ingresos":.0,"Egresos":.0,"Balance":.0,"Ahorro_Proyectado":.0,"PDF_Ref":"'
+)
+_PORTFOLIO_NAMES = ', '.join(nombre for nombre, _ in PORTFOLIO_COLUMNS)
+_PORTFOLIO_SET = ', '.join(f"{nombre} = ?" for nombre, _ in PORTFOLIO_COLUMNS)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS registros (
+    seq INTEGER PRIMARY KEY,
+    id INTEGER NOT NULL UNIQUE,
+    cliente TEXT NOT NULL,
+    datos TEXT NOT NULL,
+    pdf BLOB,
+    borrado INTEGER NOT NULL DEFAULT 0,
+    rev INTEGER NOT NULL,
+    edad REAL,
+    sexo TEXT,
+    etiqueta TEXT,
+    periodo INTEGER,
+    ingresos REAL,
+    egresos REAL,
+    balance REAL,
+    ahorro REAL
+);
+CREATE INDEX IF NOT EXISTS idx_registros_cliente ON registros(cliente, borrado);
+CREATE TABLE IF NOT EXISTS meta (
+    clave TEXT PRIMARY KEY,
+    valor INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS resumen_mensual (
+    cliente TEXT NOT NULL,
+    anio INTEGER NOT NULL,
+    mes INTEGER NOT NULL,
+    cortes INTEGER NOT NULL,
+    ingresos REAL NOT NULL,
+    egresos REAL NOT NULL,
+    balance REAL NOT NULL,
+    ahorro REAL NOT NULL,
+    PRIMARY KEY (cliente, anio, mes)
+) WITHOUT ROWID;
+"""
+# Promedios acumulados y cambio contra el mes anterior registrado, sobre las filas de un cliente.
+TREND_SQL = """
+SELECT anio, mes, cortes, ingresos, egresos, balance, ahorro,
+       AVG(ingresos) OVER acumulado AS prom_ingresos,
+       AVG(egresos) OVER acumulado AS prom_egresos,
+       AVG(balance) OVER acumulado AS prom_balance,
+       AVG(ahorro) OVER acumulado AS prom_ahorro,
+       ingresos - LAG(ingresos) OVER orden AS delta_ingresos,
+       egresos - LAG(egresos) OVER orden AS delta_egresos,
+       balance - LAG(balance) OVER orden AS delta_balance,
+       ahorro - LAG(ahorro) OVER orden AS delta_ahorro
+FROM resumen_mensual
+WHERE cliente = ?
+WINDOW orden AS (ORDER BY anio, mes), acumulado AS (orden ROWS UNBOUNDED PRECEDING)
+ORDER BY anio, mes
+"""
+
+
+def _encode(datos):
+    """JSON compacto de un registro (sin id), comprimido para la columna `datos`."""
+    comp = zlib.compressobj(6, zlib.DEFLATED, -15, zdict=_ZDICT)
+    raw = json.dumps(datos, separators=(',', ':')).encode()
+    return bytes((FORMAT_DEFLATE,)) + comp.compress(raw) + comp.flush()
+
+
+def _decode(datos):
+    if isinstance(datos, str):
+        return json.loads(datos)
+    if datos[0] != FORMAT_DEFLATE:
+        raise ValueError(f"Formato de registro desconocido: {datos[0]}")
+    return json.loads(zlib.decompressobj(-15, zdict=_ZDICT).decompress(datos[1:]))
+
+
+def _month_of(datos):
+    """(año, mes) de un corte a partir de 'Año' y 'Mes', o de 'Fecha' si faltan; None si no hay."""
+    try:
+        if datos.get('Mes') in MESES and datos.get('Año'):
+            return int(datos['Año']), MESES.index(datos['Mes']) + 1
+        anio, mes = str(datos.get('Fecha') or '').split('-')[:2]
+        return int(anio), int(mes)
+    except (TypeError, ValueError):
+        return None
+
+
+def _number(valor):
+    try:
+        return float(valor)
+    except (TypeError, ValueError):
+        return None
+
+
+def _amount(valor):
+    valor = _number(valor)
+    return valor if valor is not None and valor == valor else 0.0
+
+
+def portfolio_fields(datos):
+    """Valores de las `PORTFOLIO_COLUMNS` de un registro.
+
+    'periodo' es año * 12 + mes − 1 (−1 si el corte no tiene mes); los montos no
+    numéricos cuentan como 0 y la edad no numérica queda vacía.
+    """
+    mes = _month_of(datos)
+    sexo, etiqueta = datos.get('Sexo'), datos.get('Periodo')
+    return (
+        _number(datos.get('Edad')),
+        None if sexo is None else str(sexo),
+        None if etiqueta is None else str(etiqueta),
+        mes[0] * 12 + mes[1] - 1 if mes else -1,
+        _amount(datos.get('Ingresos')), _amount(datos.get('Egresos')),
+        _amount(datos.get('Balance')), _amount(datos.get('Ahorro_Proyectado')),
+    )
+
+
+def _monthly_totals(filas):
+    """[cortes, ingresos, egresos, balance, ahorro] por (cliente, año, mes) de filas (id, cliente, datos).
+
+    Los montos son los del corte de mayor id del mes: volver a guardar un periodo lo
+    reemplaza en el resumen en vez de sumarse.
+    """
+    cortes = defaultdict(int)
+    ultimos = {}
+    for record_id, cliente, datos in filas:
+        periodo = _month_of(datos)
+        if periodo is None:
+            continue
+        llave = (cliente, *periodo)
+        cortes[llave] += 1
+        if llave not in ultimos or record_id > ultimos[llave][0]:
+            ultimos[llave] = (record_id, datos)
+    return [
+        (*llave, cortes[llave], float(datos.get('Ingresos') or 0), float(datos.get('Egresos') or 0),
+         float(datos.get('Balance') or 0), float(datos.get('Ahorro_Proyectado') or 0))
+        for llave, (_, datos) in ultimos.items()
+    ]
+
+
+def _join_record(record_id, datos):
+    record = {'id': record_id}
+    record.update(_decode(datos))
+    return record
+
+
+class RecordStore:
+    """Historial de cortes persistido en un archivo SQLite (modo WAL).
+
+    Cada alta es un INSERT, cada edición un UPDATE de las filas afectadas y cada
+    baja marca la fila como borrada; las filas borradas se purgan en segundo plano.
+
+    Con `readonly=True` la base debe existir y se abre en modo solo lectura, sin crear
+    el esquema ni correr migraciones (para las lecturas de la línea de comandos).
+    """
+
+    def __init__(self, path, blobs=None, readonly=False):
+        self.path = path
+        self.blobs = blobs
+        self.readonly = readonly
+        self._lock = threading.Lock()
+        self._compacting = False
+        if readonly and not os.path.isfile(path):
+            raise FileNotFoundError(f"No existe la base {path}")
+        self._conn = self._connect()
+        if readonly:
+            return
+        with self._lock, self._conn:
+            self._conn.executescript(SCHEMA)
+        self._compress_rows()
+        self._fill_portfolio_columns()
+        self._build_rollups()
+        if blobs is not None:
+            self._externalize_pdfs()
+
+    def _connect(self):
+        if self.readonly:
+            uri = Path(self.path).resolve().as_uri() + "?mode=ro"
+            return sqlite3.connect(uri, uri=True, timeout=30, check_same_thread=False)
+        conn = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+        conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        return conn
+
+    def _split_record(self, record):
+        """Separa un registro en (id, cliente, json, pdf, *columnas de cartera) moviendo el PDF al BlobStore."""
+        datos = {k: v for k, v in record.items() if k not in ('id', 'PDF_Bytes')}
+        pdf = record.get('PDF_Bytes') or None
+        if pdf is not None and self.blobs is not None:
+            datos['PDF_Ref'] = self.blobs.put(pdf)
+            pdf = None
+        return (int(record['id']), str(record.get('Cliente', '')), _encode(datos), pdf,
+                *portfolio_fields(datos))
+
+    def _compress_rows(self):
+        """Reescribe en el formato comprimido las filas guardadas como texto JSON."""
+        with self._lock, self._conn:
+            rows = self._conn.execute("SELECT id, datos FROM registros WHERE typeof(datos) = 'text'").fetchall()
+            self._conn.executemany(
+                "UPDATE registros SET datos = ? WHERE id = ?",
+                [(_encode(json.loads(datos)), record_id) for record_id, datos in rows],
+            )
+
+    def _fill_portfolio_columns(self):
+        """Agrega y llena las columnas de cartera una única vez por `PORTFOLIO_VERSION`."""
+        with self._lock, self._conn:
+            hecho = self._conn.execute("SELECT valor FROM meta WHERE clave = 'cartera'").fetchone()
+            if hecho and hecho[0] >= PORTFOLIO_VERSION:
+                return
+            existentes = {fila[1] for fila in self._conn.execute("PRAGMA table_info(registros)")}
+            for nombre, tipo in PORTFOLIO_COLUMNS:
+                if nombre not in existentes:
+                    self._conn.execute(f"ALTER TABLE registros ADD COLUMN {nombre} {tipo}")
+            rows = self._conn.execute("SELECT id, datos FROM registros").fetchall()
+            self._conn.executemany(
+                f"UPDATE registros SET {_PORTFOLIO_SET} WHERE id = ?",
+                [(*portfolio_fields(_decode(datos)), record_id) for record_id, datos in rows],
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES ('cartera', ?)", (PORTFOLIO_VERSION,))
+
+    def _build_rollups(self):
+        """Llena `resumen_mensual` una única vez por `ROLLUP_VERSION` (bases anteriores a ella)."""
+        with self._lock, self._conn:
+            hecho = self._conn.execute("SELECT valor FROM meta WHERE clave = 'resumenes'").fetchone()
+            if hecho and hecho[0] >= ROLLUP_VERSION:
+                return
+            filas = self._conn.execute("SELECT id, cliente, datos FROM registros WHERE borrado = 0")
+            self._conn.execute("DELETE FROM resumen_mensual")
+            self._conn.executemany(
+                "INSERT INTO resumen_mensual VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                _monthly_totals((record_id, cliente, _decode(datos)) for record_id, cliente, datos in filas.fetchall()),
+            )
+            self._conn.execute("INSERT OR REPLACE INTO meta (clave, valor) VALUES ('resumenes', ?)", (ROLLUP_VERSION,))
+
+    def _refresh_rollups(self, conn, clientes, nuevos=(), lote=500):
+        """Recalcula el resumen mensual de `clientes` con sus registros vigentes.
+
+        `nuevos` son registros que se van a escribir en la misma transacción: cuentan
+        desde memoria (sin decodificar) y reemplazan a los guardados con el mismo id.
+        """
+        clientes = list(clientes)
+        # Como en el INSERT OR REPLACE, si un id se repite en el lote cuenta el último.
+        reemplazados = {int(record['id']): record for record in nuevos}
+        filas = [(record_id, str(record.get('Cliente', '')), record) for record_id, record in reemplazados.items()]
+        for i in range(0, len(clientes), lote):
+            parte = clientes[i:i + lote]
+            marcas = ','.join('?' * len(parte))
+            conn.execute(f"DELETE FROM resumen_mensual WHERE cliente IN ({marcas})", parte)
+            rows = conn.execute(
+                f"SELECT id, cliente, datos FROM registros WHERE cliente IN ({marcas}) AND borrado = 0", parte
+            ).fetchall()
+            filas.extend((record_id, cliente, _decode(datos)) for record_id, cliente, datos in rows
+                         if record_id not in reemplazados)
+        conn.executemany("INSERT INTO resumen_mensual VALUES (?, ?, ?, ?, ?, ?, ?, ?)", _monthly_totals(filas))
+
+    def _clients_of(self, conn, ids, lote=500):
+        """Clientes a los que pertenecen hoy los `ids` (los que un reemplazo les quitaría)."""
+        clientes = set()
+        for i in range(0, len(ids), lote):
+            parte = ids[i:i + lote]
+            marcas = ','.join('?' * len(parte))
+            clientes.update(c for (c,) in conn.execute(f"SELECT DISTINCT cliente FROM registros WHERE id IN ({marcas})", parte))
+        return clientes
+
+    def _externalize_pdfs(self):
+        """Mueve al BlobStore los PDF que aún estén guardados dentro de la base."""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, datos, pdf FROM registros WHERE pdf IS NOT NULL"
+            ).fetchall()
+            for record_id, datos, pdf in rows:
+                datos = _decode(datos)
+                datos['PDF_Ref'] = self.blobs.put(pdf)
+                self._conn.execute(
+                    "UPDATE registros SET datos = ?, pdf = NULL WHERE id = ?", (_encode(datos), record_id)
+                )
+
+    def _bump_version(self, conn):
+        conn.execute("INSERT OR IGNORE INTO meta (clave, valor) VALUES ('version', 0)")
+        conn.execute("UPDATE meta SET valor = valor + 1 WHERE clave = 'version'")
+        return conn.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()[0]
+
+    @property
+    def version(self):
+        """Contador que aumenta con cada escritura confirmada (la ve cualquier proceso)."""
+        with self._lock:
+            return self._version(self._conn)
+
+    def load(self):
+        """Devuelve los registros vigentes en orden de alta (sin el contenido de los PDF)."""
+        return self.snapshot()[0]
+
+    def stream(self, batch=STREAM_BATCH):
+        """(versión, iterador de registros vigentes en orden de alta) decodificados por lotes.
+
+        Usa su propia conexión y una transacción de lectura abierta hasta agotar el
+        iterador, así que la versión corresponde exactamente a los registros que entrega
+        y las escrituras de otras sesiones no esperan a que termine.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            version = self._version(conn)
+            cursor = conn.execute("SELECT id, datos FROM registros WHERE borrado = 0 ORDER BY seq")
+        except BaseException:
+            conn.close()
+            raise
+
+        def registros():
+            try:
+                while True:
+                    rows = cursor.fetchmany(batch)
+                    if not rows:
+                        return
+                    for row in rows:
+                        yield _join_record(*row)
+            finally:
+                conn.close()
+        return version, registros()
+
+    def portfolio_rows(self):
+        """(versión, [(id, cliente, *PORTFOLIO_COLUMNS)]) vigentes en orden de alta.
+
+        Lee solo las columnas tipadas (sin decodificar registros) con su propia conexión,
+        como `stream()`, para no detener a las demás lecturas y escrituras.
+        """
+        conn = self._connect()
+        try:
+            conn.execute("BEGIN")
+            version = self._version(conn)
+            filas = conn.execute(
+                f"SELECT id, cliente, {_PORTFOLIO_NAMES} FROM registros WHERE borrado = 0 ORDER BY seq"
+            ).fetchall()
+            return version, filas
+        finally:
+            conn.close()
+
+    def clients(self):
+        """([(cliente, cortes)] en orden de primera alta, versión) sin decodificar registros."""
+        def leer(conn):
+            rows = conn.execute(
+                "SELECT cliente, COUNT(*) FROM registros WHERE borrado = 0 GROUP BY cliente ORDER BY MIN(seq)"
+            ).fetchall()
+            return rows, self._version(conn)
+        return self._read(leer)
+
+    def client_records(self, cliente):
+        """Registros vigentes de un cliente en orden de alta (usa el índice por cliente)."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT id, datos FROM registros WHERE cliente = ? AND borrado = 0 ORDER BY seq", (cliente,)
+            ).fetchall()
+        return [_join_record(*row) for row in rows]
+
+    def _read(self, fn):
+        """Ejecuta varias lecturas dentro de una misma transacción (vista consistente)."""
+        with self._lock:
+            self._conn.execute("BEGIN")
+            try:
+                return fn(self._conn)
+            finally:
+                self._conn.execute("COMMIT")
+
+    def _version(self, conn):
+        row = conn.execute("SELECT valor FROM meta WHERE clave = 'version'").fetchone()
+        return row[0] if row else 0
+
+    def snapshot(self):
+        """(registros vigentes, versión) leídos de una misma vista de la base."""
+        version, registros = self.stream()
+        return list(registros), version
+
+    def changes_since(self, version):
+        """Filas (id, registro o None si se borró) modificadas después de `version`.
+
+        Devuelve (cambios, versión actual). `cambios` es None si una compactación ya purgó
+        bajas posteriores a `version`: quien lee debe recargar con `snapshot()`.
+        """
+        def leer(conn):
+            actual = self._version(conn)
+            purga = conn.execute("SELECT valor FROM meta WHERE clave = 'purga'").fetchone()
+            if purga and purga[0] > version:
+                return None, actual
+            rows = conn.execute(
+                "SELECT id, datos, borrado FROM registros WHERE rev > ? ORDER BY seq", (version,)
+            ).fetchall()
+            return [(rid, None if borrado else _join_record(rid, datos)) for rid, datos, borrado in rows], actual
+        return self._read(leer)
+
+    def append(self, record):
+        """Agrega un registro nuevo sin reescribir el resto."""
+        self.append_many([record])
+
+    def append_many(self, records):
+        records = list(records)
+        with self._lock, self._conn:
+            rev = self._bump_version(self._conn)
+            filas = [(*self._split_record(r), rev) for r in records]
+            afectados = self._clients_of(self._conn, [fila[0] for fila in filas]) | {fila[1] for fila in filas}
+            self._refresh_rollups(self._conn, afectados, records)
+            self._conn.executemany(
+                f"INSERT OR REPLACE INTO registros (id, cliente, datos, pdf, {_PORTFOLIO_NAMES}, borrado, rev) "
+                f"VALUES (?, ?, ?, ?, {', '.join('?' * len(PORTFOLIO_COLUMNS))}, 0, ?)",
+                filas,
+            )
+
+    def update_client(self, cliente, cambios):
+        """Aplica `cambios` a todos los registros vigentes de un cliente."""
+        with self._lock, self._conn:
+            rows = self._conn.execute(
+                "SELECT id, datos FROM registros WHERE cliente = ? AND borrado = 0", (cliente,)
+            ).fetchall()
+            if not rows:
+                return
+            rev = self._bump_version(self._conn)
+            updates = []
+            for record_id, datos in rows:
+                datos = _decode(datos)
+                datos.update(cambios)
+                updates.append((datos.get('Cliente', cliente), _encode(datos), *portfolio_fields(datos), rev, record_id))
+            self._conn.executemany(
+                f"UPDATE registros SET cliente = ?, datos = ?, {_PORTFOLIO_SET}, rev = ? WHERE id = ?", updates
+            )
+            self._refresh_rollups(self._conn, {cliente} | {u[0] for u in updates})
+
+    def update_record(self, record_id, cambios):
+        """Aplica `cambios` a un registro vigente; si ya se borró, no hace nada."""
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT cliente, datos FROM registros WHERE id = ? AND borrado = 0", (record_id,)
+            ).fetchone()
+            if row is None:
+                return
+            cliente, datos = row
+            rev = self._bump_version(self._conn)
+            datos = _decode(datos)
+            datos.update(cambios)
+            nuevo = datos.get('Cliente', cliente)
+            self._conn.execute(
+                f"UPDATE registros SET cliente = ?, datos = ?, {_PORTFOLIO_SET}, rev = ? WHERE id = ?",
+                (nuevo, _encode(datos), *portfolio_fields(datos), rev, record_id),
+            )
+            if ROLLUP_FIELDS.intersection(cambios):
+                self._refresh_rollups(self._conn, {cliente, nuevo})
+
+    def delete_client(self, cliente):
+        """Marca como borrados los registros de un cliente."""
+        with self._lock, self._conn:
+            rev = self._bump_version(self._conn)
+            self._conn.execute(
+                "UPDATE registros SET borrado = 1, pdf = NULL, rev = ? WHERE cliente = ? AND borrado = 0",
+                (rev, cliente),
+            )
+            self._refresh_rollups(self._conn, [cliente])
+            borrados, total = self._conn.execute(
+                "SELECT COALESCE(SUM(borrado), 0), COUNT(*) FROM registros"
+            ).fetchone()
+        if borrados >= COMPACT_MIN and borrados >= total * COMPACT_RATIO:
+            self.compact_async()
+
+    def client_trend(self, cliente):
+        """Serie mensual de un cliente desde el resumen, con promedios acumulados y deltas.
+
+        Cada fila es un dict con anio, mes, cortes, los montos del último corte del mes
+        (ingresos, egresos, balance, ahorro), sus promedios acumulados `prom_*` y el cambio contra el mes anterior
+        registrado `delta_*` (None en el primero).
+        """
+        with self._lock:
+            cursor = self._conn.execute(TREND_SQL, (cliente,))
+            columnas = [c[0] for c in cursor.description]
+            return [dict(zip(columnas, fila)) for fila in cursor.fetchall()]
+
+    def client_years(self, cliente):
+        """Totales por año de un cliente (suma de sus meses): (anio, cortes, ingresos, egresos, balance, ahorro)."""
+        with self._lock:
+            return self._conn.execute(
+                "SELECT anio, SUM(cortes), SUM(ingresos), SUM(egresos), SUM(balance), SUM(ahorro) "
+                "FROM resumen_mensual WHERE cliente = ? GROUP BY anio ORDER BY anio", (cliente,)
+            ).fetchall()
+
+    def pdf(self, record):
+        """Lee del BlobStore el PDF de un registro; solo se llama al descargarlo."""
+        if self.blobs is None:
+            return None
+        return self.blobs.get(record.get('PDF_Ref'))
+
+    def compact(self):
+        """Purga las filas borradas y los PDF que ya nadie referencia."""
+        conn = self._connect()
+        try:
+            with conn:
+                # Los lectores con una versión anterior a la última baja purgada ya no
+                # pueden enterarse de ella por `changes_since` y deben recargar.
+                conn.execute(
+                    "INSERT INTO meta (clave, valor) SELECT 'purga', MAX(rev) FROM registros WHERE borrado = 1 "
+                    "HAVING MAX(rev) IS NOT NULL ON CONFLICT(clave) DO UPDATE SET valor = MAX(valor, excluded.valor)"
+                )
+                conn.execute("DELETE FROM registros WHERE borrado = 1")
+            conn.execute("PRAGMA incremental_vacuum")
+            if self.blobs is not None:
+                vivos = {_decode(datos).get('PDF_Ref') for (datos,) in conn.execute("SELECT datos FROM registros")}
+                self.blobs.prune(vivos)
+            conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        finally:
+            conn.close()
+            self._compacting = False
+
+    def compact_async(self):
+        if self._compacting:
+            return
+        self._compacting = True
+        threading.Thread(target=self.compact, name="compactar-historial", daemon=True).start()
+
+    def migrate_json(self, json_path):
+        """Importa una única vez el antiguo `financial_db.json` y lo renombra a `.migrado`."""
+        if not os.path.exists(json_path):
+            return 0
+        with open(json_path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        for record in data:
+            if record.get('PDF_Bytes'):
+                record['PDF_Bytes'] = base64.b64decode(record['PDF_Bytes'])
+        self.append_many(data)
+        os.replace(json_path, json_path + ".migrado")
+        return len(data)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def load_records(path):
+    """Registros vigentes desde la base SQLite (en solo lectura) o desde el antiguo `financial_db.json`."""
+    if path.endswith('.json'):
+        with open(path, 'r', encoding='utf-8') as f:
+            return [{k: v for k, v in r.items() if k != 'PDF_Bytes'} for r in json.load(f)]
+    store = RecordStore(path, readonly=True)
+    try:
+        return store.load()
+    finally:
+        store.close()
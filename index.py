@@ -1,61 +1,85 @@
 import streamlit as st
-import pandas as pd
-import plotly.express as px
-import matplotlib
-# Configurar matplotlib para que no use interfaz gráfica
-matplotlib.use('Agg') 
-import matplotlib.pyplot as plt
 from datetime import datetime
-from fpdf import FPDF
-import io
-import tempfile
 import os
-import time
-import json
-import base64
+
+from consultoria.blobs import BlobStore
+from consultoria.formatting import MESES, format_money, format_years
+from consultoria.history import SharedHistory
+from consultoria.jobs import FileResult, JobRunner, QueueFull
+from consultoria.ledger import Ledger
+from consultoria.profiling import Profiler, open_log
+from consultoria.report_cache import ExcelCache, ReportCache, report_key
+from consultoria.search import ClientSearch, normalize
+from consultoria.storage import RecordStore
 
 # --- Configuración de Página ---
 st.set_page_config(page_title="Consultoría Pro", page_icon="💎", layout="wide")
 
 # --- Constantes y Persistencia ---
 DB_FILE = "financial_db.json"
+STORE_FILE = "financial_db.sqlite3"
+BLOBS_DIR = "pdf_blobs"
+CLIENTES_POR_PAGINA = 20
+# Fragmentos que dependen de los movimientos: se re-ejecutan juntos tras cada cambio.
+PANELES_MOVIMIENTOS = ["totales", "movimientos", "analisis"]
+# Perfilado: JSONL rotativo si se define la ruta; panel lateral con ?debug=1.
+PROFILE_LOG = os.environ.get("CONSULTORIA_PROFILE_LOG")
+DEBUG_PANEL = os.environ.get("CONSULTORIA_DEBUG") == "1"
 
-def load_data():
-    """Carga la base de datos desde un archivo JSON local."""
-    if os.path.exists(DB_FILE):
-        try:
-            with open(DB_FILE, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-                for record in data:
-                    if 'PDF_Bytes' in record and record['PDF_Bytes']:
-                        record['PDF_Bytes'] = base64.b64decode(record['PDF_Bytes'])
-                return data
-        except Exception as e:
-            st.error(f"Error cargando base de datos: {e}")
-            return []
-    return []
+@st.cache_resource
+def get_store():
+    """Abre el almacén SQLite (uno por proceso) y migra el JSON antiguo si existe."""
+    store = RecordStore(STORE_FILE, blobs=BlobStore(BLOBS_DIR))
+    store.migrate_json(DB_FILE)
+    return store
+
+@st.cache_resource
+def get_history():
+    """Historial compartido por todas las sesiones; cada rerun solo trae lo que cambió."""
+    return SharedHistory(get_store())
+
+@st.cache_resource
+def get_portfolio():
+    """Copia columnar del historial para la analítica de cartera, compartida entre sesiones."""
+    from consultoria.portfolio import Portfolio  # pandas se carga al abrir la cartera
+    return Portfolio(get_store())
+
+def sync_history():
+    """Sincroniza el historial compartido con el almacén (altas de otras sesiones o procesos)."""
+    historial = get_history()
+    try:
+        historial.sync()
+    except Exception as e:
+        st.error(f"Error cargando base de datos: {e}")
+    return historial
+
+def update_client_records(nombre_cliente, cambios):
+    """Actualiza en el almacén los registros de un cliente."""
+    try:
+        get_history().update_client(nombre_cliente, cambios)
+    except Exception as e:
+        st.error(f"Error guardando datos: {e}")
 
-def save_data(data):
-    """Guarda la base de datos en un archivo JSON local."""
+def delete_client_records(nombre_cliente):
+    """Marca como borrados en el almacén los registros de un cliente."""
     try:
-        data_to_save = []
-        for record in data:
-            new_record = record.copy()
-            if 'PDF_Bytes' in new_record and isinstance(new_record['PDF_Bytes'], bytes):
-                new_record['PDF_Bytes'] = base64.b64encode(new_record['PDF_Bytes']).decode('utf-8')
-            data_to_save.append(new_record)
-        with open(DB_FILE, 'w', encoding='utf-8') as f:
-            json.dump(data_to_save, f, indent=4)
+        get_history().remove_client(nombre_cliente)
     except Exception as e:
         st.error(f"Error guardando datos: {e}")
 
+# --- Perfilado ---
+if 'profiler' not in st.session_state:
+    st.session_state.profiler = Profiler(open_log(PROFILE_LOG) if PROFILE_LOG else None)
+prof = st.session_state.profiler
+prof.begin()
+
 # --- Inicialización de Estado ---
 if 'transacciones' not in st.session_state:
-    st.session_state.transacciones = []
+    st.session_state.transacciones = Ledger()
 if 'deudas' not in st.session_state:
     st.session_state.deudas = []
-if 'historial_db' not in st.session_state:
-    st.session_state.historial_db = load_data()
+with prof.span("historial.sincronizar"):
+    historial_db = sync_history()
 
 # Inicialización de seguridad para evitar AttributeError
 if 'dark_mode' not in st.session_state:
@@ -77,6 +101,10 @@ if 'sexo' not in st.session_state:
 
 if 'editando_id' not in st.session_state:
     st.session_state.editando_id = None
+# Ids de los trabajos en segundo plano de esta sesión y los que ya se avisaron al terminar.
+if 'trabajos' not in st.session_state:
+    st.session_state.trabajos = []
+    st.session_state.trabajos_avisados = set()
 
 # --- DEFINICIÓN DE PALETA DE COLORES (TEMA CLARO APPLE PRO) ---
 # Fondos
@@ -98,7 +126,8 @@ color_proyeccion = "#0040DD" # Azul Oscuro para Proyecciones
 shadow_style = "0 8px 24px rgba(0, 0, 0, 0.05)"
 
 # --- INYECCIÓN CSS (Estilo Apple Pro 2.0 - Corregido y Reforzado) ---
-st.markdown(f"""
+with prof.span("css"):
+    st.markdown(f"""
     <style>
     @import url('https://fonts.googleapis.com/css2?family=Inter:wght@400;500;600;700&display=swap');
 
@@ -295,28 +324,8 @@ st.markdown(f"""
 
 # --- Funciones Auxiliares ---
 
-def format_money(amount):
-    return f"${amount:,.2f}"
-
-def format_years(meses):
-    years = meses / 12
-    if meses < 12:
-        return f"{meses} Meses"
-    elif meses % 12 == 0:
-        return f"{int(years)} Años"
-    else:
-        return f"{meses} Meses ({years:.1f} Años)"
-
 def get_balance():
-    if not st.session_state.transacciones:
-        return 0, 0, 0
-    df = pd.DataFrame(st.session_state.transacciones)
-    if df.empty:
-        return 0, 0, 0
-    
-    ingresos = df[df['tipo'] == 'Ingreso']['monto'].sum()
-    gastos = df[df['tipo'] == 'Gasto']['monto'].sum()
-    return ingresos, gastos, ingresos - gastos
+    return st.session_state.transacciones.balance()
 
 def clear_form_data():
     st.session_state.cliente = ""
@@ -325,194 +334,213 @@ def clear_form_data():
     st.session_state.email = ""
     st.session_state.edad = 18
     st.session_state.sexo = "No especificar"
-    st.session_state.transacciones = []
+    st.session_state.transacciones = Ledger()
     st.session_state.deudas = []
     st.session_state.editando_id = None
 
+def rerun_panel():
+    """Re-ejecuta solo el fragmento actual; si corre dentro de un rerun completo, toda la app."""
+    try:
+        st.rerun(scope="fragment")
+    except st.errors.StreamlitAPIException:
+        st.rerun()
+
+# --- Callbacks de Movimientos ---
+# Corren antes del rerun, así que cada cambio re-ejecuta solo los paneles afectados. Los
+# avisos se muestran desde el panel: un elemento creado en el callback de un rerun de
+# fragmentos reemplazaría el inicio de la app.
+
+def start_edit(tx_id):
+    st.session_state.editando_id = tx_id
+
+def cancel_edit():
+    st.session_state.editando_id = None
+
+def submit_transaction(sufijo):
+    concepto = st.session_state[f"reg_concepto_{sufijo}"]
+    monto = st.session_state[f"reg_monto_{sufijo}"]
+    tipo = st.session_state[f"reg_tipo_{sufijo}"]
+    if not (concepto and monto is not None and monto > 0):
+        return
+    if st.session_state.editando_id:
+        st.session_state.transacciones.update(st.session_state.editando_id, concepto=concepto, monto=monto, tipo=tipo)
+        st.session_state.editando_id = None
+        st.session_state.aviso_movimientos = "¡Actualizado!"
+    else:
+        st.session_state.transacciones.add({
+            "id": st.session_state.transacciones.nuevo_id(),
+            "fecha": datetime.now().strftime("%Y-%m-%d"),
+            "concepto": concepto,
+            "monto": monto,
+            "tipo": tipo
+        })
+        st.session_state.aviso_movimientos = "¡Agregado!"
+    st.rerun(PANELES_MOVIMIENTOS)
+
+def delete_transaction(tx_id):
+    st.session_state.transacciones.remove(tx_id)
+    if st.session_state.editando_id == tx_id:
+        st.session_state.editando_id = None
+    st.rerun(PANELES_MOVIMIENTOS)
+
 # --- Lógica Excel ---
-def generate_complex_excel(data):
-    output = io.BytesIO()
-    df_all = pd.DataFrame(data)
-    with pd.ExcelWriter(output, engine='openpyxl') as writer:
-        if not df_all.empty:
-            df_unique_clients = df_all.sort_values('id').groupby('Cliente').last().reset_index()
-            cols_resumen = ['Cliente', 'Ocupacion', 'Telefono', 'Email', 'Edad', 'Sexo']
-            cols_resumen = [c for c in cols_resumen if c in df_unique_clients.columns]
-            df_resumen = df_unique_clients[cols_resumen]
-            df_resumen.to_excel(writer, sheet_name='Resumen Clientes', index=False)
-            worksheet = writer.sheets['Resumen Clientes']
-            for idx, col in enumerate(df_resumen.columns):
-                worksheet.column_dimensions[chr(65 + idx)].width = 20
-        unique_clients = df_all['Cliente'].unique()
-        for client_name in unique_clients:
-            client_data = df_all[df_all['Cliente'] == client_name]
-            sheet_name = str(client_name)[:30].replace(":", "").replace("/", "").replace("?", "").replace("*", "")
-            if not sheet_name: sheet_name = "Cliente"
-            last_record = client_data.iloc[-1]
-            personal_info = {
-                'Dato': ['Cliente', 'Ocupación', 'Teléfono', 'Email', 'Edad', 'Sexo'],
-                'Valor': [last_record.get('Cliente', ''), last_record.get('Ocupacion', ''), last_record.get('Telefono', ''), last_record.get('Email', ''), last_record.get('Edad', ''), last_record.get('Sexo', '')]
-            }
-            df_personal = pd.DataFrame(personal_info)
-            financial_cols = ['Periodo', 'Mes', 'Año', 'Ingresos', 'Egresos', 'Balance']
-            if 'Ahorro_Proyectado' in client_data.columns:
-                financial_cols.append('Ahorro_Proyectado')
-            valid_cols = [c for c in financial_cols if c in client_data.columns]
-            df_financial = client_data[valid_cols].copy()
-            df_personal.to_excel(writer, sheet_name=sheet_name, startrow=1, startcol=1, index=False)
-            start_row_financial = len(df_personal) + 4
-            writer.sheets[sheet_name].cell(row=start_row_financial, column=2).value = "Historial Financiero"
-            df_financial.to_excel(writer, sheet_name=sheet_name, startrow=start_row_financial, startcol=1, index=False)
-    return output.getvalue()
+@st.cache_resource
+def get_excel_cache():
+    """Excel de la base completa compartido entre sesiones, ligado a la versión del almacén."""
+    return ExcelCache()
+
+def excel_job(progreso, store, cache):
+    """Trabajo: arma el Excel de la versión actual del almacén y lo deja en la caché."""
+    progreso(0.1, "Leyendo historial")
+    # Registros y versión de una misma lectura: el Excel guardado corresponde a su versión.
+    registros, version = store.snapshot()
+    progreso(0.4, "Armando Excel")
+    return len(cache.get(version, lambda: registros))
 
 # --- Lógica PDF ---
-class PDFReport(FPDF):
-    def header(self):
-        self.set_fill_color(0, 122, 255) # Azul Apple
-        self.rect(0, 0, 210, 25, 'F')
-        self.set_font('Arial', 'B', 18)
-        self.set_text_color(255, 255, 255)
-        self.set_y(8)
-        self.cell(0, 10, 'Reporte Financiero Profesional', 0, 0, 'C')
-        self.ln(25) 
-    def footer(self):
-        self.set_y(-15)
-        self.set_font('Arial', 'I', 8)
-        self.set_text_color(128, 128, 128)
-        self.cell(0, 10, f'Página {self.page_no()}', 0, 0, 'C')
-    def chapter_title(self, label, color_rgb):
-        self.set_font('Arial', 'B', 12)
-        self.set_fill_color(color_rgb[0], color_rgb[1], color_rgb[2])
-        self.set_text_color(255, 255, 255)
-        self.cell(0, 8, f"  {label}", 0, 1, 'L', 1)
-        self.ln(4)
-        self.set_text_color(0, 0, 0)
-
-def create_pro_pdf(report_type, extra_data=None):
-    pdf = PDFReport()
-    pdf.add_page()
-    pdf.set_auto_page_break(auto=True, margin=15)
-    cliente_nombre = extra_data.get('cliente_snap') if extra_data and 'cliente_snap' in extra_data else st.session_state.cliente
-    ocupacion_nombre = extra_data.get('ocupacion_snap') if extra_data and 'ocupacion_snap' in extra_data else st.session_state.ocupacion
-    fecha_reporte = extra_data.get('fecha_snap') if extra_data and 'fecha_snap' in extra_data else datetime.now().strftime('%d/%m/%Y')
-    
-    pdf.set_fill_color(242, 242, 247)
-    pdf.rect(10, 30, 190, 25, 'F')
-    pdf.set_y(32)
-    pdf.set_x(15)
-    pdf.set_font("Arial", 'B', 10)
-    pdf.set_text_color(28, 28, 30)
-    pdf.cell(90, 6, f"CLIENTE: {cliente_nombre.upper() or 'NO REGISTRADO'}", 0, 0)
-    pdf.cell(90, 6, f"FECHA: {fecha_reporte}", 0, 1, 'R')
-    pdf.set_x(15)
-    pdf.cell(90, 6, f"OCUPACIÓN: {ocupacion_nombre.upper() or 'N/A'}", 0, 1)
-    pdf.ln(12)
-
-    if extra_data and 'ingresos_snap' in extra_data:
-        ingresos = extra_data['ingresos_snap']
-        gastos = extra_data['gastos_snap']
-        balance = extra_data['balance_snap']
-        transacciones_data = [] 
-    else:
-        ingresos, gastos, balance = get_balance()
-        transacciones_data = st.session_state.transacciones
-
-    if report_type == "analisis":
-        y_start = pdf.get_y()
-        def draw_kpi(x, title, amount, color_top, bg_color):
-            pdf.set_fill_color(bg_color[0], bg_color[1], bg_color[2])
-            pdf.rect(x, y_start, 60, 20, 'F')
-            pdf.set_fill_color(color_top[0], color_top[1], color_top[2])
-            pdf.rect(x, y_start, 60, 1, 'F')
-            pdf.set_xy(x, y_start + 4)
-            pdf.set_font("Arial", 'B', 8)
-            pdf.set_text_color(color_top[0], color_top[1], color_top[2])
-            pdf.cell(60, 4, title, 0, 2, 'C')
-            pdf.set_font("Arial", 'B', 12)
-            pdf.set_text_color(28, 28, 30)
-            pdf.cell(60, 6, amount, 0, 0, 'C')
-
-        draw_kpi(12, "TOTAL INGRESOS", format_money(ingresos), (0, 122, 255), (230, 242, 255))
-        draw_kpi(75, "TOTAL EGRESOS", format_money(gastos), (90, 200, 250), (230, 250, 255))
-        draw_kpi(138, "BALANCE FINAL", format_money(balance), (0, 122, 255), (242, 242, 247))
-        pdf.ln(28)
+@st.cache_resource
+def get_report_cache():
+    """Caché de PDFs compartida por todas las sesiones del proceso."""
+    return ReportCache()
 
-        if ingresos > 0 or gastos > 0:
-            fig, ax = plt.subplots(figsize=(7, 4))
-            labels = ['Ingresos', 'Egresos']
-            sizes = [ingresos, gastos]
-            colors = ['#007AFF', '#5AC8FA']
-            wedges, texts, autotexts = ax.pie(sizes, labels=labels, autopct='%1.1f%%', startangle=90, colors=colors, textprops=dict(color="#1C1C1E", fontsize=10, weight='bold'), pctdistance=0.85)
-            centre_circle = plt.Circle((0,0),0.65,fc='white')
-            fig.gca().add_artist(centre_circle)
-            plt.text(0, 0, "Balance", ha='center', va='bottom', fontsize=10, color='gray')
-            plt.text(0, 0, f"\n{format_money(balance)}", ha='center', va='center', fontsize=12, fontweight='bold', color='#007AFF')
-            ax.axis('equal')
-            
-            with tempfile.NamedTemporaryFile(delete=False, suffix=".png") as tmpfile:
-                plt.savefig(tmpfile.name, format='png', bbox_inches='tight', dpi=150, transparent=True)
-                x_img = (210 - 120) / 2
-                pdf.image(tmpfile.name, x=x_img, w=120)
-                tmp_path = tmpfile.name
-            plt.close(fig)
-            os.remove(tmp_path)
-        pdf.ln(5)
-
-        if transacciones_data:
-            df = pd.DataFrame(transacciones_data)
-            def header_tabla(titulo, r, g, b):
-                pdf.set_font('Arial', 'B', 11)
-                pdf.set_fill_color(r, g, b)
-                pdf.set_text_color(255, 255, 255)
-                pdf.cell(190, 8, f"  {titulo}", 0, 1, 'L', 1)
-            def fila_tabla(concepto, monto, fill=False):
-                pdf.set_fill_color(242, 242, 247)
-                pdf.set_text_color(28, 28, 30)
-                pdf.set_font('Arial', '', 10)
-                pdf.cell(140, 7, f"  {concepto}", 'B', 0, 'L', fill)
-                pdf.set_font('Arial', 'B', 10)
-                pdf.cell(50, 7, f"{format_money(monto)}  ", 'B', 1, 'R', fill)
-
-            if not df.empty:
-                ingresos_list = df[df['tipo'] == 'Ingreso']
-                if not ingresos_list.empty:
-                    header_tabla("DETALLE DE INGRESOS", 0, 122, 255)
-                    for idx, row in ingresos_list.iterrows():
-                        fila_tabla(row['concepto'], row['monto'], idx % 2 != 0)
-                    pdf.ln(5)
-                gastos_list = df[df['tipo'] == 'Gasto']
-                if not gastos_list.empty:
-                    header_tabla("DETALLE DE EGRESOS", 90, 200, 250)
-                    for idx, row in gastos_list.iterrows():
-                        fila_tabla(row['concepto'], row['monto'], idx % 2 != 0)
-    elif report_type == "proyeccion":
-        pdf.chapter_title("PROYECCIÓN DE AHORRO", (0, 64, 221))
-        ahorro = extra_data.get('ahorro', 0)
-        meses = extra_data.get('meses', 0)
-        total = extra_data.get('total', 0)
-        pdf.set_font("Arial", size=12)
-        pdf.cell(0, 8, f"Ahorro Mensual Base: {format_money(ahorro)}", ln=True)
-        pdf.cell(0, 8, f"Tiempo Estimado: {format_years(meses)}", ln=True)
-        pdf.ln(2)
-        pdf.set_fill_color(230, 242, 255)
-        pdf.set_font("Arial", 'B', 14)
-        pdf.set_text_color(0, 64, 221)
-        pdf.cell(0, 12, f"  Meta Total: {format_money(total)}", 0, 1, 'L', 1)
-        pdf.ln(5)
-        pdf.set_fill_color(0, 64, 221)
-        pdf.set_text_color(255, 255, 255)
-        pdf.set_font("Arial", 'B', 10)
-        pdf.cell(95, 8, "Periodo", 0, 0, 'C', 1)
-        pdf.cell(95, 8, "Capital Acumulado", 0, 1, 'C', 1)
-        pdf.set_text_color(0, 0, 0)
-        pdf.set_font("Arial", size=10)
-        for i in range(1, meses + 1):
-             if i == meses or i % 6 == 0: 
-                fill = i % 12 == 0
-                pdf.set_fill_color(242, 242, 247)
-                pdf.cell(95, 7, f"Mes {i} ({format_years(i)})", 'B', 0, 'C', fill)
-                pdf.cell(95, 7, format_money(ahorro * i), 'B', 1, 'C', fill)
-    return pdf.output(dest='S').encode('latin-1', 'replace')
+def build_snapshot(cliente, ocupacion, ledger=None, extra_data=None):
+    """Datos de un reporte a partir de valores ya tomados de la sesión (no lee `st.session_state`).
+
+    Los reportes de proyección y deudas no usan los movimientos (`ledger` None); sin ellos,
+    su snapshot (y su llave de caché) no cambia al editar el libro, que vive en otro fragmento.
+    """
+    snap = {
+        'cliente_snap': cliente,
+        'ocupacion_snap': ocupacion,
+        'fecha_snap': datetime.now().strftime('%d/%m/%Y'),
+    }
+    if ledger is not None:
+        ingresos, gastos, balance = ledger.balance()
+        snap.update({
+            'ingresos_snap': ingresos,
+            'gastos_snap': gastos,
+            'balance_snap': balance,
+            'transacciones_snap': ledger.columnas(),
+        })
+    if extra_data:
+        snap.update(extra_data)
+    return snap
+
+def report_snapshot(extra_data=None, movimientos=True):
+    """Congela ahora los datos de sesión que usa un reporte para poder generarlo más tarde."""
+    ledger = st.session_state.transacciones if movimientos else None
+    return build_snapshot(st.session_state.cliente, st.session_state.ocupacion, ledger, extra_data)
+
+def cached_pdf(report_type, snap, cache=None):
+    """Devuelve el PDF de `snap` desde la caché, generándolo solo si sus datos cambiaron.
+
+    Los trabajos en segundo plano reciben `cache` ya resuelta: no corren en el hilo del script.
+    """
+    from consultoria.reports import create_pro_pdf  # fpdf se carga con el primer PDF
+
+    key = report_key(report_type, snap)
+    return (cache or get_report_cache()).get_or_create(key, lambda: create_pro_pdf(report_type, snap))
+
+def deferred_pdf(report_type, extra_data=None):
+    """Callable para `st.download_button`: el snapshot y el PDF se arman solo al pulsar la descarga.
+
+    Streamlit lo ejecuta en otro hilo, sin `st.session_state`: el rerun solo toma los
+    textos del perfil y la referencia al libro; copiar sus columnas queda para el clic.
+    """
+    cliente, ocupacion = st.session_state.cliente, st.session_state.ocupacion
+    ledger = st.session_state.transacciones if report_type == "analisis" else None
+    cache = get_report_cache()
+    return prof.track(f"pdf.{report_type}",
+                      lambda: cached_pdf(report_type, build_snapshot(cliente, ocupacion, ledger, extra_data), cache))
+
+# --- Trabajos en Segundo Plano ---
+# PDFs de guardado, exportaciones y lotes corren en pools de hilos del proceso; el rerun
+# que los encola responde al instante y el panel de trabajos consulta su avance.
+TRABAJOS_INTERVALO = 1.0
+
+@st.cache_resource
+def get_jobs():
+    """Cola de trabajos acotada, compartida por todas las sesiones del proceso."""
+    return JobRunner()
+
+@st.cache_resource
+def get_client_search():
+    """Índice de búsqueda de clientes del proceso; se arma en segundo plano al arrancar."""
+    buscador = ClientSearch(get_store())
+    try:
+        get_jobs().submit("indice", lambda progreso: buscador.refresh(), etiqueta="Índice de búsqueda")
+    except QueueFull:
+        buscador.refresh()
+    return buscador
+
+def session_jobs():
+    """Trabajos de esta sesión que el proceso aún conserva, del más reciente al más antiguo."""
+    jobs = get_jobs()
+    return [job for job in (jobs.get(job_id) for job_id in reversed(st.session_state.trabajos)) if job is not None]
+
+def active_job(tipo):
+    return any(job.tipo == tipo and job.activo for job in session_jobs())
+
+def submit_job(tipo, fn, *args, etiqueta=""):
+    """Encola un trabajo de la sesión; devuelve su id o None si la cola está llena."""
+    try:
+        job_id = get_jobs().submit(tipo, fn, *args, etiqueta=etiqueta)
+    except QueueFull:
+        st.warning("⏳ Hay demasiados trabajos en curso. Intenta de nuevo en unos segundos.")
+        return None
+    st.session_state.trabajos.append(job_id)
+    return job_id
+
+@st.cache_resource
+def get_pending_pdfs():
+    """Ids de los cortes cuyo PDF sigue en un trabajo de guardado (compartido entre sesiones)."""
+    return set()
+
+def save_pdf_job(progreso, record_id, snap, store, historial, cache, pendientes):
+    """Trabajo de "Guardar Historial": PDF del análisis de un corte ya guardado y su referencia."""
+    try:
+        progreso(0.1, "Generando PDF")
+        pdf = cached_pdf("analisis", snap, cache)
+        progreso(0.7, "Guardando PDF")
+        historial.update_record(record_id, {"PDF_Ref": store.blobs.put(pdf)})
+    finally:
+        pendientes.discard(record_id)
+    return record_id
+
+def queue_save_pdf(record, snap):
+    """Encola el PDF de un corte ya guardado; si su cola está llena, lo arma en este rerun."""
+    pendientes = get_pending_pdfs()
+    pendientes.add(record["id"])
+    args = (record["id"], snap, get_store(), get_history(), get_report_cache(), pendientes)
+    etiqueta = f"PDF de {record['Periodo']} de {record['Cliente']}"
+    try:
+        st.session_state.trabajos.append(get_jobs().submit("guardar", save_pdf_job, *args, etiqueta=etiqueta))
+    except QueueFull:
+        try:
+            save_pdf_job(lambda *_: None, *args)
+        except Exception as e:
+            st.error(f"{etiqueta}: {e}")
+
+def historical_pdf(record, store, cache):
+    """PDF guardado de un corte del historial; si no tiene (su trabajo falló o se perdió
+    en un reinicio), se arma al descargarlo con los totales del corte, como en los lotes."""
+    pdf = store.pdf(record)
+    if pdf is None:
+        from consultoria.reports import record_snapshots
+        pdf = cached_pdf("analisis", record_snapshots(record)[0], cache)
+    return pdf
+
+def batch_job(progreso, historial):
+    """Trabajo: los PDF de todos los cortes en un ZIP temporal en disco."""
+    from consultoria.batch_reports import render_all
+
+    salida = FileResult(".zip")
+    try:
+        render_all(historial, salida.path, progress=lambda hechos, total: progreso(hechos / total, f"{hechos} de {total} cortes"))
+    except BaseException:
+        salida.close()
+        raise
+    return salida
 
 # --- Layout Principal ---
 
@@ -521,59 +549,38 @@ st.title("Consultoría 2.0")
 tab1, tab2, tab3, tab4, tab5 = st.tabs(["➕ Registros", "📈 Análisis", "📝 Deudas", "🧮 Proyecciones", "🗄️ Base de Datos"])
 
 # --- TAB 1: REGISTROS ---
-with tab1:
-    with st.container():
-        st.markdown("#### 👤 Perfil del Cliente")
-        c1, c2 = st.columns(2)
-        with c1:
-            st.session_state.cliente = st.text_input("Nombre Completo", value=st.session_state.cliente, placeholder="Ej. Juan Pérez")
-        with c2:
-            st.session_state.ocupacion = st.text_input("Ocupación", value=st.session_state.ocupacion, placeholder="Ej. Arquitecto")
-
-        with st.expander("🔒 Datos Privados"):
-            st.markdown("<div class='private-data'>Estos datos <b>NO</b> aparecerán en los reportes PDF.</div>", unsafe_allow_html=True)
-            pc1, pc2, pc3, pc4 = st.columns(4)
-            with pc1:
-                st.session_state.telefono = st.text_input("Teléfono", value=st.session_state.telefono)
-            with pc2:
-                st.session_state.email = st.text_input("Correo", value=st.session_state.email)
-            with pc3:
-                st.session_state.edad = st.number_input("Edad", min_value=1, max_value=120, value=st.session_state.edad, step=1)
-            with pc4:
-                st.session_state.sexo = st.selectbox("Sexo", ["Masculino", "Femenino", "No especificar"], index=["Masculino", "Femenino", "No especificar"].index(st.session_state.sexo))
-
-        ingresos, gastos, balance = get_balance()
-        
-        balance_color = color_ingreso if balance >= 0 else "#FF3B30"
-        
-        st.markdown(f"""
-        <div style="margin-top:10px; padding:20px; background-color:{card_bg}; border-radius:20px; text-align:right; box-shadow:{shadow_style}; border: 1px solid {input_border};">
-            <span style='color:{text_color}; font-size:0.9em; text-transform:uppercase; letter-spacing:1px; font-weight:600;'>Balance Total</span><br>
-            <span style='color:{balance_color}; font-weight:800; font-size:2.5em;'>{format_money(balance)}</span>
-        </div>
-        """, unsafe_allow_html=True)
-
-    st.markdown("---")
+# Cada panel es un fragmento: sus interacciones solo re-ejecutan ese panel. El perfil
+# del cliente queda fuera porque lo usan todos los reportes y el guardado del corte.
+@st.fragment(key="totales")
+@prof.fragment("totales")
+def totals_card():
+    ingresos, gastos, balance = get_balance()
+    
+    balance_color = color_ingreso if balance >= 0 else "#FF3B30"
     
+    st.markdown(f"""
+    <div style="margin-top:10px; padding:20px; background-color:{card_bg}; border-radius:20px; text-align:right; box-shadow:{shadow_style}; border: 1px solid {input_border};">
+        <span style='color:{text_color}; font-size:0.9em; text-transform:uppercase; letter-spacing:1px; font-weight:600;'>Balance Total</span><br>
+        <span style='color:{balance_color}; font-weight:800; font-size:2.5em;'>{format_money(balance)}</span>
+    </div>
+    """, unsafe_allow_html=True)
+
+@st.fragment(key="movimientos")
+@prof.fragment("movimientos")
+def ledger_panel():
+    if aviso := st.session_state.pop("aviso_movimientos", None):
+        st.toast(aviso)
+    ingresos, gastos, balance = get_balance()
     col_left, col_right = st.columns([4, 3])
     
     with col_left:
         # Lógica de Edición
-        if st.session_state.editando_id:
-            tx_edit = next((t for t in st.session_state.transacciones if t['id'] == st.session_state.editando_id), None)
-            if tx_edit:
-                header_text = '✏️ Editando Movimiento'
-                default_type_idx = 0 if tx_edit['tipo'] == "Ingreso" else 1
-                default_monto = tx_edit['monto']
-                default_concepto = tx_edit['concepto']
-            else:
-                st.session_state.editando_id = None
-                st.rerun()
-        else:
-            header_text = '✨ Nuevo Movimiento'
-            default_type_idx = 0
-            default_monto = None
-            default_concepto = ""
+        tx_edit = st.session_state.transacciones.get(st.session_state.editando_id) if st.session_state.editando_id else None
+        if st.session_state.editando_id and not tx_edit:
+            st.session_state.editando_id = None
+        header_text = '✏️ Editando Movimiento' if tx_edit else '✨ Nuevo Movimiento'
+        # Las llaves cambian con el movimiento en edición para que el form tome sus valores.
+        sufijo = tx_edit.id if tx_edit else "nuevo"
             
         st.markdown(f"**{header_text}**")
         
@@ -582,56 +589,86 @@ with tab1:
             with fc_tipo:
                 # Radio Buttons personalizados
                 tipos = ["Ingreso", "Gasto"]
-                if st.session_state.editando_id and tx_edit:
-                    idx = tipos.index(tx_edit['tipo'])
-                else:
-                    idx = 0
-                tipo_sel = st.radio("Tipo", tipos, index=idx, horizontal=True, label_visibility="collapsed")
+                idx = tipos.index(tx_edit.tipo) if tx_edit else 0
+                st.radio("Tipo", tipos, index=idx, horizontal=True, label_visibility="collapsed", key=f"reg_tipo_{sufijo}")
                 
             with fc_monto:
-                val_monto = tx_edit['monto'] if (st.session_state.editando_id and tx_edit) else None
-                monto = st.number_input("Monto", min_value=0.0, step=100.0, value=val_monto, label_visibility="collapsed", placeholder="$0.00")
+                val_monto = tx_edit.monto if tx_edit else None
+                st.number_input("Monto", min_value=0.0, step=100.0, value=val_monto, label_visibility="collapsed", placeholder="$0.00", key=f"reg_monto_{sufijo}")
 
-            val_concepto = tx_edit['concepto'] if (st.session_state.editando_id and tx_edit) else ""
-            concepto = st.text_input("Concepto", value=val_concepto, placeholder="Ej. Nómina, Renta...", label_visibility="collapsed")
+            val_concepto = tx_edit.concepto if tx_edit else ""
+            st.text_input("Concepto", value=val_concepto, placeholder="Ej. Nómina, Renta...", label_visibility="collapsed", key=f"reg_concepto_{sufijo}")
             
             fb1, fb2 = st.columns([1, 2])
             with fb1:
-                btn_label = "Actualizar" if st.session_state.editando_id else "Agregar"
-                submit_btn = st.form_submit_button(btn_label, type="primary", use_container_width=True)
+                btn_label = "Actualizar" if tx_edit else "Agregar"
+                st.form_submit_button(btn_label, type="primary", use_container_width=True, on_click=submit_transaction, args=(sufijo,))
             with fb2:
-                if st.session_state.editando_id:
-                     if st.form_submit_button("Cancelar"):
-                         st.session_state.editando_id = None
-                         st.rerun()
+                if tx_edit:
+                    st.form_submit_button("Cancelar", on_click=cancel_edit)
 
-            if submit_btn:
-                if concepto and monto is not None and monto > 0:
-                    if st.session_state.editando_id:
-                        for t in st.session_state.transacciones:
-                            if t['id'] == st.session_state.editando_id:
-                                t.update({'concepto': concepto, 'monto': monto, 'tipo': tipo_sel})
-                        st.session_state.editando_id = None
-                        st.success("¡Actualizado!")
-                        st.rerun()
-                    else:
-                        st.session_state.transacciones.append({
-                            "id": int(datetime.now().timestamp() * 1000),
-                            "fecha": datetime.now().strftime("%Y-%m-%d"),
-                            "concepto": concepto,
-                            "monto": monto,
-                            "tipo": tipo_sel
-                        })
-                        st.success("¡Agregado!")
-                        st.rerun()
+        with st.expander("📥 Importar Estado de Cuenta"):
+            st.caption("CSV o Excel con columnas de concepto y monto (o cargo/abono); fecha y tipo son opcionales.")
+            archivo = st.file_uploader("Archivo", type=["csv", "xlsx"], key="import_archivo", label_visibility="collapsed")
+            if archivo is not None and st.button("Importar movimientos", key="import_btn", use_container_width=True):
+                from consultoria.importer import import_statement
+
+                try:
+                    with st.spinner("Leyendo archivo..."), prof.span("importar"):
+                        resultado = import_statement(archivo, archivo.name)
+                except Exception as e:
+                    st.error(f"No se pudo importar: {e}")
+                else:
+                    st.session_state.transacciones.extend(resultado.columnas)
+                    prof.count("filas.importadas", resultado.aceptados)
+                    st.session_state.import_resumen = (resultado.aceptados, resultado.rechazados, resultado.muestras)
+                    st.rerun()
+            if st.session_state.get("import_resumen"):
+                aceptados, rechazados, muestras = st.session_state.import_resumen
+                st.success(f"{aceptados} movimientos importados.")
+                if rechazados:
+                    import pandas as pd
+                    st.warning(f"{rechazados} filas rechazadas" + (f" (se muestran las primeras {len(muestras)})." if len(muestras) < rechazados else "."))
+                    st.dataframe(pd.DataFrame(muestras, columns=["Fila", "Motivo"]), hide_index=True, use_container_width=True)
 
         st.markdown("### 📋 Movimientos")
         if not st.session_state.transacciones:
             st.info("Sin registros.")
         else:
-            for t in reversed(st.session_state.transacciones):
+            # Solo se dibuja la página visible; el resto de movimientos no genera widgets.
+            mf0, mf1, mf2, mf3 = st.columns([2, 2, 1, 1])
+            with mf0:
+                buscar_mov = st.text_input("🔍 Buscar concepto", key="mov_buscar", placeholder="Sin acentos, tolera errores...")
+            with mf1:
+                filtro_tipo = st.selectbox("Filtrar por tipo", ["Todos", "Ingreso", "Gasto"], key="mov_filtro")
+            with mf2:
+                por_pagina = st.selectbox("Por página", [10, 25, 50, 100], index=1, key="mov_por_pagina")
+            tipo_filtro = None if filtro_tipo == "Todos" else filtro_tipo
+            encontrados = None
+            if buscar_mov:
+                with prof.span("busqueda.movimientos"):
+                    encontrados = st.session_state.transacciones.buscar(buscar_mov, tipo_filtro)
+                total_mov = len(encontrados)
+            else:
+                total_mov = st.session_state.transacciones.contar(tipo_filtro)
+            paginas = max(1, -(-total_mov // por_pagina))
+            if st.session_state.get("mov_pagina", 1) > paginas:
+                st.session_state.mov_pagina = paginas
+            with mf3:
+                pagina = st.number_input("Página", min_value=1, max_value=paginas, step=1, key="mov_pagina")
+            inicio = (pagina - 1) * por_pagina
+            if encontrados is not None:
+                visibles = encontrados[inicio:inicio + por_pagina]
+            else:
+                visibles = st.session_state.transacciones.pagina(inicio, por_pagina, tipo_filtro)
+            prof.count("filas.movimientos", len(visibles))
+            if not visibles:
+                st.info("Sin movimientos que coincidan con la búsqueda." if buscar_mov else "Sin movimientos de este tipo.")
+            else:
+                st.caption(f"Mostrando {inicio + 1}–{inicio + len(visibles)} de {total_mov} · Página {pagina} de {paginas}")
+            for t in visibles:
                 # CORRECCIÓN: Usar el borde definido sin depender de dark_mode que fue eliminado
-                c_stripe = color_ingreso if t['tipo'] == "Ingreso" else color_gasto
+                c_stripe = color_ingreso if t.tipo == "Ingreso" else color_gasto
                 row_bg = "#FFFFFF"
 
                 with st.container():
@@ -648,57 +685,60 @@ with tab1:
                         align-items: center;
                     ">
                         <div>
-                            <div style="font-weight:600; font-size:1.1em; color:{text_color}">{t['concepto']}</div>
-                            <div style="color:{c_stripe}; font-weight:bold; font-size:0.9em">{t['tipo']}</div>
+                            <div style="font-weight:600; font-size:1.1em; color:{text_color}">{t.concepto}</div>
+                            <div style="color:{c_stripe}; font-weight:bold; font-size:0.9em">{t.tipo}</div>
                         </div>
                         <div style="text-align:right;">
-                            <div style="font-weight:bold; font-size:1.2em; color:{text_color}">{format_money(t['monto'])}</div>
+                            <div style="font-weight:bold; font-size:1.2em; color:{text_color}">{format_money(t.monto)}</div>
                         </div>
                     </div>
                     """, unsafe_allow_html=True)
                     
                     col_edit, col_del, col_void = st.columns([1, 1, 3])
                     with col_edit:
-                        if st.button("✏️ Editar", key=f"edit_{t['id']}", use_container_width=True):
-                            st.session_state.editando_id = t['id']
-                            st.rerun()
+                        st.button("✏️ Editar", key=f"edit_{t.id}", use_container_width=True, on_click=start_edit, args=(t.id,))
                     with col_del:
-                        if st.button("🗑️ Borrar", key=f"del_{t['id']}", use_container_width=True):
-                            st.session_state.transacciones = [x for x in st.session_state.transacciones if x['id'] != t['id']]
-                            if st.session_state.editando_id == t['id']:
-                                st.session_state.editando_id = None
-                            st.rerun()
+                        st.button("🗑️ Borrar", key=f"del_{t.id}", use_container_width=True, on_click=delete_transaction, args=(t.id,))
 
     with col_right:
         st.markdown("**Distribución**")
         if ingresos > 0 or gastos > 0:
-            fig = px.pie(names=['Ingresos', 'Egresos'], values=[ingresos, gastos], 
-                         color=['Ingresos', 'Egresos'],
-                         color_discrete_map={'Ingresos': color_ingreso, 'Egresos': color_gasto},
-                         hole=0.6)
-            
-            fig.update_layout(
-                showlegend=False, 
-                margin=dict(t=0,b=0,l=0,r=0), 
-                height=250, 
-                paper_bgcolor='rgba(0,0,0,0)', 
-                plot_bgcolor='rgba(0,0,0,0)', 
-                font=dict(color=text_color)
-            )
-            fig.add_annotation(
-                text=format_money(balance), 
-                x=0.5, y=0.5, 
-                font_size=16, 
-                showarrow=False, 
-                font_weight="bold", 
-                font=dict(color=text_color)
-            )
+            from consultoria.figures import donut_figure  # plotly se carga con la primera gráfica
+            fig = donut_figure(ingresos, gastos, (color_ingreso, color_gasto), text_color, hole=0.6, centro=format_money(balance), alto=250)
             st.plotly_chart(fig, use_container_width=True, config={'displayModeBar': False})
         else:
             st.caption("Agrega datos para ver la gráfica.")
 
+with tab1:
+    with st.container():
+        st.markdown("#### 👤 Perfil del Cliente")
+        c1, c2 = st.columns(2)
+        with c1:
+            st.session_state.cliente = st.text_input("Nombre Completo", value=st.session_state.cliente, placeholder="Ej. Juan Pérez")
+        with c2:
+            st.session_state.ocupacion = st.text_input("Ocupación", value=st.session_state.ocupacion, placeholder="Ej. Arquitecto")
+
+        with st.expander("🔒 Datos Privados"):
+            st.markdown("<div class='private-data'>Estos datos <b>NO</b> aparecerán en los reportes PDF.</div>", unsafe_allow_html=True)
+            pc1, pc2, pc3, pc4 = st.columns(4)
+            with pc1:
+                st.session_state.telefono = st.text_input("Teléfono", value=st.session_state.telefono)
+            with pc2:
+                st.session_state.email = st.text_input("Correo", value=st.session_state.email)
+            with pc3:
+                st.session_state.edad = st.number_input("Edad", min_value=1, max_value=120, value=st.session_state.edad, step=1)
+            with pc4:
+                st.session_state.sexo = st.selectbox("Sexo", ["Masculino", "Femenino", "No especificar"], index=["Masculino", "Femenino", "No especificar"].index(st.session_state.sexo))
+
+        totals_card()
+
+    st.markdown("---")
+    ledger_panel()
+
 # --- TAB 2: ANÁLISIS ---
-with tab2:
+@st.fragment(key="analisis")
+@prof.fragment("analisis")
+def analysis_panel():
     ingresos, gastos, balance = get_balance()
     
     col_k1, col_k2, col_k3 = st.columns(3)
@@ -708,24 +748,16 @@ with tab2:
     
     st.write("")
     if st.session_state.transacciones:
+        from consultoria.figures import donut_figure
         c_chart, c_details = st.columns([1, 1])
         with c_chart:
             st.subheader("Visualización")
-            fig_analisis = px.pie(names=['Ingresos', 'Egresos'], values=[ingresos, gastos], 
-                                  color=['Ingresos', 'Egresos'], 
-                                  color_discrete_map={'Ingresos': color_ingreso, 'Egresos': color_gasto}, 
-                                  hole=0.5)
-            
-            fig_analisis.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)', 
-                plot_bgcolor='rgba(0,0,0,0)', 
-                font=dict(color=text_color)
-            )
+            fig_analisis = donut_figure(ingresos, gastos, (color_ingreso, color_gasto), text_color)
             st.plotly_chart(fig_analisis, use_container_width=True)
         with c_details:
             st.subheader("Detalles")
             tab_in, tab_out = st.tabs(["Ingresos", "Egresos"])
-            df = pd.DataFrame(st.session_state.transacciones)
+            df = st.session_state.transacciones.to_frame()
             with tab_in:
                 st.markdown(f"<h4 style='color:{color_ingreso}'>Viendo: INGRESOS</h4>", unsafe_allow_html=True)
                 st.dataframe(df[df['tipo']=='Ingreso'][['concepto', 'monto']], use_container_width=True, hide_index=True)
@@ -735,65 +767,111 @@ with tab2:
         st.markdown("---")
         col_space, col_btn = st.columns([3, 1])
         with col_btn:
-            pdf_bytes = create_pro_pdf("analisis")
-            st.download_button("📄 Descargar PDF Pro", pdf_bytes, f"Reporte_{st.session_state.cliente}.pdf", "application/pdf", type="primary", use_container_width=True)
+            st.download_button("📄 Descargar PDF Pro", deferred_pdf("analisis"), f"Reporte_{st.session_state.cliente}.pdf", "application/pdf", on_click="ignore", type="primary", use_container_width=True)
+
+with tab2:
+    analysis_panel()
 
 # --- TAB 3: DEUDAS ---
-with tab3:
+@st.fragment(key="deudas")
+@prof.fragment("deudas")
+def debts_panel():
     st.markdown("### 📝 Control de Deudas")
     with st.container():
-        dc1, dc2, dc3, dc4 = st.columns([3, 2, 2, 1])
+        dc1, dc2, dc3, dc4, dc5 = st.columns([3, 2, 2, 2, 1])
         with dc1: n_acreedor = st.text_input("Acreedor", placeholder="Banco...", label_visibility="collapsed")
         with dc2: n_monto = st.number_input("Monto Deuda", min_value=0.0, label_visibility="collapsed")
         with dc3: n_tasa = st.number_input("Interés %", min_value=0.0, label_visibility="collapsed")
-        with dc4:
+        with dc4: n_minimo = st.number_input("Pago mínimo", min_value=0.0, value=None, placeholder="Mínimo (opcional)", label_visibility="collapsed")
+        with dc5:
             if st.button("➕", use_container_width=True):
                 if n_acreedor and n_monto:
-                    st.session_state.deudas.append({"id": int(datetime.now().timestamp()*1000), "acreedor": n_acreedor, "monto": n_monto, "tasa": n_tasa})
-                    st.rerun()
+                    st.session_state.deudas.append({"id": int(datetime.now().timestamp()*1000), "acreedor": n_acreedor, "monto": n_monto, "tasa": n_tasa, "minimo": n_minimo})
+                    rerun_panel()
     if st.session_state.deudas:
         st.write("")
         for d in st.session_state.deudas:
-            st.markdown(f"""<div style="background:{card_bg}; padding:15px; border-radius:15px; border:1px solid {input_border}; margin-bottom:10px; display:flex; justify-content:space-between; align-items:center; color:{text_color}; box-shadow:{shadow_style};"><div><div style="font-weight:bold;">{d['acreedor']}</div><div style="font-size:0.8rem; color:{color_gasto};">Tasa: {d['tasa']}%</div></div><div style="font-weight:bold; color:{color_gasto};">{format_money(d['monto'])}</div></div>""", unsafe_allow_html=True)
+            st.markdown(f"""<div style="background:{card_bg}; padding:15px; border-radius:15px; border:1px solid {input_border}; margin-bottom:10px; display:flex; justify-content:space-between; align-items:center; color:{text_color}; box-shadow:{shadow_style};"><div><div style="font-weight:bold;">{d['acreedor']}</div><div style="font-size:0.8rem; color:{color_gasto};">Tasa: {d['tasa']}%{f" · Mínimo: {format_money(d['minimo'])}" if d.get('minimo') else ""}</div></div><div style="font-weight:bold; color:{color_gasto};">{format_money(d['monto'])}</div></div>""", unsafe_allow_html=True)
             if st.button("Eliminar", key=f"dd_{d['id']}"):
                 st.session_state.deudas = [x for x in st.session_state.deudas if x['id'] != d['id']]
-                st.rerun()
+                rerun_panel()
+
+        st.markdown("#### 📉 Plan de Pago")
+        deudas = st.session_state.deudas
+        nombres_deudas = [f"{i + 1}. {d['acreedor']}" for i, d in enumerate(deudas)]
+        pc1, pc2 = st.columns([1, 2])
+        with pc1:
+            presupuesto_deudas = st.number_input("Presupuesto mensual para deudas ($)", min_value=0.0, value=None, step=100.0, placeholder="0.00")
+            orden_sel = st.multiselect("Orden personalizado (prioridad)", nombres_deudas, default=nombres_deudas,
+                                       help="Las deudas que no elijas se pagan al final, en el orden de alta.")
+        if presupuesto_deudas:
+            import pandas as pd
+            from consultoria.debts import compare_strategies, summary_rows
+            from consultoria.figures import debt_figure
+            # Deudas elegidas primero, en el orden elegido; el resto después.
+            personalizado = [nombres_deudas.index(n) for n in orden_sel]
+            personalizado += [i for i in range(len(deudas)) if i not in personalizado]
+            plan = compare_strategies(deudas, presupuesto_deudas, personalizado)
+            with pc1:
+                if presupuesto_deudas < plan['minimo_total']:
+                    st.warning(f"El presupuesto no cubre los pagos mínimos ({format_money(plan['minimo_total'])}).")
+                resumen_plan = pd.DataFrame(
+                    [(n, format_years(m), format_money(i), format_money(t)) if m >= 0 else (n, "No se liquida", "—", "—") for n, m, i, t in summary_rows(plan)],
+                    columns=["Estrategia", "Tiempo", "Intereses", "Total pagado"],
+                )
+                st.dataframe(resumen_plan, hide_index=True, use_container_width=True)
+            with pc2:
+                fig_d = debt_figure(tuple((d['monto'], d['tasa'], d.get('minimo')) for d in deudas), presupuesto_deudas, tuple(personalizado), text_color)
+                st.plotly_chart(fig_d, use_container_width=True)
+            pdf_deudas = deferred_pdf("deudas", {"deudas": [dict(d) for d in deudas], "presupuesto": presupuesto_deudas, "personalizado": personalizado})
+            st.download_button("⬇️ PDF Plan de Deudas", pdf_deudas, "Plan_Deudas.pdf", "application/pdf", on_click="ignore")
+
+with tab3:
+    debts_panel()
 
 # --- TAB 4: PROYECCIONES ---
-with tab4:
+@st.fragment(key="proyecciones")
+@prof.fragment("proyecciones")
+def projection_panel():
+    from consultoria.projections import project
     st.markdown("### 🧮 Calculadora de Ahorro")
     col_calc, col_graph = st.columns([1, 2])
     with col_calc:
-        ahorro_mes = st.number_input("Ahorro Mensual ($)", min_value=0.0, value=None, step=100.0, placeholder="0.00")
-        meses_input = st.slider("Periodo (Meses)", 1, 60, 12)
+        ahorro_mes = st.number_input("Ahorro Mensual ($)", min_value=0.0, value=None, step=100.0, placeholder="0.00", key="ahorro_mes")
+        meses_input = st.slider("Periodo (Meses)", 1, 480, 12)
         st.caption(f"📅 Equivalente a: **{format_years(meses_input)}**")
+        with st.expander("📈 Supuestos"):
+            tasa_anual = st.number_input("Rendimiento anual (%)", min_value=-20.0, max_value=50.0, value=0.0, step=0.5)
+            inflacion_anual = st.number_input("Inflación anual (%)", min_value=0.0, max_value=50.0, value=0.0, step=0.5)
+            crecimiento_anual = st.number_input("Aumento anual del ahorro (%)", min_value=0.0, max_value=50.0, value=0.0, step=0.5)
+            volatilidad_anual = st.number_input("Volatilidad anual (%)", min_value=0.0, max_value=100.0, value=0.0, step=1.0,
+                                                help="Mayor que cero: simula miles de trayectorias y muestra la banda P10–P90.")
         
         ahorro_val = ahorro_mes if ahorro_mes is not None else 0.0
-        total_proy = ahorro_val * meses_input
+        supuestos = {"tasa": tasa_anual / 100, "inflacion": inflacion_anual / 100, "crecimiento": crecimiento_anual / 100}
+        proy = project(ahorro_val, meses_input, **supuestos)
+        total_proy = float(proy['capital'][-1])
+        real_proy = f"<div style='font-size:0.8rem; opacity:0.9;'>≈ {format_money(proy['real'][-1])} de hoy</div>" if inflacion_anual else ""
         
-        st.markdown(f"""<div style="background: linear-gradient(135deg, {color_proyeccion} 0%, #007AFF 100%); padding:25px; border-radius:20px; color:white; text-align:center; margin-top:20px; box-shadow:{shadow_style};"><div style="font-size:0.9rem; opacity:0.9; letter-spacing:1px;">CAPITAL ACUMULADO</div><div style="font-size:2.2rem; font-weight:800;">{format_money(total_proy)}</div><div style="font-size:0.9rem;">en {format_years(meses_input)}</div></div>""", unsafe_allow_html=True)
+        st.markdown(f"""<div style="background: linear-gradient(135deg, {color_proyeccion} 0%, #007AFF 100%); padding:25px; border-radius:20px; color:white; text-align:center; margin-top:20px; box-shadow:{shadow_style};"><div style="font-size:0.9rem; opacity:0.9; letter-spacing:1px;">CAPITAL ACUMULADO</div><div style="font-size:2.2rem; font-weight:800;">{format_money(total_proy)}</div><div style="font-size:0.9rem;">en {format_years(meses_input)}</div>{real_proy}</div>""", unsafe_allow_html=True)
         st.write("")
-        pdf_proj = create_pro_pdf("proyeccion", {"ahorro": ahorro_val, "meses": meses_input, "total": total_proy})
-        st.download_button("⬇️ PDF Proyección", pdf_proj, "Proyeccion_Ahorro.pdf", "application/pdf", use_container_width=True)
+        pdf_proj = deferred_pdf("proyeccion", dict(supuestos, ahorro=ahorro_val, meses=meses_input, total=total_proy, volatilidad=volatilidad_anual / 100))
+        st.download_button("⬇️ PDF Proyección", pdf_proj, "Proyeccion_Ahorro.pdf", "application/pdf", on_click="ignore", use_container_width=True)
     with col_graph:
         if ahorro_val > 0:
-            data_p = [{"Mes": m, "Total": ahorro_val * m} for m in range(1, meses_input + 1)]
-            df_p = pd.DataFrame(data_p)
-            
+            from consultoria.figures import projection_figure
             # --- PROJECTION: DARK BLUE ---
-            fig_p = px.area(df_p, x="Mes", y="Total", title="Crecimiento del Capital", color_discrete_sequence=[color_proyeccion])
-            
-            fig_p.update_layout(
-                paper_bgcolor='rgba(0,0,0,0)', 
-                plot_bgcolor='rgba(0,0,0,0)', 
-                font=dict(color=text_color)
-            )
+            fig_p = projection_figure(ahorro_val, meses_input, supuestos["tasa"], supuestos["inflacion"], supuestos["crecimiento"],
+                                      volatilidad_anual / 100, (color_proyeccion, color_gasto), text_color)
             st.plotly_chart(fig_p, use_container_width=True)
 
+with tab4:
+    projection_panel()
+
 # --- TAB 5: BASE DE DATOS ---
-with tab5:
-    st.header("🗄️ Historial y Clientes")
-    
+@st.fragment(key="guardar")
+@prof.fragment("guardar")
+def save_panel():
     with st.container():
         st.markdown("#### 💾 Guardar Corte de Mes")
         current_ing, current_gas, current_bal = get_balance()
@@ -803,15 +881,14 @@ with tab5:
         else:
              col_db1, col_db2, col_db3 = st.columns([2, 2, 1])
              with col_db1:
-                 mes_cierre = st.selectbox("Mes de Corte", ["Enero", "Febrero", "Marzo", "Abril", "Mayo", "Junio", "Julio", "Agosto", "Septiembre", "Octubre", "Noviembre", "Diciembre"], index=datetime.now().month - 1)
+                 mes_cierre = st.selectbox("Mes de Corte", MESES, index=datetime.now().month - 1)
              with col_db2:
                  anio_cierre = st.number_input("Año", min_value=2020, max_value=2030, value=datetime.now().year, step=1)
              with col_db3:
                  st.write("")
                  st.write("")
                  if st.button("Guardar Historial", type="primary", use_container_width=True):
-                     pdf_actual_bytes = create_pro_pdf("analisis")
-                     ahorro_actual = ahorro_mes if 'ahorro_mes' in locals() and ahorro_mes else 0.0
+                     ahorro_actual = st.session_state.get("ahorro_mes") or 0.0
                      
                      nuevo_registro = {
                          "id": int(datetime.now().timestamp() * 1000),
@@ -829,51 +906,97 @@ with tab5:
                          "Egresos": current_gas,
                          "Balance": current_bal,
                          "Ahorro_Proyectado": float(ahorro_actual),
-                         "PDF_Bytes": pdf_actual_bytes
                      }
-                     st.session_state.historial_db.append(nuevo_registro)
-                     
-                     save_data(st.session_state.historial_db)
-                     
-                     st.success(f"✅ Historial guardado para {st.session_state.cliente}. Campos reiniciados.")
-                     clear_form_data()
-                     time.sleep(1)
-                     st.rerun()
+                     # El alta se escribe aquí y solo el PDF corre en segundo plano: los campos
+                     # se reinician cuando el corte ya está en la base.
+                     snap = report_snapshot()
+                     try:
+                         get_history().append(nuevo_registro)
+                     except Exception as e:
+                         st.error(f"Error guardando datos: {e}")
+                     else:
+                         queue_save_pdf(nuevo_registro, snap)
+                         st.toast(f"✅ Corte de {st.session_state.cliente} guardado. Campos reiniciados.")
+                         clear_form_data()
+                         st.rerun()
 
     st.markdown("---")
     
-    if st.session_state.historial_db:
-        excel_bytes = generate_complex_excel(st.session_state.historial_db)
-            
-        st.download_button(
-            label="📊 Descargar Excel Completo",
-            data=excel_bytes,
-            file_name="Base_Datos_Clientes_Completa.xlsx",
-            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            type="secondary"
-        )
-    
-    st.markdown("---")
-    
+    if historial_db:
+        # El libro se arma en segundo plano; mientras la versión no cambie se descarga directo.
+        excel_listo = get_excel_cache().peek(get_store().version)
+        if excel_listo is not None:
+            st.download_button(
+                label="📊 Descargar Excel Completo",
+                data=excel_listo,
+                file_name="Base_Datos_Clientes_Completa.xlsx",
+                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                on_click="ignore",
+                type="secondary"
+            )
+            prof.count("bytes.descarga.excel", len(excel_listo))
+        elif st.button("📊 Preparar Excel Completo", disabled=active_job("excel")):
+            if submit_job("excel", excel_job, get_store(), get_excel_cache(), etiqueta="Excel completo"):
+                st.rerun()
+
+        with st.expander("📦 Reportes de Todos los Clientes"):
+            st.caption("Genera los PDF de análisis y proyección de cada corte guardado, en paralelo, dentro de un ZIP.")
+            if st.button("Generar reportes", key="lote_btn", disabled=active_job("lote")):
+                if submit_job("lote", batch_job, historial_db, etiqueta="Reportes de todos los clientes"):
+                    st.rerun()
+            st.caption("El ZIP queda en el panel de trabajos al terminar.")
+
+@st.fragment(key="directorio")
+@prof.fragment("directorio")
+def directory_panel():
     st.subheader("👥 Clientes Registrados")
-    if st.session_state.historial_db:
-        df_full = pd.DataFrame(st.session_state.historial_db)
-        lista_clientes = df_full['Cliente'].unique()
-        for nombre_cliente in lista_clientes:
-            with st.expander(f"👤 {nombre_cliente}"):
+    # Al re-ejecutarse solo, el fragmento no pasa por la sincronización del inicio del script.
+    historial_db = sync_history()
+    if historial_db:
+        # Directorio paginado: solo el cliente seleccionado dibuja su detalle y sus descargas.
+        lista_clientes = historial_db.clientes()
+        buscar_cliente = st.text_input("🔍 Buscar cliente", key="dir_buscar", placeholder="Nombre, ocupación o email (sin acentos, tolera errores)...")
+        buscador = get_client_search()
+        if buscar_cliente and buscador.ready:
+            with prof.span("busqueda.clientes"):
+                presentes = set(lista_clientes)
+                lista_clientes = [c for c in buscador.search(buscar_cliente) if c in presentes]
+        elif buscar_cliente:
+            # Mientras se arma el índice, solo por nombre.
+            consulta = normalize(buscar_cliente)
+            lista_clientes = [c for c in lista_clientes if consulta in normalize(c)]
+            st.caption("⏳ Preparando el índice de búsqueda; por ahora solo se busca por nombre.")
+        paginas_dir = max(1, -(-len(lista_clientes) // CLIENTES_POR_PAGINA))
+        if st.session_state.get("dir_pagina", 1) > paginas_dir:
+            st.session_state.dir_pagina = paginas_dir
+        dp1, dp2 = st.columns([3, 1])
+        with dp2:
+            pagina_dir = st.number_input("Página de clientes", min_value=1, max_value=paginas_dir, step=1, key="dir_pagina")
+        with dp1:
+            st.caption(f"{len(lista_clientes)} clientes · Página {pagina_dir} de {paginas_dir}")
+        inicio_dir = (pagina_dir - 1) * CLIENTES_POR_PAGINA
+        for nombre_cliente in lista_clientes[inicio_dir:inicio_dir + CLIENTES_POR_PAGINA]:
+            prof.count("filas.clientes")
+            seleccionado = st.session_state.get("dir_cliente") == nombre_cliente
+            periodos_cliente = historial_db.periodos(nombre_cliente)
+            if st.button(f"{'▾' if seleccionado else '▸'} 👤 {nombre_cliente} · {len(periodos_cliente)} cortes · último: {periodos_cliente[-1]}", key=f"ver_cliente_{nombre_cliente}", use_container_width=True):
+                st.session_state.dir_cliente = None if seleccionado else nombre_cliente
+                rerun_panel()
+            if not seleccionado:
+                continue
+            with st.container(border=True):
                 
                 col_title, col_del_client = st.columns([4, 1])
                 with col_del_client:
                     if st.button("⛔ Eliminar Cliente", key=f"del_client_{nombre_cliente}"):
-                        st.session_state.historial_db = [rec for rec in st.session_state.historial_db if rec['Cliente'] != nombre_cliente]
-                        save_data(st.session_state.historial_db)
-                        st.success(f"Cliente {nombre_cliente} eliminado.")
-                        time.sleep(1)
+                        delete_client_records(nombre_cliente)
+                        st.session_state.dir_cliente = None
+                        st.toast(f"Cliente {nombre_cliente} eliminado.")
                         st.rerun()
                         
-                registros_cliente = df_full[df_full['Cliente'] == nombre_cliente]
-                if not registros_cliente.empty:
-                    ultimo_reg = registros_cliente.iloc[-1]
+                registros_cliente = historial_db.registros(nombre_cliente)
+                if registros_cliente:
+                    ultimo_reg = historial_db.ultimo(nombre_cliente)
                     
                     st.markdown("##### ✏️ Datos Personales")
                     
@@ -890,7 +1013,7 @@ with tab5:
                         
                         if st.button("✏️ Editar Datos Personales", key=f"btn_edit_{nombre_cliente}"):
                             st.session_state[key_edit] = True
-                            st.rerun()
+                            rerun_panel()
                     else:
                         with st.form(key=f"form_edit_{nombre_cliente}"):
                             c_e1, c_e2 = st.columns(2)
@@ -908,26 +1031,156 @@ with tab5:
                             new_sexo = c_e5.selectbox("Sexo", opciones_sexo, index=idx_sexo)
 
                             if st.form_submit_button("💾 Guardar Cambios"):
-                                for rec in st.session_state.historial_db:
-                                    if rec['Cliente'] == nombre_cliente:
-                                        rec['Ocupacion'] = new_ocupacion
-                                        rec['Telefono'] = new_telefono
-                                        rec['Email'] = new_email
-                                        rec['Edad'] = new_edad
-                                        rec['Sexo'] = new_sexo
-                                
-                                save_data(st.session_state.historial_db)
+                                cambios = {
+                                    'Ocupacion': new_ocupacion,
+                                    'Telefono': new_telefono,
+                                    'Email': new_email,
+                                    'Edad': new_edad,
+                                    'Sexo': new_sexo
+                                }
+                                update_client_records(nombre_cliente, cambios)
                                 st.session_state[key_edit] = False
                                 st.success("Datos actualizados correctamente.")
-                                st.rerun()
+                                rerun_panel()
+
+                    tendencia = get_store().client_trend(nombre_cliente)
+                    if tendencia:
+                        st.markdown("##### 📈 Tendencia")
+                        ult_mes = tendencia[-1]
+                        c_t1, c_t2, c_t3, c_t4 = st.columns(4)
+                        for col_t, etiqueta, campo in ((c_t1, "Ingresos", "ingresos"), (c_t2, "Egresos", "egresos"), (c_t3, "Balance", "balance"), (c_t4, "Ahorro Proyectado", "ahorro")):
+                            delta_t = ult_mes[f"delta_{campo}"]
+                            col_t.metric(etiqueta, format_money(ult_mes[campo]), None if delta_t is None else format_money(delta_t),
+                                         delta_color="inverse" if campo == "egresos" else "normal",
+                                         help=f"Promedio: {format_money(ult_mes[f'prom_{campo}'])}")
+                        if len(tendencia) > 1:
+                            from consultoria.figures import trend_figure
+                            fig_t = trend_figure(tuple(f"{MESES[t['mes'] - 1][:3]} {t['anio']}" for t in tendencia),
+                                                 tuple(t['ingresos'] for t in tendencia), tuple(t['egresos'] for t in tendencia),
+                                                 tuple(t['balance'] for t in tendencia), tuple(t['prom_balance'] for t in tendencia),
+                                                 (color_ingreso, color_gasto, color_balance), text_color)
+                            st.plotly_chart(fig_t, use_container_width=True, key=f"tendencia_{nombre_cliente}")
+                        with st.expander("📊 Resumen por año"):
+                            import pandas as pd
+                            st.dataframe(pd.DataFrame(get_store().client_years(nombre_cliente), columns=["Año", "Cortes", "Ingresos", "Egresos", "Balance", "Ahorro Proyectado"]),
+                                         hide_index=True, use_container_width=True)
 
                     st.markdown("##### 📅 Meses Registrados")
                     # CORRECCIÓN: Usar input_border definido anteriormente
-                    for idx, row in registros_cliente.iterrows():
+                    for row in registros_cliente:
+                        prof.count("filas.periodos")
                         col_info, col_dl = st.columns([4, 1])
                         with col_info:
                             st.markdown(f"""<div style="background-color:{card_bg}; padding:12px; border-radius:12px; border:1px solid {input_border}; margin-bottom:8px; display:flex; justify-content:space-between; align-items:center; color:{text_color}; box-shadow:{shadow_style};"><strong>{row['Periodo']}</strong> — <span style="color:{color_ingreso}">Ing: {format_money(row['Ingresos'])}</span> | <span style="color:{color_gasto}">Gas: {format_money(row['Egresos'])}</span></div>""", unsafe_allow_html=True)
                         with col_dl:
-                            st.download_button("📄 PDF", row['PDF_Bytes'], f"Reporte_{row['Cliente']}_{row['Periodo']}.pdf", "application/pdf", key=f"btn_dl_{row['id']}")
+                            if not row.get('PDF_Ref') and row['id'] in get_pending_pdfs():
+                                st.button("⏳ generando…", key=f"btn_gen_{row['id']}", disabled=True)
+                            else:
+                                st.download_button("📄 PDF", prof.track("pdf.historico", lambda rec=row, store=get_store(), cache=get_report_cache(): historical_pdf(rec, store, cache)), f"Reporte_{row['Cliente']}_{row['Periodo']}.pdf", "application/pdf", key=f"btn_dl_{row['id']}", on_click="ignore")
     else:
         st.info("No hay clientes en la base de datos.")
+
+@st.fragment(key="cartera")
+@prof.fragment("cartera")
+def portfolio_panel():
+    st.subheader("📊 Analítica de Cartera")
+    # La primera lectura decodifica toda la base; después solo se aplican los cambios.
+    if not st.toggle("Mostrar analítica de todos los clientes", key="ver_cartera"):
+        return
+    try:
+        with prof.span("cartera.resumen"):
+            cartera = get_portfolio().summary()
+    except Exception as e:
+        st.error(f"Error calculando la cartera: {e}")
+        return
+    if not cartera['clientes']:
+        st.info("No hay clientes en la base de datos.")
+        return
+
+    c_p1, c_p2, c_p3, c_p4 = st.columns(4)
+    c_p1.metric("Clientes", f"{cartera['clientes']:,}", help=f"{cartera['cortes']:,} cortes registrados")
+    c_p2.metric("Ingresos Gestionados", format_money(cartera['Ingresos']), help="Suma del último corte de cada cliente")
+    c_p3.metric("Balance Total", format_money(cartera['Balance']), help=f"Mediana por cliente: {format_money(cartera['percentiles']['p50'])}")
+    c_p4.metric("Clientes en Negativo", f"{len(cartera['negativos']):,}")
+
+    from consultoria.figures import balance_histogram_figure
+    dist = cartera['distribucion']
+    fig_c = balance_histogram_figure(tuple(dist['desde']), tuple(dist['hasta']), tuple(dist['clientes']), color_balance, text_color)
+    st.plotly_chart(fig_c, use_container_width=True)
+
+    columnas_desglose = {"clientes": "Clientes", "ingresos": "Ingresos", "egresos": "Egresos", "balance_medio": "Balance Medio", "negativos": "En Negativo"}
+    c_d1, c_d2 = st.columns(2)
+    with c_d1:
+        st.markdown("##### Por Edad")
+        st.dataframe(cartera['por_edad'].rename(columns={"banda_edad": "Edad", **columnas_desglose}), hide_index=True, use_container_width=True)
+    with c_d2:
+        st.markdown("##### Por Sexo")
+        st.dataframe(cartera['por_sexo'].rename(columns=columnas_desglose), hide_index=True, use_container_width=True)
+
+    if len(cartera['negativos']):
+        with st.expander(f"⚠️ Clientes con Balance Negativo ({len(cartera['negativos'])})"):
+            st.dataframe(cartera['negativos'], hide_index=True, use_container_width=True)
+
+def jobs_panel():
+    trabajos = session_jobs()
+    if not trabajos:
+        return
+    st.markdown("#### ⏳ Trabajos en Segundo Plano")
+    terminados = []
+    for job in trabajos:
+        if job.activo:
+            st.progress(job.progreso, text=f"{job.etiqueta} · {job.mensaje or job.estado}")
+            continue
+        terminados.append(job.id)
+        if job.error:
+            st.error(f"{job.etiqueta}: {job.error}")
+        elif job.tipo == "lote":
+            c_j1, c_j2 = st.columns([3, 1])
+            c_j1.success(f"✅ {job.etiqueta}: listo")
+            c_j2.download_button("⬇️ Descargar ZIP", job.resultado.read, "Reportes_Clientes.zip", "application/zip", key=f"dl_{job.id}", on_click="ignore")
+        else:
+            st.success(f"✅ {job.etiqueta}: listo")
+    if terminados and st.button("Limpiar terminados", key="trabajos_limpiar"):
+        st.session_state.trabajos = [job_id for job_id in st.session_state.trabajos if job_id not in terminados]
+        st.rerun()
+    # Un trabajo que acaba de terminar cambia datos de otros paneles (directorio, Excel):
+    # se re-ejecuta la app una vez y, sin trabajos activos, el panel deja de consultar.
+    nuevos = set(terminados) - st.session_state.trabajos_avisados
+    if nuevos:
+        st.session_state.trabajos_avisados |= nuevos
+        st.rerun()
+
+with tab5:
+    st.header("🗄️ Historial y Clientes")
+    # Solo consulta periódicamente mientras la sesión tenga trabajos en cola o en curso.
+    st.fragment(prof.fragment("trabajos")(jobs_panel), key="trabajos",
+                run_every=TRABAJOS_INTERVALO if any(job.activo for job in session_jobs()) else None)()
+    save_panel()
+    st.markdown("---")
+    portfolio_panel()
+    st.markdown("---")
+    directory_panel()
+
+# --- Panel de Depuración ---
+ultimo_run = prof.end()
+if DEBUG_PANEL or st.query_params.get("debug") == "1":
+    import pandas as pd
+    with st.sidebar:
+        st.markdown("### 🛠️ Depuración")
+        st.caption(f"Sesión {prof.session} · último rerun: {ultimo_run['total_ms']:.1f} ms")
+        st.markdown("**Tramos**")
+        st.dataframe(pd.DataFrame(ultimo_run['spans'], columns=["Tramo", "ms"]), hide_index=True, use_container_width=True)
+        if ultimo_run['counters']:
+            st.markdown("**Contadores**")
+            st.dataframe(pd.DataFrame(list(ultimo_run['counters'].items()), columns=["Contador", "Valor"]), hide_index=True, use_container_width=True)
+        st.markdown("**Reruns recientes**")
+        st.dataframe(pd.DataFrame([(datetime.fromtimestamp(r['ts']).strftime('%H:%M:%S'), r.get('fragmento', 'app'), r['total_ms'], r.get('interrumpido', False)) for r in reversed(prof.runs)], columns=["Hora", "Alcance", "ms", "Interrumpido"]), hide_index=True, use_container_width=True)
+        if prof.events:
+            st.markdown("**Descargas**")
+            st.dataframe(pd.DataFrame([(e['nombre'], e['ms'], e['bytes']) for e in reversed(prof.events)], columns=["Descarga", "ms", "Bytes"]), hide_index=True, use_container_width=True)
+        st.markdown("**Caché de reportes**")
+        st.json(get_report_cache().stats())
+        st.markdown("**Trabajos**")
+        st.json(get_jobs().stats())
+        if PROFILE_LOG:
+            st.caption(f"Registrando en {PROFILE_LOG}")
@@ -0,0 +1,39 @@
+import os
+import time
+
+from consultoria.blobs import PRUNE_GRACE, BlobStore
+
+
+def _age(store, ref, segundos):
+    antes = time.time() - segundos
+    os.utime(store._path(ref), (antes, antes))
+
+
+def test_put_dedupes_by_content(tmp_path):
+    store = BlobStore(str(tmp_path))
+    ref = store.put(b'%PDF-1')
+    assert store.put(b'%PDF-1') == ref
+    assert store.put(b'%PDF-2') != ref
+    assert sorted(store.refs()) == sorted({ref, store.put(b'%PDF-2')})
+    assert store.get(ref) == b'%PDF-1'
+    assert store.get('no-existe') is None
+    assert store.get(None) is None
+
+
+def test_prune_keeps_referenced_and_recent(tmp_path):
+    store = BlobStore(str(tmp_path))
+    vivo, huerfano, reciente = store.put(b'vivo'), store.put(b'huerfano'), store.put(b'reciente')
+    _age(store, vivo, PRUNE_GRACE * 2)
+    _age(store, huerfano, PRUNE_GRACE * 2)
+    assert store.prune({vivo}) == 1
+    assert set(store.refs()) == {vivo, reciente}
+
+
+def test_reused_blob_survives_prune(tmp_path):
+    store = BlobStore(str(tmp_path))
+    ref = store.put(b'%PDF')
+    _age(store, ref, PRUNE_GRACE * 2)
+    # Otro corte con el mismo PDF reutiliza el blob antes de que su registro se confirme.
+    assert store.put(b'%PDF') == ref
+    assert store.prune(set()) == 0
+    assert store.get(ref) == b'%PDF'
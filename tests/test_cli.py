@@ -0,0 +1,9 @@
+from consultoria.cli import main
+
+
+def test_missing_db_fails_without_creating_it(tmp_path, capsys):
+    ruta = tmp_path / 'typo.sqlite3'
+    assert main(['excel', str(tmp_path / 'Base.xlsx'), '--db', str(ruta)]) == 2
+    assert 'typo.sqlite3' in capsys.readouterr().err
+    assert not ruta.exists()
+    assert not (tmp_path / 'Base.xlsx').exists()
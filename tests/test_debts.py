@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+
+from consultoria.debts import best_strategy, compare_strategies, summary_rows, yearly_schedule
+
+DEUDAS = [
+    {'monto': 5000, 'tasa': 36, 'minimo': 150},
+    {'monto': 1000, 'tasa': 12, 'minimo': 50},
+    {'monto': 8000, 'tasa': 24, 'minimo': 200},
+]
+
+
+def test_strategy_orders():
+    resultado = compare_strategies(DEUDAS, 1000, personalizado=[2, 1, 0])
+    assert resultado['ordenes'].tolist() == [[0, 2, 1], [1, 0, 2], [2, 1, 0]]
+
+
+def test_payments_cover_balance_plus_interest():
+    resultado = compare_strategies(DEUDAS, 1000)
+    assert (resultado['meses'] > 0).all()
+    total = sum(d['monto'] for d in DEUDAS)
+    np.testing.assert_allclose(resultado['pagado_total'], total + resultado['intereses_totales'], atol=0.05)
+    # El presupuesto es fijo: ningún mes se paga más de lo disponible.
+    assert resultado['pago'].sum(axis=2).max() <= 1000 + 1e-9
+    # Avalancha nunca paga más intereses que bola de nieve.
+    avalancha, bola, _ = summary_rows(resultado)
+    assert avalancha[2] <= bola[2]
+    assert best_strategy(resultado) == 0
+
+    calendario = yearly_schedule(resultado, 0)
+    assert calendario[-1][0] == avalancha[1]
+    assert calendario[-1][3] == pytest.approx(0.0)
+    assert sum(fila[1] for fila in calendario) == pytest.approx(avalancha[3])
+
+
+def test_budget_below_interest_never_pays_off():
+    resultado = compare_strategies([{'monto': 10000, 'tasa': 60, 'minimo': 100}], 300)
+    assert (resultado['meses'] == -1).all()
+    assert best_strategy(resultado) is None
+    assert summary_rows(resultado)[0] == ('Avalancha', -1, None, None)
+    # La simulación se corta al primer año sin reducir la deuda.
+    assert resultado['pago'].shape[1] == 12
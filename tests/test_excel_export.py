@@ -0,0 +1,80 @@
+import io
+import zipfile
+
+from openpyxl import load_workbook
+
+from consultoria.excel_export import generate_complex_excel
+
+
+def _corte(record_id, cliente, periodo, ingresos, **extra):
+    mes, anio = periodo.split()
+    return {
+        'id': record_id, 'Cliente': cliente, 'Ocupacion': 'Docente', 'Telefono': '5512345678',
+        'Email': f'{cliente.lower()}@ejemplo.com', 'Edad': 40, 'Sexo': 'Femenino',
+        'Periodo': periodo, 'Mes': mes, 'Año': int(anio),
+        'Ingresos': ingresos, 'Egresos': 100.0, 'Balance': ingresos - 100.0, 'Ahorro_Proyectado': 0.0, **extra,
+    }
+
+
+def _valores(ws):
+    return [[c.value for c in fila] for fila in ws.iter_rows()]
+
+
+def test_workbook_layout():
+    datos = [_corte(1, 'Luis', 'Enero 2024', 500.0), _corte(2, 'Ana', 'Enero 2024', 900.0),
+             _corte(3, 'Luis', 'Febrero 2024', 650.5, Ocupacion='Arquitecto')]
+    wb = load_workbook(io.BytesIO(generate_complex_excel(datos)))
+    assert wb.sheetnames == ['Resumen Clientes', 'Luis', 'Ana']
+
+    resumen = wb['Resumen Clientes']
+    assert _valores(resumen) == [
+        ['Cliente', 'Ocupacion', 'Telefono', 'Email', 'Edad', 'Sexo'],
+        ['Ana', 'Docente', '5512345678', 'ana@ejemplo.com', 40, 'Femenino'],
+        ['Luis', 'Arquitecto', '5512345678', 'luis@ejemplo.com', 40, 'Femenino'],
+    ]
+    assert resumen['A1'].font.b and resumen['A1'].border.left.style == 'thin'
+    assert resumen.column_dimensions['F'].width == 20
+
+    luis = wb['Luis']
+    assert luis['B2'].value == 'Dato' and luis['B2'].font.b
+    assert [luis.cell(fila, 3).value for fila in range(3, 9)] == [
+        'Luis', 'Arquitecto', '5512345678', 'luis@ejemplo.com', 40, 'Femenino']
+    assert luis['B10'].value == 'Historial Financiero'
+    assert [c.value for c in luis[11]][1:] == ['Periodo', 'Mes', 'Año', 'Ingresos', 'Egresos', 'Balance', 'Ahorro_Proyectado']
+    assert [c.value for c in luis[13]][1:5] == ['Febrero 2024', 'Febrero', 2024, 650.5]
+
+
+def test_titles_are_sanitized_and_unique():
+    datos = [_corte(1, 'Pérez & "Hijos" <SA>', 'Enero 2024', 1.0), _corte(2, 'pérez & "hijos" <sa>', 'Enero 2024', 1.0),
+             _corte(3, 'a/b:c', 'Enero 2024', 1.0), _corte(4, 'X' * 40, 'Enero 2024', 1.0),
+             _corte(5, 'X' * 35, 'Enero 2024', 1.0)]
+    wb = load_workbook(io.BytesIO(generate_complex_excel(datos)))
+    assert wb.sheetnames[1:] == ['Pérez & "Hijos" <SA>', 'pérez & "hijos" <sa>1', 'abc', 'X' * 30, 'X' * 30 + '1']
+
+
+def test_odd_values():
+    datos = [_corte(1, 'Ana', 'Enero 2024', float('nan'), Email='a\x01b ', Telefono=None)]
+    wb = load_workbook(io.BytesIO(generate_complex_excel(datos)))
+    ana = wb['Ana']
+    assert ana['C6'].value == 'ab '
+    assert ana['C5'].value is None
+    assert ana['E12'].value is None
+
+
+def test_sheet_cache_rebuilds_only_changed_clients():
+    datos = [_corte(i, f'Cliente {i}', 'Enero 2024', 100.0 + i) for i in range(5)]
+    hojas = {}
+    primero = generate_complex_excel(datos, hojas)
+    assert set(hojas) == {f'Cliente {i}' for i in range(5)}
+    previas = dict(hojas)
+
+    datos[2] = dict(datos[2], Ingresos=999.0)
+    del datos[4]
+    segundo = generate_complex_excel(datos, hojas)
+    assert hojas['Cliente 0'] is previas['Cliente 0']
+    assert hojas['Cliente 2'] is not previas['Cliente 2']
+    assert 'Cliente 4' not in hojas
+    assert load_workbook(io.BytesIO(segundo))['Cliente 2']['E12'].value == 999.0
+    # Sin caché el resultado es el mismo archivo.
+    assert generate_complex_excel(datos) == segundo
+    assert zipfile.ZipFile(io.BytesIO(primero)).testzip() is None
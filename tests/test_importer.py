@@ -0,0 +1,55 @@
+import builtins
+import io
+
+from openpyxl import Workbook
+
+from consultoria.importer import import_statement
+
+
+def _xlsx(filas):
+    wb = Workbook()
+    for fila in filas:
+        wb.active.append(fila)
+    salida = io.BytesIO()
+    wb.save(salida)
+    salida.seek(0)
+    return salida
+
+
+def test_csv_blank_line_keeps_row_numbers():
+    texto = "fecha,concepto,monto\n2024-01-05,Nómina,1000\n\n2024-01-06,Café,abc\n,Renta,-500\n"
+    resultado = import_statement(io.BytesIO(texto.encode()), 'estado.csv', hoy='2024-01-31')
+    assert resultado.aceptados == 2
+    assert resultado.rechazados == 1
+    assert resultado.muestras == [(4, 'monto inválido o cero')]
+
+
+def test_xlsx_blank_row_keeps_row_numbers():
+    archivo = _xlsx([
+        ('fecha', 'concepto', 'monto'),
+        ('2024-01-05', 'Nómina', 1000),
+        (None, None, None),
+        (None, None, None),
+        ('2024-01-06', '', 20),
+        (None, None, None),
+    ])
+    resultado = import_statement(archivo, 'estado.xlsx', hoy='2024-01-31')
+    assert resultado.aceptados == 1
+    assert resultado.muestras == [(5, 'concepto vacío')]
+
+
+def test_path_is_closed(tmp_path, monkeypatch):
+    ruta = tmp_path / 'estado.csv'
+    ruta.write_text("concepto,monto\nNómina,1000\n", encoding='utf-8')
+    abiertos = []
+    original = builtins.open
+
+    def registrar(*args, **kwargs):
+        abiertos.append(original(*args, **kwargs))
+        return abiertos[-1]
+
+    monkeypatch.setattr(builtins, 'open', registrar)
+    resultado = import_statement(str(ruta), ruta.name)
+    monkeypatch.undo()
+    assert resultado.columnas['concepto'] == ['Nómina']
+    assert abiertos and all(f.closed for f in abiertos)
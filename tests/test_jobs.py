@@ -0,0 +1,66 @@
+import os
+import threading
+
+import pytest
+
+from consultoria.jobs import FALLIDO, LISTO, FileResult, JobRunner, QueueFull
+
+
+def _espera(evento):
+    def trabajo(progress):
+        evento.wait(5)
+        progress(1.0)
+        return 'hecho'
+    return trabajo
+
+
+def test_queue_is_bounded_per_pool():
+    liberar = threading.Event()
+    runner = JobRunner(max_workers=1, max_pending=2, dedicated={'guardar': 1})
+    try:
+        ids = [runner.submit('lote', _espera(liberar)) for _ in range(2)]
+        with pytest.raises(QueueFull):
+            runner.submit('excel', _espera(liberar))
+        # El carril de guardados tiene su propio cupo aunque el pool compartido esté lleno.
+        guardado = runner.submit('guardar', lambda progress: 'guardado')
+        liberar.set()
+    finally:
+        runner.shutdown()
+    assert runner.get(guardado).resultado == 'guardado'
+    assert [runner.get(i).estado for i in ids] == [LISTO, LISTO]
+    assert runner.get(ids[0]).progreso == 1.0
+
+
+def test_failed_job_and_pruned_file_results():
+    runner = JobRunner(max_workers=1, max_finished=1)
+
+    def terminar():
+        runner._pool.submit(lambda: None).result()
+
+    def escribir(progress):
+        resultado = FileResult('.zip')
+        with open(resultado.path, 'wb') as f:
+            f.write(b'PK')
+        return resultado
+
+    fallido = runner.submit('lote', lambda progress: 1 / 0)
+    terminar()
+    assert runner.get(fallido).estado == FALLIDO
+    assert runner.get(fallido).error == 'division by zero'
+
+    primero = runner.submit('lote', escribir)
+    terminar()
+    segundo = runner.submit('lote', escribir)
+    terminar()
+    zip_primero, zip_segundo = runner.get(primero).resultado, runner.get(segundo).resultado
+    assert runner.get(fallido) is None
+    assert zip_primero.read() == b'PK'
+
+    # Al encolar otro, solo se conserva el último terminado y se borra el ZIP descartado.
+    runner.submit('lote', lambda progress: None)
+    assert runner.get(primero) is None
+    assert not os.path.exists(zip_primero.path)
+    assert runner.get(segundo).estado == LISTO and zip_segundo.size == 2
+
+    runner.shutdown()
+    assert not os.path.exists(zip_segundo.path)
@@ -0,0 +1,48 @@
+import pytest
+
+from consultoria.ledger import Ledger
+
+
+def _mov(tx_id, monto, tipo='Gasto', concepto='Café'):
+    return {'id': tx_id, 'fecha': '2024-01-05', 'concepto': concepto, 'monto': monto, 'tipo': tipo}
+
+
+def test_totals_follow_every_change():
+    ledger = Ledger([_mov(1, 1000.0, 'Ingreso', 'Nómina'), _mov(2, 0.1), _mov(3, 0.2)])
+    assert ledger.balance() == pytest.approx((1000.0, 0.3, 999.7))
+
+    ledger.update(2, monto=5.0)
+    ledger.update(3, tipo='Ingreso')
+    assert ledger.balance() == pytest.approx((1000.2, 5.0, 995.2))
+    assert (ledger.contar('Ingreso'), ledger.contar('Gasto')) == (2, 1)
+
+    # Reemplazar un id no lo cuenta dos veces.
+    ledger.add(_mov(1, 800.0, 'Ingreso', 'Nómina'))
+    assert ledger.totales['Ingreso'] == pytest.approx(800.2)
+    assert len(ledger) == 3
+
+    ledger.remove(2)
+    ledger.remove(99)
+    # Sin gastos, el total vuelve a cero exacto.
+    assert ledger.totales['Gasto'] == 0.0
+    assert ledger.contar('Gasto') == 0
+
+
+def test_extend_assigns_ids_and_adds_totals():
+    ledger = Ledger([_mov(5, 10.0)])
+    agregados = ledger.extend({
+        'fecha': ['2024-01-06', '2024-01-07', '2024-01-08'],
+        'concepto': ['Renta', 'Nómina', 'Súper'],
+        'monto': [500.0, 2000.0, 120.5],
+        'tipo': ['Gasto', 'Ingreso', 'Gasto'],
+    })
+    assert agregados == 3
+    assert ledger.balance() == pytest.approx((2000.0, 630.5, 1369.5))
+    ids = [t.id for t in ledger]
+    assert len(set(ids)) == 4 and ids[1:] == list(range(ids[1], ids[1] + 3))
+    assert ledger.nuevo_id() > ids[-1]
+    assert ledger.extend({'fecha': [], 'concepto': [], 'monto': [], 'tipo': []}) == 0
+
+    assert [t.concepto for t in ledger.pagina(0, 2, tipo='Gasto')] == ['Súper', 'Renta']
+    assert [t.concepto for t in ledger.buscar('super')] == ['Súper']
+    assert ledger.columnas()['monto'] == [10.0, 500.0, 2000.0, 120.5]
@@ -0,0 +1,54 @@
+import sqlite3
+
+from consultoria.portfolio import Portfolio
+from consultoria.storage import PORTFOLIO_COLUMNS, RecordStore
+
+
+def _corte(record_id, cliente, mes, balance, **extra):
+    return {
+        'id': record_id, 'Cliente': cliente, 'Edad': 30, 'Sexo': 'Femenino', 'Mes': mes, 'Año': 2024,
+        'Periodo': f'{mes} 2024', 'Ingresos': 1000.0, 'Egresos': 1000.0 - balance, 'Balance': balance,
+        'Ahorro_Proyectado': 0.0, **extra,
+    }
+
+
+def test_summary_uses_latest_cut_and_follows_changes(tmp_path):
+    store = RecordStore(str(tmp_path / 'db.sqlite3'))
+    store.append_many([
+        _corte(1, 'Ana', 'Marzo', 300.0),
+        _corte(2, 'Ana', 'Enero', -50.0),
+        _corte(3, 'Luis', 'Enero', -20.0, Edad='sin dato', Sexo=None),
+        _corte(4, 'Eva', None, 10.0, Año=None, Fecha=None, Ingresos='250.5'),
+    ])
+    cartera = Portfolio(store)
+    resumen = cartera.summary()
+    assert (resumen['clientes'], resumen['cortes']) == (3, 4)
+    # Ana: cuenta su corte de marzo aunque el de enero se guardó después.
+    assert resumen['Balance'] == 290.0
+    assert resumen['Ingresos'] == 2250.5
+    assert resumen['negativos']['Cliente'].tolist() == ['Luis']
+    por_sexo = resumen['por_sexo'].set_index('Sexo')['clientes']
+    assert (por_sexo['Femenino'], por_sexo['No especificar']) == (2, 1)
+
+    store.update_client('Luis', {'Edad': 70, 'Sexo': 'Masculino'})
+    store.update_record(1, {'Balance': -5.0})
+    store.delete_client('Eva')
+    resumen = cartera.summary()
+    assert resumen['negativos']['Cliente'].tolist() == ['Luis', 'Ana']
+    assert resumen['por_edad'].set_index('banda_edad').loc['65 o más', 'clientes'] == 1
+    assert cartera.frame().sort_index().equals(Portfolio(store).frame().sort_index())
+
+
+def test_old_database_gets_portfolio_columns(tmp_path):
+    ruta = str(tmp_path / 'db.sqlite3')
+    store = RecordStore(ruta)
+    store.append_many([_corte(1, 'Ana', 'Enero', 100.0), _corte(2, 'Luis', 'Febrero', -1.0)])
+    store._conn.close()
+    # Una base anterior a las columnas de cartera: se agregan y se llenan al abrirla.
+    with sqlite3.connect(ruta) as conn:
+        for nombre, _ in PORTFOLIO_COLUMNS:
+            conn.execute(f"ALTER TABLE registros DROP COLUMN {nombre}")
+        conn.execute("DELETE FROM meta WHERE clave = 'cartera'")
+    conn.close()
+    resumen = Portfolio(RecordStore(ruta)).summary()
+    assert (resumen['clientes'], resumen['Balance']) == (2, 99.0)
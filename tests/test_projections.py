@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from consultoria.projections import contributions, monte_carlo, monthly_rate, project
+
+
+def test_project_matches_annuity_formula():
+    tasa = monthly_rate(0.08)
+    assert (1 + tasa) ** 12 == pytest.approx(1.08)
+    p = project(1000, 120, tasa=0.08, inflacion=0.04, capital_inicial=5000)
+    factor = (1 + tasa) ** 120
+    esperado = 5000 * factor + 1000 * (factor - 1) / tasa
+    assert p['capital'][-1] == pytest.approx(esperado)
+    assert p['aportado'][-1] == pytest.approx(5000 + 1000 * 120)
+    assert p['real'][-1] == pytest.approx(esperado / 1.04 ** 10)
+
+    sin_interes = project(500, 24)
+    np.testing.assert_allclose(sin_interes['capital'], sin_interes['aportado'])
+
+
+def test_contributions_grow_once_a_year():
+    aportes = contributions(100, 25, 0.10)
+    assert aportes[11] == 100 and aportes[12] == pytest.approx(110) and aportes[24] == pytest.approx(121)
+
+
+def test_monte_carlo_bands():
+    mc = monte_carlo(1000, 120, 0.07, 0.15, simulaciones=500)
+    assert (mc['p10'] <= mc['p50']).all() and (mc['p50'] <= mc['p90']).all()
+    # Misma semilla, mismas bandas.
+    np.testing.assert_array_equal(mc['p50'], monte_carlo(1000, 120, 0.07, 0.15, simulaciones=500)['p50'])
+
+    # Sin volatilidad, todas las trayectorias son la proyección determinista.
+    fija = monte_carlo(1000, 120, 0.07, 0.0, inflacion=0.03, simulaciones=10)
+    p = project(1000, 120, 0.07, 0.03)
+    np.testing.assert_allclose(fija['p10'], p['capital'])
+    np.testing.assert_allclose(fija['p90_real'], p['real'])
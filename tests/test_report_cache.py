@@ -0,0 +1,56 @@
+from consultoria.report_cache import ExcelCache, ReportCache, report_key
+
+
+def test_key_depends_on_content_not_order():
+    assert report_key('pdf', {'a': 1, 'b': [1, 2]}) == report_key('pdf', {'b': [1, 2], 'a': 1})
+    assert report_key('pdf', {'a': 1}) != report_key('pdf', {'a': 2})
+    assert report_key('pdf', {'a': 1}) != report_key('excel', {'a': 1})
+
+
+def test_lru_eviction_by_bytes():
+    cache = ReportCache(max_bytes=10)
+    cache.put('a', b'1234')
+    cache.put('b', b'1234')
+    assert cache.get('a') == b'1234'
+    # 'b' es el menos usado: sale al pasar de 10 bytes.
+    cache.put('c', b'1234')
+    assert cache.get('b') is None
+    assert cache.get('a') is not None and cache.get('c') is not None
+    # Un reporte más grande que toda la caché no se guarda ni expulsa a nadie.
+    cache.put('d', b'x' * 11)
+    assert cache.get('d') is None
+    # Reemplazar una llave no cuenta sus bytes dos veces.
+    cache.put('a', b'12')
+    assert cache.stats() == {'hits': 3, 'misses': 2, 'evictions': 1, 'items': 2, 'bytes': 6}
+
+    llamadas = []
+
+    def fabrica():
+        llamadas.append(1)
+        return b'pdf'
+
+    assert cache.get_or_create('e', fabrica) == cache.get_or_create('e', fabrica) == b'pdf'
+    assert len(llamadas) == 1
+
+
+def test_excel_cache_by_version():
+    cache = ExcelCache()
+    registros = [{'id': 1, 'Cliente': 'Ana', 'Ingresos': 10.0}]
+    leidas = []
+
+    def cargar():
+        leidas.append(1)
+        return registros
+
+    assert cache.peek(3) is None
+    data = cache.get(3, cargar)
+    assert data[:2] == b'PK'
+    assert cache.get(3, cargar) is data and cache.peek(3) is data
+    assert len(leidas) == 1
+
+    registros.append({'id': 2, 'Cliente': 'Luis', 'Ingresos': 20.0})
+    nuevo = cache.get(4, cargar)
+    assert nuevo != data and cache.version == 4
+    # Una generación atrasada no reemplaza a la versión más nueva.
+    cache.get(2, cargar)
+    assert cache.version == 4 and cache.peek(4) is nuevo
@@ -0,0 +1,18 @@
+from consultoria.search import SearchIndex
+
+
+def test_add_many_repeated_key_keeps_last():
+    indice = SearchIndex({'Cliente': 1.0})
+    indice.add_many([
+        ('a', {'Cliente': 'José Peña'}),
+        ('b', {'Cliente': 'Ana Núñez'}),
+        ('a', {'Cliente': 'Julia Ortiz'}),
+    ])
+    assert len(indice) == 2
+    assert indice.search('julia') == ['a']
+    assert indice.search('pena') == []
+    assert indice.search('j') == ['a']
+
+    indice.remove('a')
+    assert indice.search('julia') == []
+    assert indice.search('nunez') == ['b']
@@ -0,0 +1,99 @@
+import os
+import sqlite3
+import time
+
+import pytest
+
+from consultoria.blobs import PRUNE_GRACE, BlobStore
+from consultoria.storage import RecordStore
+
+
+def _corte(record_id, mes, ingresos, egresos, cliente='Ana'):
+    return {
+        'id': record_id, 'Cliente': cliente, 'Mes': mes, 'Año': 2024,
+        'Ingresos': ingresos, 'Egresos': egresos, 'Balance': ingresos - egresos,
+        'Ahorro_Proyectado': (ingresos - egresos) * 0.5,
+    }
+
+
+def test_same_month_saved_twice_keeps_latest(tmp_path):
+    store = RecordStore(str(tmp_path / 'db.sqlite3'))
+    store.append(_corte(1, 'Enero', 1000.0, 400.0))
+    store.append(_corte(2, 'Febrero', 1000.0, 500.0))
+    store.append(_corte(3, 'Febrero', 1200.0, 500.0))
+
+    enero, febrero = store.client_trend('Ana')
+    assert (febrero['cortes'], febrero['ingresos'], febrero['egresos'], febrero['balance']) == (2, 1200.0, 500.0, 700.0)
+    assert febrero['delta_balance'] == 100.0
+    assert febrero['prom_ingresos'] == 1100.0
+    assert store.client_years('Ana') == [(2024, 3, 2200.0, 900.0, 1300.0, 650.0)]
+
+    # Al cambiar de cliente el corte más reciente, el mes vuelve al que queda.
+    store.update_client('Ana', {'Cliente': 'Ana María'})
+    assert store.client_trend('Ana') == []
+    assert store.client_trend('Ana María')[-1]['ingresos'] == 1200.0
+
+
+def test_old_rollups_are_rebuilt(tmp_path):
+    ruta = str(tmp_path / 'db.sqlite3')
+    store = RecordStore(ruta)
+    store.append_many([_corte(1, 'Enero', 1000.0, 400.0), _corte(2, 'Enero', 1500.0, 400.0)])
+    store._conn.close()
+    # Una base con el resumen anterior (que sumaba los cortes del mes) se recalcula al abrirla.
+    with sqlite3.connect(ruta) as conn:
+        conn.execute("UPDATE resumen_mensual SET ingresos = 2500")
+        conn.execute("UPDATE meta SET valor = 1 WHERE clave = 'resumenes'")
+    conn.close()
+    assert RecordStore(ruta).client_trend('Ana')[0]['ingresos'] == 1500.0
+
+
+def test_compact_purges_deleted_rows_and_orphan_pdfs(tmp_path):
+    blobs = BlobStore(str(tmp_path / 'blobs'))
+    store = RecordStore(str(tmp_path / 'db.sqlite3'), blobs)
+    store.append_many([
+        dict(_corte(1, 'Enero', 1000.0, 400.0), PDF_Bytes=b'%PDF-ana'),
+        dict(_corte(2, 'Enero', 900.0, 300.0, cliente='Luis'), PDF_Bytes=b'%PDF-luis'),
+    ])
+    ref_luis = store.client_records('Luis')[0]['PDF_Ref']
+    visto = store.version
+    store.delete_client('Luis')
+    cambios, _ = store.changes_since(visto)
+    assert cambios == [(2, None)]
+
+    antes = time.time() - PRUNE_GRACE * 2
+    os.utime(blobs._path(ref_luis), (antes, antes))
+    store.compact()
+
+    with sqlite3.connect(str(tmp_path / 'db.sqlite3')) as conn:
+        assert conn.execute("SELECT id FROM registros").fetchall() == [(1,)]
+    conn.close()
+    assert blobs.get(ref_luis) is None
+    assert store.pdf(store.load()[0]) == b'%PDF-ana'
+    # Quien vio una versión anterior a la baja purgada debe recargar.
+    assert store.changes_since(visto)[0] is None
+    assert store.changes_since(store.version)[0] == []
+    assert [r['Cliente'] for r in store.load()] == ['Ana']
+
+
+def test_readonly_open_skips_migrations(tmp_path):
+    ruta = str(tmp_path / 'base #1.sqlite3')
+    store = RecordStore(ruta)
+    store.append(_corte(1, 'Enero', 1000.0, 400.0))
+    store._conn.close()
+    with sqlite3.connect(ruta) as conn:
+        conn.execute("UPDATE registros SET datos = ?", ('{"Cliente":"Ana","Mes":"Enero"}',))
+    conn.close()
+
+    lector = RecordStore(ruta, readonly=True)
+    assert [r['Cliente'] for r in lector.load()] == ['Ana']
+    with pytest.raises(sqlite3.OperationalError):
+        lector.append(_corte(2, 'Febrero', 1.0, 1.0))
+    lector.close()
+    # La fila en texto sigue igual: abrir en solo lectura no la comprimió.
+    with sqlite3.connect(ruta) as conn:
+        assert conn.execute("SELECT typeof(datos) FROM registros").fetchone() == ('text',)
+    conn.close()
+
+    with pytest.raises(FileNotFoundError):
+        RecordStore(str(tmp_path / 'no-existe.sqlite3'), readonly=True)
+    assert not (tmp_path / 'no-existe.sqlite3').exists()